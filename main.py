@@ -1,15 +1,40 @@
 import sys
-from PySide6.QtWidgets import QApplication
-from src.gui.main_window import MainWindow
-from src.core.logger import logger
+from src.startup_profile import PROFILE_STARTUP_FLAG, StartupProfiler, call_after_first_paint
 
 def main():
+    profiler = None
+    if PROFILE_STARTUP_FLAG in sys.argv:
+        sys.argv.remove(PROFILE_STARTUP_FLAG)
+        profiler = StartupProfiler()
+        profiler.install()
+
+    # Импорты после установки профилировщика, чтобы их время вошло в отчет.
+    # Тяжелые модули (QtWebEngine, folium, scipy, pyproj) загружаются позже - при первом использовании
+    from PySide6.QtWidgets import QApplication
+    from src.core.logger import logger
+
     try:
+        from src.gui.main_window import MainWindow
+        if profiler:
+            profiler.mark("Импорт модулей")
+
         app = QApplication(sys.argv)
-        
+        if profiler:
+            profiler.mark("QApplication")
+
         window = MainWindow()
+        if profiler:
+            profiler.mark("Главное окно")
         window.show()
-        
+
+        if profiler:
+            def report_startup():
+                profiler.mark("Первая отрисовка окна")
+                profiler.uninstall()
+                print(profiler.report(), flush=True)
+
+            call_after_first_paint(window, report_startup)
+
         logger.info("Приложение запущено")
         sys.exit(app.exec())
     except Exception as e:
@@ -0,0 +1,196 @@
+"""
+Консольный интерфейс GenWKT без графической оболочки (PySide6/folium не импортируются).
+
+Примеры:
+    python genwkt.py convert --wkt zone.prj --in points.csv --out result.csv
+    python genwkt.py convert --wkt zone.prj --in design.csv --out stakeout.csv --inverse
+    python genwkt.py convert --wkt zone.prj --in cloud.xyz --out cloud_msk.csv --workers 16
+    python genwkt.py estimate --wgs wgs.csv --msk msk.csv --out zone.prj --report residuals.csv
+    python genwkt.py batch --zones zones/ --out-dir prj/ --workers 8
+    python genwkt.py geoid-subset --points points.csv --pad 0.5
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from src.config.loader import config
+from src.core.converter import CoordinateConverter
+from src.core.geoid import extract_geoid_subset
+from src.core.logger import logger
+from src.core.multizone import discover_zones, estimate_zones
+from src.core.pipeline import EstimationPipeline, write_residual_report
+from src.core.reader import DEFAULT_CHUNK_SIZE, iter_point_chunks, read_control_points
+from src.core.sharding import convert_file
+
+
+def _read_text(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().strip()
+
+
+def cmd_convert(args):
+    """
+    Пересчет файла координат WGS84 (ID, Lat, Lon, H) в МСК по WKT
+    (с --inverse - обратно, файл МСК: ID, X, Y, H).
+    Файл делится на фрагменты по байтам, фрагменты пересчитываются в пуле процессов
+    (src.core.sharding), результат записывается в исходном порядке строк.
+    """
+    wkt = _read_text(args.wkt)
+    if not wkt:
+        raise ValueError(f"Пустой файл WKT: {args.wkt}")
+
+    converter = CoordinateConverter()
+    if not converter.check_vertical_crs(wkt):
+        logger.warning("В WKT нет вертикальной СК: высоты будут эллипсоидальными")
+
+    stats = convert_file(wkt, args.input, args.out, inverse=args.inverse, max_workers=args.workers,
+                         shard_size=args.shard_size, chunk_size=args.chunk_size)
+    total, elapsed = stats["points"], stats["elapsed"]
+
+    rate = total / elapsed if elapsed > 0 else float("inf")
+    print(f"Точек: {total}, с ошибкой: {stats['errors']}, время: {elapsed:.3f} с, скорость: {rate:,.0f} точек/с "
+          f"(процессов: {stats['workers']}, фрагментов: {stats['shards']})")
+    logger.info(f"CLI convert: {total} точек за {elapsed:.3f} с ({args.input} -> {args.out})")
+    return 0
+
+
+def cmd_estimate(args):
+    """
+    Расчет параметров проекции и Гельмерта по файлам опорных точек, запись WKT
+    и (опционально) отчета о невязках.
+    """
+    ids, wgs_coords = read_control_points(args.wgs)
+    _, msk_coords = read_control_points(args.msk)
+
+    result = EstimationPipeline().run(wgs_coords, msk_coords, use_geoid=args.geoid, crs_name=args.name)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        f.write(result["wkt"])
+    if args.report:
+        write_residual_report(args.report, ids, result["residuals"])
+
+    rms = float(np.sqrt(np.mean(np.sum(result["residuals"] ** 2, axis=1))))
+    print(f"Точек: {len(ids)}, СКО невязок: {rms:.4f} м, WKT: {args.out}")
+    for stage, elapsed in result["timings"].items():
+        print(f"  {stage:<12}{elapsed * 1000:10.2f} мс")
+    print(f"  {'total':<12}{sum(result['timings'].values()) * 1000:10.2f} мс")
+    return 0
+
+
+def cmd_batch(args):
+    """
+    Пакетный расчет WKT для всех зон каталога или манифеста в пуле процессов.
+    """
+    zones = discover_zones(args.zones)
+    if not zones:
+        raise ValueError(f"Не найдено ни одной зоны: {args.zones}")
+    if args.geoid:
+        for zone in zones:
+            zone["geoid"] = True
+
+    start = time.perf_counter()
+    summaries = estimate_zones(zones, args.out_dir, max_workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    failed = 0
+    for s in summaries:
+        if s["error"]:
+            failed += 1
+            print(f"{s['name']:<20} ОШИБКА: {s['error']}")
+        else:
+            print(f"{s['name']:<20} точек: {s['points']:>6}  СКО: {s['rms']:.4f} м  макс: {s['max']:.4f} м")
+    print(f"Зон: {len(summaries)}, с ошибкой: {failed}, время: {elapsed:.3f} с")
+    return 1 if failed else 0
+
+
+def cmd_geoid_subset(args):
+    """
+    Вырезание регионального фрагмента сетки геоида в кэш (~/.GenWKT/geoid) по границам
+    района или по охвату файла точек WGS84.
+    """
+    if args.bbox:
+        lat_min, lat_max, lon_min, lon_max = args.bbox
+    elif args.points:
+        lat_min = lon_min = np.inf
+        lat_max = lon_max = -np.inf
+        for chunk in iter_point_chunks(args.points):
+            ok = np.isfinite(chunk["lat"]) & np.isfinite(chunk["lon"])
+            if ok.any():
+                lat_min, lat_max = min(lat_min, chunk["lat"][ok].min()), max(lat_max, chunk["lat"][ok].max())
+                lon_min, lon_max = min(lon_min, chunk["lon"][ok].min()), max(lon_max, chunk["lon"][ok].max())
+        if not np.isfinite(lat_min):
+            raise ValueError(f"Нет точек с координатами: {args.points}")
+    else:
+        raise ValueError("Укажите --bbox или --points")
+
+    header_path = extract_geoid_subset(float(lat_min), float(lat_max), float(lon_min), float(lon_max),
+                                       padding=args.pad, grid_path=args.grid, out_dir=args.out_dir, name=args.name)
+    size = header_path.with_suffix(".npy").stat().st_size
+    print(f"Район: {lat_min:.4f}..{lat_max:.4f} N, {lon_min:.4f}..{lon_max:.4f} E, "
+          f"фрагмент: {header_path} ({size / 1024:.0f} КБ)")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="genwkt", description="GenWKT: расчет и применение WKT для МСК")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert = subparsers.add_parser("convert", help="Пересчет координат WGS84 в МСК по WKT (и обратно)")
+    convert.add_argument("--wkt", required=True, help="Файл .prj с WKT целевой СК")
+    convert.add_argument("--in", dest="input", required=True, help="Файл координат WGS84: ID, Lat, Lon, H")
+    convert.add_argument("--out", required=True, help="Выходной CSV")
+    convert.add_argument("--inverse", action="store_true",
+                         help="Обратный пересчет: файл МСК (ID, X, Y, H) в WGS84 (ID, Lat, Lon, H)")
+    convert.add_argument("--workers", type=int, default=config.get("cli.workers", None),
+                         help="Число процессов (по умолчанию - число ядер)")
+    convert.add_argument("--shard-size", type=int, default=None,
+                         help="Размер фрагмента файла для процесса, байт (по умолчанию 8 МБ)")
+    convert.add_argument("--chunk-size", type=int, default=config.get("cli.chunk_size", DEFAULT_CHUNK_SIZE),
+                         help="Число строк в блоке чтения")
+    convert.set_defaults(func=cmd_convert)
+
+    estimate = subparsers.add_parser("estimate", help="Расчет WKT по опорным точкам WGS84 и МСК")
+    estimate.add_argument("--wgs", required=True, help="Файл точек WGS84: ID, Lat, Lon, H")
+    estimate.add_argument("--msk", required=True, help="Файл точек МСК: ID, X, Y, H")
+    estimate.add_argument("--out", required=True, help="Выходной файл .prj")
+    estimate.add_argument("--report", help="CSV с невязками по точкам")
+    estimate.add_argument("--name", default="unknown", help="Имя СК в WKT")
+    estimate.add_argument("--geoid", action="store_true", help="Добавить вертикальную СК EGM2008")
+    estimate.set_defaults(func=cmd_estimate)
+
+    batch = subparsers.add_parser("batch", help="Пакетный расчет WKT для нескольких зон")
+    batch.add_argument("--zones", required=True,
+                       help="Каталог с файлами <зона>_wgs.csv и <зона>_msk.csv или JSON-манифест")
+    batch.add_argument("--out-dir", required=True, help="Каталог для .prj и отчетов о невязках")
+    batch.add_argument("--workers", type=int, default=config.get("cli.workers", None),
+                       help="Число процессов (по умолчанию - число ядер)")
+    batch.add_argument("--geoid", action="store_true", help="Добавить вертикальную СК EGM2008")
+    batch.set_defaults(func=cmd_batch)
+
+    subset = subparsers.add_parser("geoid-subset", help="Фрагмент сетки геоида EGM2008 для района")
+    area = subset.add_mutually_exclusive_group(required=True)
+    area.add_argument("--bbox", nargs=4, type=float, metavar=("LAT_MIN", "LAT_MAX", "LON_MIN", "LON_MAX"),
+                      help="Границы района, градусы")
+    area.add_argument("--points", help="Файл точек WGS84 (ID, Lat, Lon, H): район - их охват")
+    subset.add_argument("--pad", type=float, default=None, help="Запас вокруг района, градусы (по умолчанию 0.5)")
+    subset.add_argument("--grid", help="Сетка GeoTIFF (по умолчанию assets/us_nga_egm2008_1.tif)")
+    subset.add_argument("--out-dir", help="Каталог фрагментов (по умолчанию ~/.GenWKT/geoid)")
+    subset.add_argument("--name", help="Имя фрагмента")
+    subset.set_defaults(func=cmd_geoid_subset)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except Exception as e:
+        logger.exception(f"Ошибка выполнения команды {args.command}")
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
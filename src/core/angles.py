@@ -0,0 +1,200 @@
+import numpy as np
+
+# Классы символов при разборе углов
+_PAD, _DIGIT, _DOT, _SPACE, _MINUS, _PLUS, _HEMI_NEG, _HEMI_POS, _OTHER = range(9)
+
+# Обозначения градусов, минут и секунд - считаются разделителями полей
+DMS_SYMBOLS = "°º'′’\"″”"
+
+# Максимум цифр в поле: мантисса помещается в int64
+MAX_FIELD_DIGITS = 18
+# До стольких цифр мантисса/10^k совпадает с float("..."); длиннее - уточняется через float
+EXACT_FIELD_DIGITS = 15
+_POW10 = 10 ** np.arange(MAX_FIELD_DIGITS + 1, dtype=np.int64)
+
+
+def _build_classes():
+    table = np.full(0x10000, _OTHER, dtype=np.uint8)
+    table[0] = _PAD
+    table[ord("0"):ord("9") + 1] = _DIGIT
+    table[[ord("."), ord(",")]] = _DOT
+    for ch in " \t" + DMS_SYMBOLS:
+        table[ord(ch)] = _SPACE
+    table[ord("-")] = _MINUS
+    table[ord("+")] = _PLUS
+    # Буквы полушарий: S и W дают отрицательный угол
+    for ch in "SsWw":
+        table[ord(ch)] = _HEMI_NEG
+    for ch in "NnEe":
+        table[ord(ch)] = _HEMI_POS
+    return table
+
+
+_CHAR_CLASSES = _build_classes()
+
+
+def _codes(values):
+    """
+    Матрица кодов символов N×W (UCS-4) и массив формы исходного столбца.
+    """
+    text = np.asarray(values, dtype=str)
+    shape = text.shape
+    text = np.ascontiguousarray(text.ravel())
+    width = text.dtype.itemsize // 4
+    if width == 0:
+        return np.zeros((text.size, 1), dtype=np.uint32), shape
+    return text.view(np.uint32).reshape(text.size, width), shape
+
+
+def _char_classes(codes):
+    cls = _CHAR_CLASSES[np.minimum(codes, 0xFFFF)]
+    cls[codes > 0xFFFF] = _OTHER
+    return cls
+
+
+def _field_values(codes, cls, field_id, field):
+    """
+    Значения поля с номером field (1..3) во всех строках.
+    Возвращает (значения, число цифр, ошибка разбора).
+    """
+    in_field = field_id == field
+    digits = in_field & (cls == _DIGIT)
+    dots = in_field & (cls == _DOT)
+    n_digits = digits.sum(axis=1)
+
+    # Число цифр правее каждой позиции -> степень десяти при сборке целой мантиссы
+    after = np.cumsum(digits[:, ::-1], axis=1)[:, ::-1] - digits
+    after = np.minimum(after, MAX_FIELD_DIGITS)
+    mantissa = np.where(digits, (codes.astype(np.int64) - ord("0")) * _POW10[after], 0).sum(axis=1)
+
+    # Дробные цифры - правее десятичной точки
+    columns = np.arange(codes.shape[1])
+    dot_column = np.where(dots.any(axis=1), np.argmax(dots, axis=1), codes.shape[1])
+    n_fraction = (digits & (columns[None, :] > dot_column[:, None])).sum(axis=1)
+
+    # Частное двух точно представимых чисел округляется так же, как float("...")
+    values = mantissa / 10.0 ** n_fraction
+    bad = in_field.any(axis=1) & ((n_digits == 0) | (dots.sum(axis=1) > 1))
+    return values, n_digits, bad
+
+
+def _parse_decimal_column(text):
+    """
+    Быстрый путь для столбца десятичных градусов: один вызов astype.
+    Десятичная запятая пробуется, только если с ней разбирается первый элемент.
+    Возвращает None, если в столбце есть не десятичные значения.
+    """
+    try:
+        return text.astype(float)
+    except ValueError:
+        pass
+    if not text.size:
+        return None
+    try:
+        float(text.flat[0].replace(",", "."))
+        return np.char.replace(text, ",", ".").astype(float)
+    except ValueError:
+        return None
+
+
+def parse_dms_array(values):
+    """
+    Разбор столбца углов без цикла по элементам. Для каждого элемента определяется
+    формат: десятичные градусы ("30.0002885", "30,0002885"), "ГГ ММ.мммм" или
+    "ГГ ММ СС.сссс" (в т.ч. 29°59'59.9" и с буквой полушария N/E/S/W).
+    Возвращает (массив градусов, маска ошибок); для ошибочных элементов значение - NaN.
+    """
+    text = np.asarray(values, dtype=str)
+    result = _parse_decimal_column(text)
+    if result is not None:
+        # float() принимает и то, что не является углом ("1e3", "inf", "1_0", цифры других
+        # алфавитов) - такие значения отбрасываются так же, как при разборе по полям
+        codes, shape = _codes(text)
+        cls = _char_classes(codes)
+        foreign = (cls == _OTHER) | (cls == _HEMI_NEG) | (cls == _HEMI_POS)
+        invalid = ~np.isfinite(result) | foreign.any(axis=1).reshape(shape)
+        result[invalid] = np.nan
+        return result, invalid
+
+    codes, shape = _codes(text)
+    cls = _char_classes(codes)
+
+    signs = (cls == _MINUS) | (cls == _PLUS)
+    hemispheres = (cls == _HEMI_NEG) | (cls == _HEMI_POS)
+    visible = (cls != _PAD) & (cls != _SPACE)
+    first = np.argmax(visible, axis=1)
+    last = codes.shape[1] - 1 - np.argmax(visible[:, ::-1], axis=1)
+    columns = np.arange(codes.shape[1])[None, :]
+
+    # Знак - только первым символом, буква полушария - первой или последней
+    sign_ok = ~(signs & (columns != first[:, None])).any(axis=1)
+    hemi_ok = ~(hemispheres & (columns != first[:, None]) & (columns != last[:, None])).any(axis=1)
+    # Последней букве полушария предшествует пробел или знак °'" ("55.5 E"), иначе "55.5e"
+    # читалось бы как долгота, а "1e3" - по-разному в зависимости от остального столбца
+    rows = np.arange(codes.shape[0])
+    suffix = hemispheres[rows, last] & (last != first)
+    hemi_ok &= ~suffix | (cls[rows, np.maximum(last - 1, 0)] == _SPACE)
+    negative = (cls == _MINUS).any(axis=1) | (cls == _HEMI_NEG).any(axis=1)
+
+    # Поля - непрерывные группы цифр и точек; все прочие допустимые символы - разделители
+    token = (cls == _DIGIT) | (cls == _DOT)
+    starts = token & ~np.pad(token, ((0, 0), (1, 0)))[:, :-1]
+    field_id = np.cumsum(starts, axis=1) * token
+    n_fields = starts.sum(axis=1)
+
+    degrees, deg_digits, deg_bad = _field_values(codes, cls, field_id, 1)
+    minutes, min_digits, min_bad = _field_values(codes, cls, field_id, 2)
+    seconds, sec_digits, sec_bad = _field_values(codes, cls, field_id, 3)
+    # Слишком длинная мантисса допустима только у десятичных градусов (уточняется ниже)
+    overflow = (((n_fields > 1) & (deg_digits > MAX_FIELD_DIGITS))
+                | (min_digits > MAX_FIELD_DIGITS) | (sec_digits > MAX_FIELD_DIGITS))
+
+    invalid = ((cls == _OTHER).any(axis=1)
+               | (signs.sum(axis=1) > 1) | (hemispheres.sum(axis=1) > 1)
+               | ~sign_ok | ~hemi_ok
+               | (n_fields == 0) | (n_fields > 3)
+               | deg_bad | min_bad | sec_bad | overflow
+               | (minutes >= 60) | (seconds >= 60))
+
+    result = degrees + minutes / 60.0 + seconds / 3600.0
+    result = np.where(negative, -result, result)
+    result[invalid] = np.nan
+
+    # Длинные десятичные градусы (редкость) уточняются построчно до точности float()
+    flat = text.ravel()
+    for i in np.flatnonzero(~invalid & (n_fields == 1) & (deg_digits > EXACT_FIELD_DIGITS)):
+        try:
+            result[i] = float(flat[i].replace(",", "."))
+        except ValueError:
+            pass
+    return result.reshape(shape), invalid.reshape(shape)
+
+
+def format_dms_array(degrees, precision=5):
+    """
+    Преобразование массива десятичных градусов в строки "ГГ ММ СС.ссссс".
+    Для NaN/inf возвращается пустая строка.
+    """
+    degrees = np.asarray(degrees, dtype=float)
+    finite = np.isfinite(degrees)
+    value = np.abs(np.where(finite, degrees, 0.0))
+
+    d = np.floor(value)
+    m_full = (value - d) * 60.0
+    m = np.floor(m_full)
+    s = np.round((m_full - m) * 60.0, precision)
+
+    # Переполнение после округления (60.0 сек -> +1 мин, 60 мин -> +1 град)
+    carry = s >= 60.0
+    s = np.where(carry, 0.0, s)
+    m = m + carry
+    carry = m >= 60.0
+    m = np.where(carry, 0.0, m)
+    d = d + carry
+
+    sign = np.where((degrees < 0) & ((d > 0) | (m > 0) | (s > 0)), "-", "")
+    seconds_format = f"%0{precision + 3 if precision else 2}.{precision}f"
+    text = np.char.add(np.char.add(np.char.add(sign, np.char.mod("%d", d.astype(np.int64))),
+                                   np.char.add(" ", np.char.mod("%02d", m.astype(np.int64)))),
+                       np.char.add(" ", np.char.mod(seconds_format, s)))
+    return np.where(finite, text, "")
@@ -0,0 +1,190 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from src.config.loader import config
+from src.core.logger import logger
+
+# Папка с данными PROJ (сетки геоида)
+if getattr(sys, 'frozen', False):
+    # Если приложение собрано PyInstaller
+    ASSETS_DIR = Path(sys._MEIPASS) / "assets"
+else:
+    # Если запуск из исходников
+    ASSETS_DIR = Path(__file__).parent.parent.parent / "assets"
+
+_proj_data_lock = threading.Lock()
+_proj_data_ready = False
+
+
+def setup_proj_data_dir():
+    """
+    Добавление ASSETS_DIR в пути поиска данных PROJ. Выполняется один раз -
+    перед созданием первого объекта pyproj (pyproj импортируется только здесь).
+    """
+    global _proj_data_ready
+    with _proj_data_lock:
+        if _proj_data_ready:
+            return
+        from pyproj import datadir
+        if ASSETS_DIR.exists():
+            datadir.append_data_dir(str(ASSETS_DIR))
+            logger.info(f"Добавлен путь к данным PROJ: {ASSETS_DIR}")
+        else:
+            logger.warning(f"Папка assets не найдена по пути: {ASSETS_DIR}")
+        _proj_data_ready = True
+
+
+class LRUCache:
+    """
+    Ограниченный LRU-кэш со счетчиками попаданий, промахов и вытеснений.
+    """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = max(1, int(maxsize))
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_create(self, key, factory):
+        """
+        Возвращает значение по ключу, при отсутствии создает его через factory().
+        """
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+
+        # Создание вне блокировки: построение CRS/Transformer может быть долгим
+        value = factory()
+
+        with self._lock:
+            if key in self._data:
+                # Значение успели создать в другом потоке
+                self._data.move_to_end(key)
+                return self._data[key]
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self):
+        return len(self._data)
+
+
+def normalize_crs_definition(definition):
+    """
+    Приведение описания CRS к ключу кэша.
+    EPSG-код -> "EPSG:XXXX", PROJ-строка -> отсортированный набор параметров,
+    WKT -> SHA1 от текста.
+    """
+    if isinstance(definition, int):
+        return f"EPSG:{definition}"
+
+    text = str(definition).strip()
+    if text.upper().startswith("EPSG:"):
+        return text.upper()
+    if text.startswith("+"):
+        tokens = sorted(set(text.split()))
+        return "PROJ:" + " ".join(tokens)
+    return "WKT:" + hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class TransformerCache:
+    """
+    Кэш объектов CRS и Transformer, общий для всех экземпляров CoordinateConverter.
+    """
+
+    def __init__(self, crs_size=64, transformer_size=64):
+        self.crs_cache = LRUCache(crs_size)
+        self.transformer_cache = LRUCache(transformer_size)
+
+    def crs(self, definition):
+        """
+        CRS по EPSG-коду, PROJ-строке или WKT.
+        """
+        key = normalize_crs_definition(definition)
+
+        def factory():
+            setup_proj_data_dir()
+            from pyproj import CRS
+            if isinstance(definition, int):
+                return CRS.from_epsg(definition)
+            text = str(definition).strip()
+            if text.startswith("+"):
+                return CRS.from_proj4(text)
+            if text.upper().startswith("EPSG:"):
+                return CRS.from_user_input(text)
+            return CRS.from_wkt(text)
+
+        return self.crs_cache.get_or_create(key, factory)
+
+    def transformer(self, src_definition, dst_definition, always_xy=True):
+        """
+        Transformer между двумя CRS, заданными так же, как для crs().
+        """
+        key = ("crs",
+               normalize_crs_definition(src_definition),
+               normalize_crs_definition(dst_definition),
+               bool(always_xy))
+
+        def factory():
+            from pyproj import Transformer
+            return Transformer.from_crs(self.crs(src_definition), self.crs(dst_definition), always_xy=always_xy)
+
+        return self.transformer_cache.get_or_create(key, factory)
+
+    def pipeline(self, pipeline_str):
+        """
+        Transformer по строке PROJ-пайплайна.
+        """
+        key = ("pipeline", " ".join(pipeline_str.split()))
+
+        def factory():
+            setup_proj_data_dir()
+            from pyproj import Transformer
+            return Transformer.from_pipeline(pipeline_str)
+
+        return self.transformer_cache.get_or_create(key, factory)
+
+    def stats(self):
+        return {
+            "crs": self.crs_cache.stats(),
+            "transformers": self.transformer_cache.stats(),
+        }
+
+    def clear(self):
+        self.crs_cache.clear()
+        self.transformer_cache.clear()
+        logger.debug("Кэш CRS и трансформеров очищен")
+
+
+# Глобальный экземпляр
+transformer_cache = TransformerCache(
+    crs_size=config.get("cache.crs_size", 64),
+    transformer_size=config.get("cache.transformer_size", 64),
+)
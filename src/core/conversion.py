@@ -0,0 +1,62 @@
+import numpy as np
+
+from src.core.logger import logger
+from src.core.pipeline import OperationCancelled
+from src.core.reader import DEFAULT_CHUNK_SIZE, iter_point_chunks
+
+
+def iter_converted_chunks(converter, wkt, source, chunk_size=DEFAULT_CHUNK_SIZE,
+                          progress_callback=None, is_cancelled=None, inverse=False):
+    """
+    Потоковый пересчет точек WGS84 (путь к файлу или набор строк) в МСК по WKT.
+    Для каждого блока выдает (points, northing, easting, h, error_mask), где points -
+    массив POINT_DTYPE исходного блока.
+    inverse=True - обратный пересчет МСК -> WGS84: строки источника (ID, X, Y, H) читаются
+    в поля lat/lon/h блока, выдается (points, lat, lon, h, error_mask).
+    progress_callback(done) получает число обработанных точек после каждого блока,
+    is_cancelled() проверяется перед каждым блоком (OperationCancelled).
+    """
+    done = 0
+    for chunk in iter_point_chunks(source, chunk_size=chunk_size):
+        if is_cancelled is not None and is_cancelled():
+            logger.info(f"Конвертация отменена после {done} точек")
+            raise OperationCancelled(f"Конвертация отменена после {done} точек")
+        if inverse:
+            result = converter.msk_to_wgs_batch(wkt, chunk["lat"], chunk["lon"], chunk["h"])
+        else:
+            result = converter.wkt_to_msk_batch(wkt, chunk["lat"], chunk["lon"], chunk["h"])
+        done += len(chunk)
+        yield (chunk, *result)
+        if progress_callback is not None:
+            progress_callback(done)
+
+
+def convert_points(converter, wkt, source, chunk_size=DEFAULT_CHUNK_SIZE, progress_callback=None, is_cancelled=None,
+                   inverse=False):
+    """
+    Пересчет всех точек источника. Возвращает словарь: ids, northing, easting, h
+    (только успешно пересчитанные точки, в исходном порядке) и errors - число ошибок.
+    При inverse=True (МСК -> WGS84) вместо northing, easting - lat, lon.
+    """
+    ids, first, second, heights = [], [], [], []
+    errors = 0
+    for chunk, a, b, h, error_mask in iter_converted_chunks(converter, wkt, source, chunk_size,
+                                                            progress_callback, is_cancelled, inverse):
+        ok = ~error_mask
+        ids.append(chunk["id"][ok])
+        first.append(a[ok])
+        second.append(b[ok])
+        heights.append(h[ok])
+        errors += int(np.count_nonzero(error_mask))
+
+    def join(parts, dtype):
+        return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+    first_key, second_key = ("lat", "lon") if inverse else ("northing", "easting")
+    return {
+        "ids": join(ids, object),
+        first_key: join(first, float),
+        second_key: join(second, float),
+        "h": join(heights, float),
+        "errors": errors,
+    }
@@ -1,31 +1,61 @@
 import numpy as np
-from pyproj import CRS, Transformer, datadir
-from pathlib import Path
 import os
 from src.core.logger import logger
+from src.core.angles import parse_dms_array, format_dms_array
+from src.core.cache import ASSETS_DIR, transformer_cache
+from src.core.geoid import geoid_grid_path, get_geoid_model, get_geoid_subsets, regional_undulation
+from src.core.geodesy import WGS84, KRASSOVSKY, geodetic_to_geocentric, geocentric_to_geodetic
+from src.core.tmerc import TransverseMercator
+from src.core.zone import WGS84_GEOGRAPHIC, ZoneCache, zone_cache
+from src.config.loader import config
+
+# PROJ-строки, используемые конвертером
+WGS84_GEOCENTRIC = 4978
+KRASS_GEOCENTRIC = "+proj=geocent +ellps=krass +units=m +no_defs"
+
+# Движки геоцентрических преобразований
+BACKEND_PYPROJ = "pyproj"
+BACKEND_NUMPY = "numpy"
+
+# Обратный пересчет МСК -> WGS84: допустимая невязка замыкания (м) через прямой
+# пересчет и предельное число уточнений
+DEFAULT_CLOSURE_TOLERANCE = 1e-3
+INVERSE_MAX_ITERATIONS = 5
+
+
+def tmerc_proj_string(central_meridian_deg, false_easting=500000, false_northing=0, scale_factor=1.0, lat_origin=0):
+    """
+    PROJ-строка Поперечной Меркатора на эллипсоиде Красовского.
+    """
+    return (f"+proj=tmerc +lat_0={lat_origin} +lon_0={central_meridian_deg} "
+            f"+k={scale_factor} +x_0={false_easting} +y_0={false_northing} "
+            f"+ellps=krass +units=m +no_defs")
 
-import sys
-
-# Настройка пути к данным PROJ (для геоидов)
-if getattr(sys, 'frozen', False):
-    # Если приложение собрано PyInstaller
-    base_path = Path(sys._MEIPASS)
-    assets_dir = base_path / "assets"
-else:
-    # Если запуск из исходников
-    current_dir = Path(__file__).parent
-    project_root = current_dir.parent.parent
-    assets_dir = project_root / "assets"
-
-if assets_dir.exists():
-    datadir.append_data_dir(str(assets_dir))
-    logger.info(f"Добавлен путь к данным PROJ: {assets_dir}")
-else:
-    logger.warning(f"Папка assets не найдена по пути: {assets_dir}")
 
 class CoordinateConverter:
-    def __init__(self):
-        pass
+    def __init__(self, cache=None, backend=None, height_backend=None):
+        # Кэш CRS/Transformer (по умолчанию общий для всего приложения)
+        self.cache = cache if cache is not None else transformer_cache
+        # Разобранные WKT (ParsedZone) поверх того же кэша трансформеров
+        self.zones = zone_cache if cache is None else ZoneCache(self.cache)
+        # Движок геодезических <-> геоцентрических преобразований:
+        # "numpy" - встроенные векторные формулы, "pyproj" - через PROJ
+        self.backend = backend or config.get("converter.backend", BACKEND_NUMPY)
+        if self.backend not in (BACKEND_PYPROJ, BACKEND_NUMPY):
+            raise ValueError(f"Неизвестный движок преобразований: {self.backend}")
+        # Движок высот геоида EGM2008: "pyproj" - vgridshift PROJ,
+        # "numpy" - интерполяция сетки GeoTIFF с кэшем тайлов (src.core.geoid)
+        self.height_backend = height_backend or config.get("converter.height_backend", BACKEND_PYPROJ)
+        if self.height_backend not in (BACKEND_PYPROJ, BACKEND_NUMPY):
+            raise ValueError(f"Неизвестный движок высот: {self.height_backend}")
+        self.geoid_path = geoid_grid_path()
+        self._grid_exists = {}
+
+    def cache_stats(self):
+        """
+        Статистика кэша CRS, трансформеров и разобранных WKT (hits/misses/evictions).
+        """
+        return {**self.cache.stats(), "zones": self.zones.stats()}
 
     def parse_dms(self, dms_str: str) -> float:
         """
@@ -100,19 +130,40 @@ class CoordinateConverter:
             logger.exception(f"Ошибка форматирования угла {deg}")
             return str(deg)
 
+    def parse_dms_array(self, values):
+        """
+        Пакетный парсинг столбца углов (десятичные градусы или DMS в каждом элементе).
+        Возвращает (массив градусов, маска ошибок); ошибочные элементы - NaN.
+        """
+        try:
+            degrees, invalid = parse_dms_array(values)
+            logger.debug(f"Пакетно распарсено {degrees.size} углов, с ошибкой {int(np.count_nonzero(invalid))}")
+            return degrees, invalid
+        except Exception as e:
+            logger.exception("Ошибка в parse_dms_array")
+            raise
+
+    def format_dms_array(self, degrees, precision=5):
+        """
+        Пакетное преобразование десятичных градусов в строки DMS 'ГГ ММ СС.ссссс'.
+        """
+        try:
+            return format_dms_array(degrees, precision)
+        except Exception as e:
+            logger.exception("Ошибка в format_dms_array")
+            raise
+
     def wgs84_to_cartesian(self, lat: float, lon: float, h: float):
         """
         Преобразование WGS84 (lat, lon, h) в Геоцентрические (X, Y, Z).
         """
         try:
-            # WGS84 Геодезическая
-            crs_geo = CRS.from_epsg(4326) # Lat, Lon
-            # WGS84 Геоцентрическая (Декартова)
-            crs_cart = CRS.from_epsg(4978) 
-            
-            transformer = Transformer.from_crs(crs_geo, crs_cart, always_xy=True)
-            
-            X, Y, Z = transformer.transform(lon, lat, h)
+            if self.backend == BACKEND_NUMPY:
+                X, Y, Z = (float(v) for v in geodetic_to_geocentric([lat, lon, h], WGS84)[0])
+            else:
+                # WGS84 Геодезическая (Lat, Lon) -> WGS84 Геоцентрическая (Декартова)
+                transformer = self.cache.transformer(WGS84_GEOGRAPHIC, WGS84_GEOCENTRIC)
+                X, Y, Z = transformer.transform(lon, lat, h)
             logger.debug(f"Конвертировано WGS84 ({lat}, {lon}, {h}) в Декартовы ({X}, {Y}, {Z})")
             return X, Y, Z
         except Exception as e:
@@ -124,14 +175,8 @@ class CoordinateConverter:
         Преобразование МСК (Поперечная Меркатора на Красовском) в Геоцентрические (X, Y, Z на Красовском).
         """
         try:
-            proj_str = (f"+proj=tmerc +lat_0={lat_origin} +lon_0={central_meridian_deg} "
-                        f"+k={scale_factor} +x_0={false_easting} +y_0={false_northing} "
-                        f"+ellps=krass +units=m +no_defs")
-            
-            crs_msk = CRS.from_proj4(proj_str)
-            crs_cart = CRS.from_proj4("+proj=geocent +ellps=krass +units=m +no_defs")
-            
-            transformer = Transformer.from_crs(crs_msk, crs_cart, always_xy=True)
+            proj_str = tmerc_proj_string(central_meridian_deg, false_easting, false_northing, scale_factor, lat_origin)
+            transformer = self.cache.transformer(proj_str, KRASS_GEOCENTRIC)
             
             X, Y, Z = transformer.transform(easting, northing, h)
             logger.debug(f"Конвертировано МСК ({northing}, {easting}, {h}) в Декартовы ({X}, {Y}, {Z})")
@@ -145,14 +190,8 @@ class CoordinateConverter:
         Преобразование Геоцентрических (X, Y, Z на Красовском) в МСК (Поперечная Меркатора на Красовском).
         """
         try:
-            proj_str = (f"+proj=tmerc +lat_0={lat_origin} +lon_0={central_meridian_deg} "
-                        f"+k={scale_factor} +x_0={false_easting} +y_0={false_northing} "
-                        f"+ellps=krass +units=m +no_defs")
-            
-            crs_msk = CRS.from_proj4(proj_str)
-            crs_cart = CRS.from_proj4("+proj=geocent +ellps=krass +units=m +no_defs")
-            
-            transformer = Transformer.from_crs(crs_cart, crs_msk, always_xy=True)
+            proj_str = tmerc_proj_string(central_meridian_deg, false_easting, false_northing, scale_factor, lat_origin)
+            transformer = self.cache.transformer(KRASS_GEOCENTRIC, proj_str)
             
             easting, northing, h = transformer.transform(X, Y, Z)
             logger.debug(f"Конвертировано Декартовы ({X}, {Y}, {Z}) в МСК ({northing}, {easting}, {h})")
@@ -161,70 +200,179 @@ class CoordinateConverter:
             logger.exception("Ошибка в cartesian_to_msk")
             raise
 
+    def wgs84_to_cartesian_batch(self, points):
+        """
+        Пакетное преобразование WGS84 (массив N×3: Lat, Lon, H) в Геоцентрические (массив N×3: X, Y, Z).
+        """
+        try:
+            points = np.asarray(points, dtype=float).reshape(-1, 3)
+            if self.backend == BACKEND_NUMPY:
+                result = geodetic_to_geocentric(points, WGS84)
+            else:
+                transformer = self.cache.transformer(WGS84_GEOGRAPHIC, WGS84_GEOCENTRIC)
+                result = np.column_stack(transformer.transform(points[:, 1], points[:, 0], points[:, 2]))
+            logger.debug(f"Пакетно конвертировано {len(points)} точек WGS84 в Декартовы ({self.backend})")
+            return result
+        except Exception as e:
+            logger.exception("Ошибка в wgs84_to_cartesian_batch")
+            raise
+
+    def msk_to_cartesian_batch(self, points, central_meridian_deg, false_easting=500000, false_northing=0, scale_factor=1.0, lat_origin=0):
+        """
+        Пакетное преобразование МСК (массив N×3: Northing, Easting, H) в Геоцентрические на Красовском (массив N×3).
+        """
+        try:
+            points = np.asarray(points, dtype=float).reshape(-1, 3)
+            if self.backend == BACKEND_NUMPY:
+                tm = TransverseMercator(central_meridian_deg, scale_factor, false_easting, false_northing, lat_origin)
+                lat, lon = tm.inverse(points[:, 0], points[:, 1])
+                result = geodetic_to_geocentric(np.column_stack((lat, lon, points[:, 2])), KRASSOVSKY)
+            else:
+                proj_str = tmerc_proj_string(central_meridian_deg, false_easting, false_northing, scale_factor, lat_origin)
+                transformer = self.cache.transformer(proj_str, KRASS_GEOCENTRIC)
+                result = np.column_stack(transformer.transform(points[:, 1], points[:, 0], points[:, 2]))
+            logger.debug(f"Пакетно конвертировано {len(points)} точек МСК в Декартовы ({self.backend})")
+            return result
+        except Exception as e:
+            logger.exception("Ошибка в msk_to_cartesian_batch")
+            raise
+
+    def cartesian_to_msk_batch(self, points, central_meridian_deg, false_easting=500000, false_northing=0, scale_factor=1.0, lat_origin=0):
+        """
+        Пакетное преобразование Геоцентрических на Красовском (массив N×3) в МСК (массив N×3: Northing, Easting, H).
+        """
+        try:
+            points = np.asarray(points, dtype=float).reshape(-1, 3)
+            if self.backend == BACKEND_NUMPY:
+                geodetic = geocentric_to_geodetic(points, KRASSOVSKY)
+                tm = TransverseMercator(central_meridian_deg, scale_factor, false_easting, false_northing, lat_origin)
+                northing, easting = tm.forward(geodetic[:, 0], geodetic[:, 1])
+                h = geodetic[:, 2]
+            else:
+                proj_str = tmerc_proj_string(central_meridian_deg, false_easting, false_northing, scale_factor, lat_origin)
+                transformer = self.cache.transformer(KRASS_GEOCENTRIC, proj_str)
+                easting, northing, h = transformer.transform(points[:, 0], points[:, 1], points[:, 2])
+            logger.debug(f"Пакетно конвертировано {len(points)} Декартовых точек в МСК ({self.backend})")
+            return np.column_stack((northing, easting, h))
+        except Exception as e:
+            logger.exception("Ошибка в cartesian_to_msk_batch")
+            raise
+
+    def zone(self, wkt_str):
+        """
+        Разобранная МСК (ParsedZone) из кэша: WKT разбирается один раз на определение.
+        """
+        return self.zones.get(wkt_str)
+
     def check_vertical_crs(self, wkt_str: str) -> bool:
         """
         Проверяет, содержит ли WKT описание вертикальной системы координат (EGM2008).
         """
         try:
-            crs_msk = CRS.from_wkt(wkt_str)
-            
-            # Проверка на наличие вертикальной системы координат (EGM2008)
-            is_compound = crs_msk.is_compound
-            has_egm2008 = False
-            if is_compound:
-                # Проверяем субисточники, обычно второй - вертикальный
-                for sub_crs in crs_msk.sub_crs_list:
-                    if sub_crs.is_vertical:
-                        # Простая проверка по имени, так как EPSG код может быть не доступен напрямую в имени
-                        if "EGM2008" in sub_crs.name or "EGM2008" in sub_crs.to_wkt():
-                            has_egm2008 = True
-                            break
-            return has_egm2008
+            return self.zone(wkt_str).has_egm2008
         except Exception:
             return False
 
+    def _geoid_grid_exists(self):
+        # Наличие файла проверяется один раз для каждого пути
+        path = self.geoid_path
+        if path not in self._grid_exists:
+            self._grid_exists[path] = path.exists()
+        return self._grid_exists[path]
+
+    def _egm2008_heights(self, lats, lons, hs, inverse=False):
+        """
+        Ортометрические высоты H = h - N (EGM2008) или None, если сетка недоступна;
+        inverse=True - обратно, эллипсоидальные h = H + N.
+        Точки внутри региональных фрагментов сетки (src.core.geoid.extract_geoid_subset)
+        считаются по ним, остальные - выбранным движком. Вне сетки - NaN/inf; если полной
+        сетки нет, точки вне фрагментов тоже получают NaN (пакетные методы отмечают их как ошибочные).
+        """
+        subsets = get_geoid_subsets(self.geoid_path.name)
+        if not subsets:
+            return self._egm2008_grid_heights(lats, lons, hs, inverse)
+
+        undulation, covered = regional_undulation(subsets, lats, lons)
+        h_ortho = hs + undulation if inverse else hs - undulation
+        if covered.all():
+            return h_ortho
+        rest = ~covered
+        h_rest = self._egm2008_grid_heights(lats[rest], lons[rest], hs[rest], inverse)
+        if h_rest is None:
+            # Полной сетки нет: точки вне фрагментов - с ошибкой, как точки вне полной сетки
+            h_ortho[rest] = np.nan
+            logger.warning(f"Полная сетка геоида {self.geoid_path.name} не найдена: высота не вычислена "
+                           f"для {int(np.count_nonzero(rest))} из {len(rest)} точек вне фрагментов сетки")
+            return h_ortho
+        h_ortho[rest] = h_rest
+        return h_ortho
+
+    def _egm2008_grid_heights(self, lats, lons, hs, inverse=False):
+        """
+        H = h - N (inverse=True: h = H + N) по полной сетке выбранным движком или None, если сетки нет.
+        """
+        if self.height_backend == BACKEND_NUMPY:
+            model = get_geoid_model(self.geoid_path)
+            if model is None:
+                return None
+            if inverse:
+                return model.ellipsoidal_heights(lats, lons, hs)
+            return model.orthometric_heights(lats, lons, hs)
+
+        pipeline_trans = self._egm2008_pipeline(inverse)
+        if pipeline_trans is None:
+            return None
+        # vgridshift ожидает (lon, lat, z)
+        _, _, h_ortho = pipeline_trans.transform(lons, lats, hs, errcheck=False)
+        return np.asarray(h_ortho, dtype=float)
+
+    def _egm2008_pipeline(self, inverse=False):
+        """
+        Пайплайн WGS84 (эллипсоидальная) -> EGM2008 (ортометрическая) или None, если сетки нет;
+        inverse=True - пайплайн EGM2008 -> WGS84.
+        """
+        # vgridshift применяет сдвиг. С +inv он вычитает N (если N положительный).
+        # Проверено тестами: +inv дает H = h - N, без +inv - h = H + N.
+        if not self._geoid_grid_exists():
+            logger.warning(f"Файл сетки {self.geoid_path.name} не найден, трансформация высоты пропущена.")
+            return None
+
+        # Сетка из ASSETS_DIR (путь в данных PROJ) задается именем, иначе - полным путем
+        grid = self.geoid_path.name if self.geoid_path.parent == ASSETS_DIR else self.geoid_path
+        pipeline_str = f"+proj=pipeline +step +proj=vgridshift +grids={grid} +multiplier=1"
+        if not inverse:
+            pipeline_str += " +inv"
+        try:
+            return self.cache.pipeline(pipeline_str)
+        except Exception as e:
+            logger.warning(f"Ошибка при создании pipeline трансформации высоты: {e}")
+            return None
+
     def wkt_to_msk(self, wkt_str, lat, lon, h):
         """
         Преобразование WGS84 (Lat, Lon, H) в МСК с использованием строки WKT.
         Автоматически определяет необходимость 3D трансформации (если есть геоид).
         """
         try:
-            crs_msk = CRS.from_wkt(wkt_str)
-            has_egm2008 = self.check_vertical_crs(wkt_str)
-            
+            zone = self.zone(wkt_str)
+
             h_msk = h
-            if has_egm2008:
-                # Используем явный пайплайн для EGM2008
+            if zone.has_egm2008:
                 # WGS84 (Ellipsoidal) -> EGM2008 (Orthometric) = h - N
-                # vgridshift применяет сдвиг. С +inv он вычитает N (если N положительный).
-                # Проверено тестами: +inv дает H = h - N.
-                
-                # Проверяем наличие файла сетки
-                grid_name = "us_nga_egm2008_1.tif"
-                grid_path = None
-                
-                # Ищем в добавленных путях
-                # datadir.get_data_dir() возвращает список путей (строка с разделителями)
-                # Но мы добавили assets_dir в начало или конец.
-                # Проще проверить assets_dir, который мы определили выше
-                if (assets_dir / grid_name).exists():
-                     pipeline_str = f"+proj=pipeline +step +proj=vgridshift +grids={grid_name} +multiplier=1 +inv"
-                     try:
-                         pipeline_trans = Transformer.from_pipeline(pipeline_str)
-                         # vgridshift ожидает (lon, lat, z)
-                         _, _, h_ortho = pipeline_trans.transform(lon, lat, h)
-                         h_msk = h_ortho
-                         logger.debug(f"Применена трансформация высоты EGM2008: {h} -> {h_msk}")
-                     except Exception as e:
-                         logger.warning(f"Ошибка при трансформации высоты через pipeline: {e}")
-                else:
-                    logger.warning(f"Файл сетки {grid_name} не найден, трансформация высоты пропущена.")
+                try:
+                    h_ortho = self._egm2008_heights(np.array([lat], dtype=float), np.array([lon], dtype=float),
+                                                    np.array([h], dtype=float))
+                    if h_ortho is not None:
+                        h_msk = float(h_ortho[0])
+                        if not np.isfinite(h_msk):
+                            logger.warning(f"Точка ({lat}, {lon}) вне сетки геоида: высота EGM2008 не вычислена")
+                        logger.debug(f"Применена трансформация высоты EGM2008: {h} -> {h_msk}")
+                except Exception as e:
+                    logger.warning(f"Ошибка при трансформации высоты EGM2008: {e}")
             
             # Горизонтальная трансформация (используем 2D WGS84 -> 2D MSK)
-            # Даже если WKT Compound, from_crs обычно справляется с горизонтальной частью
-            crs_wgs = CRS.from_epsg(4326)
-            transformer = Transformer.from_crs(crs_wgs, crs_msk, always_xy=True)
-            
+            transformer = zone.forward
+
             # Трансформируем, но высоту берем из h_msk (если она была изменена)
             # Если трансформер вернет 3 значения, игнорируем Z от него, так как он может быть неточным без сеток
             res = transformer.transform(lon, lat, h)
@@ -239,3 +387,120 @@ class CoordinateConverter:
         except Exception as e:
             logger.exception("Ошибка в преобразовании WKT")
             raise ValueError(f"Ошибка в преобразовании WKT: {e}")
+
+    def wkt_to_msk_batch(self, wkt_str, lats, lons, hs=None):
+        """
+        Пакетное преобразование массивов WGS84 (Lat, Lon, H) в МСК по строке WKT.
+        WKT, вертикальная CRS и трансформеры обрабатываются один раз на весь массив.
+        Возвращает (northing, easting, h_msk, error_mask); для ошибочных точек значения NaN.
+        """
+        try:
+            lats = np.asarray(lats, dtype=float).ravel()
+            lons = np.asarray(lons, dtype=float).ravel()
+            hs = np.zeros_like(lats) if hs is None else np.asarray(hs, dtype=float).ravel()
+            if not (len(lats) == len(lons) == len(hs)):
+                raise ValueError("Длины массивов Lat, Lon, H не совпадают")
+
+            # Ошибки WKT относятся ко всему пакету и пробрасываются сразу
+            zone = self.zone(wkt_str)
+            transformer = zone.forward
+            has_egm2008 = zone.has_egm2008
+        except Exception as e:
+            logger.exception("Ошибка в пакетном преобразовании WKT")
+            raise ValueError(f"Ошибка в преобразовании WKT: {e}")
+
+        error_mask = ~(np.isfinite(lats) & np.isfinite(lons) & np.isfinite(hs))
+
+        h_msk = hs.copy()
+        if has_egm2008:
+            h_ortho = self._egm2008_heights(lats, lons, hs)
+            if h_ortho is not None:
+                error_mask |= ~np.isfinite(h_ortho)
+                h_msk = h_ortho
+
+        res = transformer.transform(lons, lats, hs, errcheck=False)
+        easting = np.asarray(res[0], dtype=float)
+        northing = np.asarray(res[1], dtype=float)
+        error_mask |= ~(np.isfinite(easting) & np.isfinite(northing))
+
+        northing[error_mask] = np.nan
+        easting[error_mask] = np.nan
+        h_msk[error_mask] = np.nan
+
+        n_errors = int(np.count_nonzero(error_mask))
+        if n_errors:
+            logger.warning(f"Пакетное преобразование WKT: {n_errors} из {len(lats)} точек с ошибкой")
+        logger.debug(f"Пакетно конвертировано {len(lats) - n_errors} точек WGS84 в МСК по WKT")
+        return northing, easting, h_msk, error_mask
+
+    def msk_to_wgs_batch(self, wkt_str, northing, easting, h=None, closure_tolerance=None):
+        """
+        Пакетное обратное преобразование МСК (Northing, Easting, H) в WGS84 по строке WKT -
+        обращение wkt_to_msk_batch: проекция и TOWGS84, затем высота h = H + N (EGM2008),
+        если в WKT описана вертикальная СК.
+        Прямой пересчет сдвигает план в зависимости от эллипсоидальной высоты, поэтому
+        результат обратного трансформера уточняется итерациями до замыкания: повторный
+        прямой пересчет найденных точек с высотой h, вычисленной в найденном положении,
+        должен вернуть исходные Northing/Easting с невязкой
+        не больше closure_tolerance (м), иначе точка считается ошибочной.
+        Возвращает (lat, lon, h_wgs, error_mask); для ошибочных точек значения NaN.
+        """
+        try:
+            northing = np.asarray(northing, dtype=float).ravel()
+            easting = np.asarray(easting, dtype=float).ravel()
+            h = np.zeros_like(northing) if h is None else np.asarray(h, dtype=float).ravel()
+            if not (len(northing) == len(easting) == len(h)):
+                raise ValueError("Длины массивов Northing, Easting, H не совпадают")
+            if closure_tolerance is None:
+                closure_tolerance = config.get("converter.closure_tolerance", DEFAULT_CLOSURE_TOLERANCE)
+
+            # Ошибки WKT относятся ко всему пакету и пробрасываются сразу
+            zone = self.zone(wkt_str)
+            forward = zone.forward
+            inverse = zone.inverse
+            has_egm2008 = zone.has_egm2008
+        except Exception as e:
+            logger.exception("Ошибка в пакетном обратном преобразовании WKT")
+            raise ValueError(f"Ошибка в преобразовании WKT: {e}")
+
+        error_mask = ~(np.isfinite(northing) & np.isfinite(easting) & np.isfinite(h))
+
+        # Начальное приближение - обратный трансформер (2D: высота в МСК не участвует)
+        lon0, lat0 = (np.asarray(v, dtype=float) for v in inverse.transform(easting, northing, errcheck=False))
+        lons, lats = lon0.copy(), lat0.copy()
+
+        # Уточнение: разность обратных образов исходной и замыкающей точек - поправка к координатам.
+        # Высота h = H + N пересчитывается на каждой итерации по текущему положению точки,
+        # поэтому замыкание проверяет план вместе с высотой, с которой он получен
+        h_wgs = h.copy()
+        geoid_errors = np.zeros_like(error_mask)
+        closure = np.full_like(northing, np.inf)
+        for iteration in range(INVERSE_MAX_ITERATIONS + 1):
+            if has_egm2008:
+                h_ell = self._egm2008_heights(lats, lons, h, inverse=True)
+                if h_ell is not None:
+                    geoid_errors = ~np.isfinite(h_ell)
+                    h_wgs = h_ell
+            res = forward.transform(lons, lats, h_wgs, errcheck=False)
+            closure = np.hypot(np.asarray(res[0], dtype=float) - easting, np.asarray(res[1], dtype=float) - northing)
+            active = np.isfinite(closure) & ~error_mask & ~geoid_errors
+            if iteration == INVERSE_MAX_ITERATIONS or not np.any(closure[active] > closure_tolerance * 1e-3):
+                break
+            lon1, lat1 = inverse.transform(res[0], res[1], errcheck=False)
+            lons += lon0 - np.asarray(lon1, dtype=float)
+            lats += lat0 - np.asarray(lat1, dtype=float)
+
+        error_mask |= geoid_errors | ~(closure <= closure_tolerance)
+
+        lats[error_mask] = np.nan
+        lons[error_mask] = np.nan
+        h_wgs[error_mask] = np.nan
+
+        n_errors = int(np.count_nonzero(error_mask))
+        if n_errors:
+            logger.warning(f"Обратное преобразование WKT: {n_errors} из {len(northing)} точек с ошибкой "
+                           f"(в т.ч. невязка замыкания больше {closure_tolerance} м)")
+        max_closure = float(np.max(closure[~error_mask])) if n_errors < len(northing) else 0.0
+        logger.debug(f"Пакетно конвертировано {len(northing) - n_errors} точек МСК в WGS84 по WKT, "
+                     f"итераций: {iteration + 1}, максимальная невязка замыкания {max_closure:.2e} м")
+        return lats, lons, h_wgs, error_mask
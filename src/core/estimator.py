@@ -1,111 +1,476 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
+from math import comb
 import numpy as np
 from src.core.logger import logger
-from scipy.optimize import minimize
-from pyproj import CRS, Transformer
+from src.core.tmerc import TransverseMercator
+from src.config.loader import config
+
+# Методы оценки параметров проекции
+METHOD_LM = "lm"
+METHOD_NELDER_MEAD = "nelder-mead"
+
+# Способы решения системы для параметров Гельмерта
+SOLVER_LSTSQ = "lstsq"
+SOLVER_NORMAL = "normal"
+SOLVER_QR = "qr"
+
+
+def helmert_design_matrix(source_coords):
+    """
+    Матрица плана (3N × 7) линеаризованного преобразования Гельмерта
+    для массива исходных координат N×3. Порядок неизвестных: Tx, Ty, Tz, wx, wy, wz, m.
+    """
+    src = np.asarray(source_coords, dtype=float).reshape(-1, 3)
+    X, Y, Z = src[:, 0], src[:, 1], src[:, 2]
+
+    A = np.zeros((len(src), 3, 7))
+    # Коэффициенты для Tx, Ty, Tz
+    A[:, 0, 0] = 1
+    A[:, 1, 1] = 1
+    A[:, 2, 2] = 1
+    # Коэффициенты для wx (Rx)
+    A[:, 1, 3] = Z
+    A[:, 2, 3] = -Y
+    # Коэффициенты для wy (Ry)
+    A[:, 0, 4] = -Z
+    A[:, 2, 4] = X
+    # Коэффициенты для wz (Rz)
+    A[:, 0, 5] = Y
+    A[:, 1, 5] = -X
+    # Коэффициенты для m (Масштаб)
+    A[:, :, 6] = src
+    return A.reshape(-1, 7)
+
+
+def helmert_params_from_vector(x):
+    """
+    Вектор решения (Tx, Ty, Tz, wx, wy, wz в радианах, m) -> словарь параметров
+    (вращения в угловых секундах, масштаб в ppm).
+    """
+    # Преобразование вращений в угловые секунды
+    Rx_sec, Ry_sec, Rz_sec = (np.degrees(w) * 3600 for w in x[3:6])
+    return {
+        "Tx": x[0], "Ty": x[1], "Tz": x[2],
+        "Rx": Rx_sec, "Ry": Ry_sec, "Rz": Rz_sec,
+        "Scale_ppm": x[6] * 1e6
+    }
+
+
+def helmert_vector_from_params(params):
+    """
+    Обратное к helmert_params_from_vector преобразование.
+    """
+    return np.array([
+        params["Tx"], params["Ty"], params["Tz"],
+        np.radians(params["Rx"] / 3600),
+        np.radians(params["Ry"] / 3600),
+        np.radians(params["Rz"] / 3600),
+        params["Scale_ppm"] * 1e-6
+    ])
+
+
+def helmert_uncenter(x_centered, origin):
+    """
+    Пересчет переносов, оцененных относительно начала origin, к исходному началу координат:
+    T = T' - M(origin), где M - линейная часть преобразования.
+    """
+    x = np.array(x_centered, dtype=float)
+    x[:3] -= helmert_design_matrix(origin)[:, 3:] @ x[3:]
+    return x
+
+
+# Весовые функции робастного уточнения (IRLS) и их константы настройки
+LOSS_HUBER = "huber"
+LOSS_TUKEY = "tukey"
+LOSS_CONSTANTS = {LOSS_HUBER: 1.345, LOSS_TUKEY: 4.685}
+
+# Предел памяти на одну пачку гипотез RANSAC (элементов массива невязок K×N×3)
+RANSAC_BATCH_ELEMENTS = 4_000_000
+
+
+def _solve_helmert_weighted(src, tgt, weights=None):
+    """
+    Взвешенное решение Гельмерта по центрированным координатам. Возвращает вектор решения.
+    """
+    if weights is None:
+        weights = np.ones(len(src))
+    origin = np.average(src, axis=0, weights=weights)
+    A = helmert_design_matrix(src - origin)
+    L = (tgt - src).ravel()
+    w = np.repeat(weights, 3)
+    x = np.linalg.solve(A.T @ (A * w[:, None]), A.T @ (L * w))
+    return helmert_uncenter(x, origin)
+
+
+def _helmert_residual_norms(src, tgt, x):
+    """
+    Длины векторов невязок (м) для вектора решения x.
+    """
+    v = (tgt - src).ravel() - helmert_design_matrix(src) @ x
+    return np.linalg.norm(v.reshape(-1, 3), axis=1)
+
+
+def _score_hypotheses(src, tgt, samples, threshold):
+    """
+    Пакетная оценка гипотез RANSAC по минимальным выборкам из 3 точек.
+    samples: массив индексов K×3. Возвращает (стоимость MSAC, векторы решения K×7);
+    для вырожденных выборок стоимость равна inf.
+    """
+    p = src[samples]  # K×3×3
+    q = tgt[samples]
+    origin = p.mean(axis=1)
+    pc = p - origin[:, None, :]
+
+    # Вырожденные (почти коллинеарные) тройки отбрасываются
+    cross = np.cross(pc[:, 1] - pc[:, 0], pc[:, 2] - pc[:, 0])
+    edge2 = np.max(np.sum((pc - np.roll(pc, 1, axis=1)) ** 2, axis=2), axis=1)
+    degenerate = np.linalg.norm(cross, axis=1) < 1e-6 * np.maximum(edge2, 1e-12)
+
+    k = len(samples)
+    A = helmert_design_matrix(pc.reshape(-1, 3)).reshape(k, 9, 7)
+    L = (q - p).reshape(k, 9)
+    normal = np.einsum("kij,kil->kjl", A, A)
+    rhs = np.einsum("kij,ki->kj", A, L)
+    normal[degenerate] = np.eye(7)
+    x = np.linalg.solve(normal, rhs[:, :, None])[:, :, 0]
+
+    # Возврат к исходному началу координат: T = T' - M(origin)
+    wx, wy, wz, m = x[:, 3], x[:, 4], x[:, 5], x[:, 6]
+    M = np.empty((k, 3, 3))
+    M[:, 0, 0], M[:, 0, 1], M[:, 0, 2] = m, wz, -wy
+    M[:, 1, 0], M[:, 1, 1], M[:, 1, 2] = -wz, m, wx
+    M[:, 2, 0], M[:, 2, 1], M[:, 2, 2] = wy, -wx, m
+    x[:, :3] -= np.einsum("kij,kj->ki", M, origin)
+
+    # Невязки всех точек для всех гипотез: K×N×3
+    residuals = (tgt - src)[None, :, :] - x[:, None, :3] - np.einsum("kij,nj->kni", M, src)
+    r2 = np.sum(residuals ** 2, axis=2)
+    cost = np.sum(np.minimum(r2, threshold ** 2), axis=1)
+    cost[degenerate] = np.inf
+    return cost, x
+
+
+# Перевод элементов вектора решения в единицы словаря параметров (м, угл. сек, ppm)
+HELMERT_PARAM_KEYS = ("Tx", "Ty", "Tz", "Rx", "Ry", "Rz", "Scale_ppm")
+HELMERT_UNIT_FACTORS = np.array([1.0, 1.0, 1.0,
+                                 np.degrees(1.0) * 3600, np.degrees(1.0) * 3600, np.degrees(1.0) * 3600,
+                                 1e6])
+
+
+class HelmertAccumulator:
+    """
+    Потоковая оценка 7 параметров Гельмерта: по частям накапливаются
+    нормальная матрица 7×7, вектор правых частей и сумма квадратов L,
+    поэтому память не зависит от числа точек.
+
+    Использование:
+        acc = HelmertAccumulator()
+        for src_chunk, tgt_chunk in chunks:
+            acc.partial_fit(src_chunk, tgt_chunk)
+        params = acc.solve()
+        acc.variance, acc.covariance, acc.std
+
+    Координаты центрируются относительно центра первого блока.
+    """
+
+    def __init__(self):
+        self.origin = None
+        self.normal = np.zeros((7, 7))
+        self.rhs = np.zeros(7)
+        self.ll = 0.0
+        self.n_points = 0
+
+        # Заполняются в solve()
+        self.variance = None    # Апостериорная дисперсия единицы веса (м²)
+        self.covariance = None  # Ковариационная матрица параметров в единицах HELMERT_PARAM_KEYS
+        self.std = None         # СКО параметров по ключам HELMERT_PARAM_KEYS
+
+    def partial_fit(self, source_chunk, target_chunk):
+        """
+        Добавление блока соответственных точек (массивы N×3).
+        """
+        src = np.asarray(source_chunk, dtype=float).reshape(-1, 3)
+        tgt = np.asarray(target_chunk, dtype=float).reshape(-1, 3)
+        if len(src) != len(tgt):
+            raise ValueError("Количество исходных и целевых точек в блоке не совпадает")
+        if len(src) == 0:
+            return self
+
+        if self.origin is None:
+            self.origin = src.mean(axis=0)
+
+        A = helmert_design_matrix(src - self.origin)
+        L = (tgt - src).ravel()
+        self.normal += A.T @ A
+        self.rhs += A.T @ L
+        self.ll += float(L @ L)
+        self.n_points += len(src)
+        return self
+
+    def solve(self):
+        """
+        Решение накопленной системы. Возвращает словарь параметров, как calculate_helmert.
+        """
+        if self.n_points < 3:
+            raise ValueError("Нужно минимум 3 точки для оценки 7 параметров")
+
+        try:
+            normal_inv = np.linalg.inv(self.normal)
+        except np.linalg.LinAlgError:
+            raise ValueError("Вырожденная геометрия точек: параметры Гельмерта не определяются")
+
+        x_centered = normal_inv @ self.rhs
+
+        # V^T V = L^T L - x^T A^T L
+        vtv = max(self.ll - float(x_centered @ self.rhs), 0.0)
+        dof = 3 * self.n_points - 7
+        self.variance = vtv / dof if dof > 0 else float("nan")
+
+        # Переход от центрированных параметров: T = T' - M(origin) - линейный
+        jac = np.eye(7)
+        jac[:3, 3:] = -helmert_design_matrix(self.origin)[:, 3:]
+        covariance = jac @ (self.variance * normal_inv) @ jac.T
+        self.covariance = covariance * np.outer(HELMERT_UNIT_FACTORS, HELMERT_UNIT_FACTORS)
+        self.std = dict(zip(HELMERT_PARAM_KEYS, np.sqrt(np.diag(self.covariance))))
+
+        result = helmert_params_from_vector(helmert_uncenter(x_centered, self.origin))
+        logger.info(f"Рассчитаны параметры Хельмерта по {self.n_points} точкам (потоково): {result}, "
+                    f"sigma0={np.sqrt(self.variance):.4f} м")
+        return result
+
 
 class ParameterEstimator:
-    def calculate_helmert(self, source_coords, target_coords):
+    def calculate_helmert(self, source_coords, target_coords, solver=SOLVER_LSTSQ):
         """
         Расчет 7 параметров (Tx, Ty, Tz, Rx, Ry, Rz, m) для преобразования источника в цель.
+        solver: "lstsq" - SVD-решение по полной матрице плана (по умолчанию);
+                "normal" - нормальные уравнения 7×7; "qr" - QR-разложение.
+                Для "normal" и "qr" координаты центрируются, чтобы не терять точность
+                на геоцентрических величинах порядка 1e6 м.
         """
         try:
-            n = len(source_coords)
+            src = np.asarray(source_coords, dtype=float).reshape(-1, 3)
+            tgt = np.asarray(target_coords, dtype=float).reshape(-1, 3)
+            n = len(src)
             if n < 3:
                 raise ValueError("Нужно минимум 3 точки для оценки 7 параметров")
-                
-            A = np.zeros((3 * n, 7))
-            L = np.zeros((3 * n))
-            
-            for i in range(n):
-                src = source_coords[i] # Xs, Ys, Zs
-                tgt = target_coords[i] # Xt, Yt, Zt
-                
-                X, Y, Z = src
-                
-                # L = Цель - Источник
-                L[3*i]     = tgt[0] - src[0]
-                L[3*i + 1] = tgt[1] - src[1]
-                L[3*i + 2] = tgt[2] - src[2]
-                
-                # Коэффициенты для Tx, Ty, Tz
-                A[3*i, 0] = 1
-                A[3*i + 1, 1] = 1
-                A[3*i + 2, 2] = 1
-                
-                # Коэффициенты для wx (Rx)
-                A[3*i, 3] = 0
-                A[3*i + 1, 3] = Z
-                A[3*i + 2, 3] = -Y
-                
-                # Коэффициенты для wy (Ry)
-                A[3*i, 4] = -Z
-                A[3*i + 1, 4] = 0
-                A[3*i + 2, 4] = X
-                
-                # Коэффициенты для wz (Rz)
-                A[3*i, 5] = Y
-                A[3*i + 1, 5] = -X
-                A[3*i + 2, 5] = 0
-                
-                # Коэффициенты для m (Масштаб)
-                A[3*i, 6] = X
-                A[3*i + 1, 6] = Y
-                A[3*i + 2, 6] = Z
-                
-            # Решение нормальных уравнений
-            x, residuals, rank, s = np.linalg.lstsq(A, L, rcond=None)
-            
-            # Извлечение параметров
-            Tx, Ty, Tz = x[0], x[1], x[2]
-            Rx_rad, Ry_rad, Rz_rad = x[3], x[4], x[5]
-            m = x[6]
-            
-            # Преобразование вращений в угловые секунды
-            Rx_sec = np.degrees(Rx_rad) * 3600
-            Ry_sec = np.degrees(Ry_rad) * 3600
-            Rz_sec = np.degrees(Rz_rad) * 3600
-            
-            Scale_ppm = m * 1e6
-            
-            result = {
-                "Tx": Tx, "Ty": Ty, "Tz": Tz,
-                "Rx": Rx_sec, "Ry": Ry_sec, "Rz": Rz_sec,
-                "Scale_ppm": Scale_ppm
-            }
+            if len(tgt) != n:
+                raise ValueError("Количество исходных и целевых точек не совпадает")
+
+            # L = Цель - Источник
+            L = (tgt - src).ravel()
+
+            if solver == SOLVER_LSTSQ:
+                A = helmert_design_matrix(src)
+                x, residuals, rank, s = np.linalg.lstsq(A, L, rcond=None)
+            elif solver in (SOLVER_NORMAL, SOLVER_QR):
+                origin = src.mean(axis=0)
+                A = helmert_design_matrix(src - origin)
+                if solver == SOLVER_NORMAL:
+                    # Решение нормальных уравнений
+                    x = np.linalg.solve(A.T @ A, A.T @ L)
+                else:
+                    Q, R = np.linalg.qr(A)
+                    x = np.linalg.solve(R, Q.T @ L)
+                x = helmert_uncenter(x, origin)
+            else:
+                raise ValueError(f"Неизвестный способ решения: {solver}")
+
+            result = helmert_params_from_vector(x)
             logger.info(f"Рассчитаны параметры Хельмерта: {result}")
             return result
         except Exception as e:
             logger.exception("Ошибка в calculate_helmert")
             raise
 
+    def calculate_helmert_streaming(self, chunks):
+        """
+        Расчет параметров Гельмерта по итератору блоков (source_chunk, target_chunk)
+        без загрузки всех точек в память. Возвращает (параметры, HelmertAccumulator)
+        со статистикой точности.
+        """
+        try:
+            accumulator = HelmertAccumulator()
+            for source_chunk, target_chunk in chunks:
+                accumulator.partial_fit(source_chunk, target_chunk)
+            return accumulator.solve(), accumulator
+        except Exception as e:
+            logger.exception("Ошибка в calculate_helmert_streaming")
+            raise
+
+    def calculate_helmert_robust(self, source_coords, target_coords, threshold=None, n_hypotheses=None,
+                                 loss=LOSS_HUBER, max_workers=None, seed=None, irls_iterations=20):
+        """
+        Робастный расчет параметров Гельмерта при наличии грубых ошибок.
+        1. RANSAC: гипотезы по минимальным выборкам из 3 точек решаются и оцениваются
+           пакетно (MSAC), пачки распределяются по пулу потоков.
+        2. IRLS: итеративно перевзвешенное уточнение по весовой функции Хьюбера или Тьюки.
+        threshold: порог невязки для инлайеров (м), по умолчанию estimator.robust_threshold.
+        n_hypotheses: число гипотез; если все тройки точек помещаются в этот лимит, перебираются все.
+        Возвращает (параметры, маска инлайеров).
+        """
+        try:
+            src = np.asarray(source_coords, dtype=float).reshape(-1, 3)
+            tgt = np.asarray(target_coords, dtype=float).reshape(-1, 3)
+            n = len(src)
+            if n < 3:
+                raise ValueError("Нужно минимум 3 точки для оценки 7 параметров")
+            if len(tgt) != n:
+                raise ValueError("Количество исходных и целевых точек не совпадает")
+            if loss not in LOSS_CONSTANTS:
+                raise ValueError(f"Неизвестная весовая функция: {loss}")
+
+            threshold = float(threshold if threshold is not None else config.get("estimator.robust_threshold", 0.1))
+            if not threshold > 0:
+                raise ValueError(f"Порог невязки для инлайеров должен быть положительным: {threshold}")
+            n_hypotheses = int(n_hypotheses or config.get("estimator.ransac_hypotheses", 2000))
+            max_workers = max_workers or os.cpu_count() or 1
+
+            # --- RANSAC ---
+            if comb(n, 3) <= n_hypotheses:
+                samples = np.array(list(combinations(range(n), 3)))
+            else:
+                rng = np.random.default_rng(seed)
+                samples = rng.integers(0, n, size=(n_hypotheses, 3))
+                repeated = (samples[:, 0] == samples[:, 1]) | (samples[:, 1] == samples[:, 2]) | (samples[:, 0] == samples[:, 2])
+                samples = samples[~repeated]
+
+            batch = max(1, RANSAC_BATCH_ELEMENTS // (3 * n))
+            batches = [samples[i:i + batch] for i in range(0, len(samples), batch)]
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                scored = list(pool.map(lambda s: _score_hypotheses(src, tgt, s, threshold), batches))
+
+            costs = np.concatenate([c for c, _ in scored])
+            solutions = np.concatenate([x for _, x in scored])
+            best = int(np.argmin(costs))
+            if not np.isfinite(costs[best]):
+                raise ValueError("Вырожденная геометрия точек: параметры Гельмерта не определяются")
+
+            inliers = _helmert_residual_norms(src, tgt, solutions[best]) < threshold
+            if np.count_nonzero(inliers) < 3:
+                raise ValueError("Недостаточно точек, согласованных с моделью (нужно минимум 3)")
+            logger.debug(f"RANSAC: {len(samples)} гипотез, инлайеров {np.count_nonzero(inliers)} из {n}")
+
+            # --- IRLS ---
+            x = _solve_helmert_weighted(src[inliers], tgt[inliers])
+            c = LOSS_CONSTANTS[loss]
+            # Масштаб невязок фиксируется по консенсусу RANSAC (MAD), но граница c*sigma
+            # не уже порога инлайеров - иначе при почти нулевых невязках веса "разгоняются"
+            r = _helmert_residual_norms(src, tgt, x)
+            sigma = max(1.4826 * np.median(r[inliers]), threshold / c)
+            for _ in range(irls_iterations):
+                r = _helmert_residual_norms(src, tgt, x)
+                u = r / (c * sigma)
+                if loss == LOSS_HUBER:
+                    weights = np.where(u <= 1.0, 1.0, 1.0 / np.maximum(u, 1e-12))
+                else:
+                    weights = np.where(u < 1.0, (1.0 - u ** 2) ** 2, 0.0)
+                if np.count_nonzero(weights) < 3:
+                    break
+                x_new = _solve_helmert_weighted(src, tgt, weights)
+                converged = np.allclose(x_new, x, rtol=0, atol=1e-12)
+                x = x_new
+                if converged:
+                    break
+
+            inliers = _helmert_residual_norms(src, tgt, x) < threshold
+            result = helmert_params_from_vector(x)
+            logger.info(f"Рассчитаны робастные параметры Хельмерта ({loss}): {result}, "
+                        f"инлайеров {np.count_nonzero(inliers)} из {n}")
+            return result, inliers
+        except Exception as e:
+            logger.exception("Ошибка в calculate_helmert_robust")
+            raise
+
+    def cross_validate_helmert(self, source_coords, target_coords, folds=None, seed=None):
+        """
+        Перекрестная проверка модели Гельмерта без повторных решений.
+        folds=None - исключение по одной точке (leave-one-out), иначе k-fold с folds группами.
+        Невязка прогноза для группы точек S получается из невязок общего решения:
+            e_S(cv) = (I - H_SS)^-1 * e_S,  H = A (A^T A)^-1 A^T,
+        для leave-one-out это пакетное решение N систем 3×3 по диагональным блокам H,
+        для k-fold - по тождеству Вудбери через систему 7×7 на группу:
+            e_S(cv) = e_S + A_S (A^T A - A_S^T A_S)^-1 A_S^T e_S.
+        Возвращает словарь: residuals (N×3, цель минус прогноз), fit_residuals (N×3),
+        rms, fit_rms (м) и folds (число групп).
+        """
+        try:
+            src = np.asarray(source_coords, dtype=float).reshape(-1, 3)
+            tgt = np.asarray(target_coords, dtype=float).reshape(-1, 3)
+            n = len(src)
+            if len(tgt) != n:
+                raise ValueError("Количество исходных и целевых точек не совпадает")
+
+            k = n if folds is None else int(folds)
+            if k < 2 or k > n:
+                raise ValueError(f"Число групп должно быть от 2 до {n}")
+            # После исключения группы должно остаться минимум 3 точки
+            if n - int(np.ceil(n / k)) < 3:
+                raise ValueError("Недостаточно точек для перекрестной проверки")
+
+            origin = src.mean(axis=0)
+            A = helmert_design_matrix(src - origin)
+            L = (tgt - src).ravel()
+            N = A.T @ A
+            # G = A (A^T A)^-1, тогда блоки матрицы проекции H_SS = G_S A_S^T
+            G = np.linalg.solve(N, A.T).T
+            e = L - G @ (A.T @ L)
+
+            if k == n:
+                A3 = A.reshape(n, 3, 7)
+                G3 = G.reshape(n, 3, 7)
+                H = np.einsum("nij,nkj->nik", G3, A3)
+                cv = np.linalg.solve(np.eye(3) - H, e.reshape(n, 3, 1))[:, :, 0]
+            else:
+                order = np.random.default_rng(seed).permutation(n)
+                cv = np.empty((n, 3))
+                for fold in np.array_split(order, k):
+                    rows = (3 * fold[:, None] + np.arange(3)).ravel()
+                    A_s = A[rows]
+                    d = np.linalg.solve(N - A_s.T @ A_s, A_s.T @ e[rows])
+                    cv[fold] = (e[rows] + A_s @ d).reshape(-1, 3)
+
+            fit = e.reshape(n, 3)
+            result = {
+                "residuals": cv,
+                "fit_residuals": fit,
+                "rms": float(np.sqrt(np.mean(np.sum(cv ** 2, axis=1)))),
+                "fit_rms": float(np.sqrt(np.mean(np.sum(fit ** 2, axis=1)))),
+                "folds": k,
+            }
+            logger.info(f"Перекрестная проверка Хельмерта ({k} групп): "
+                        f"СКО прогноза {result['rms']:.4f} м, СКО уравнивания {result['fit_rms']:.4f} м")
+            return result
+        except np.linalg.LinAlgError as e:
+            logger.exception("Ошибка в cross_validate_helmert")
+            raise ValueError("Вырожденная геометрия точек: перекрестная проверка невозможна") from e
+        except Exception as e:
+            logger.exception("Ошибка в cross_validate_helmert")
+            raise
+
     def apply_helmert(self, source_coords, params):
         """
         Применение рассчитанных параметров к исходным координатам для проверки.
         """
         try:
-            Tx, Ty, Tz = params["Tx"], params["Ty"], params["Tz"]
-            m = params["Scale_ppm"] * 1e-6
-            wx = np.radians(params["Rx"] / 3600)
-            wy = np.radians(params["Ry"] / 3600)
-            wz = np.radians(params["Rz"] / 3600)
-            
-            transformed = []
-            for src in source_coords:
-                X, Y, Z = src
-                
-                # X_new = X + Tx + m*X + wz*Y - wy*Z
-                X_t = X + Tx + m*X + wz*Y - wy*Z
-                
-                # Y_new = Y + Ty - wz*X + m*Y + wx*Z
-                Y_t = Y + Ty - wz*X + m*Y + wx*Z
-                
-                # Z_new = Z + Tz + wy*X - wx*Y + m*Z
-                Z_t = Z + Tz + wy*X - wx*Y + m*Z
-                
-                transformed.append([X_t, Y_t, Z_t])
+            src = np.asarray(source_coords, dtype=float).reshape(-1, 3)
+            Tx, Ty, Tz, wx, wy, wz, m = helmert_vector_from_params(params)
+
+            # X_new = X + Tx + m*X + wz*Y - wy*Z
+            # Y_new = Y + Ty - wz*X + m*Y + wx*Z
+            # Z_new = Z + Tz + wy*X - wx*Y + m*Z
+            M = np.array([
+                [m, wz, -wy],
+                [-wz, m, wx],
+                [wy, -wx, m]
+            ])
+            transformed = src + np.array([Tx, Ty, Tz]) + src @ M.T
             
-            logger.debug(f"Применена трансформация Хельмерта к {len(source_coords)} точкам")
-            return np.array(transformed)
+            logger.debug(f"Применена трансформация Хельмерта к {len(src)} точкам")
+            return transformed
         except Exception as e:
             logger.exception("Ошибка в apply_helmert")
             raise
@@ -163,105 +528,189 @@ class ParameterEstimator:
             logger.exception("Ошибка генерации WKT")
             raise
 
-    def estimate_projection_parameters(self, wgs_points, msk_points, fixed_scale=True):
+    def estimate_projection_parameters(self, wgs_points, msk_points, fixed_scale=True, method=None):
         """
         Оценка параметров проекции (CM, Scale, FE, FN) по набору точек.
         wgs_points: список [lat, lon, h]
         msk_points: список [x, y, h]
         fixed_scale: если True, масштаб фиксируется равным 1.0 (для ГК/МСК).
+        method: "lm" - наименьшие квадраты по вектору невязок (Левенберг-Марквардт),
+                FE/FN (и масштаб) исключаются в замкнутом виде;
+                "nelder-mead" - двухэтапный симплекс-метод.
+                По умолчанию берется из настройки estimator.projection_method.
+        Помимо параметров возвращает method, iterations, elapsed (с) и rms (м).
         """
+        method = method or config.get("estimator.projection_method", METHOD_LM)
         try:
-            wgs_points = np.array(wgs_points)
-            msk_points = np.array(msk_points)
-            
-            # Начальные приближения
-            avg_lon = np.mean(wgs_points[:, 1])
-            
-            # Предварительная оценка FE/FN
-            # Проецируем с FE=0, FN=0, Scale=1
-            proj_str_init = (f"+proj=tmerc +lat_0=0 +lon_0={avg_lon} "
-                             f"+k=1.0 +x_0=0 +y_0=0 "
-                             f"+ellps=krass +units=m +no_defs")
-            crs_msk_init = CRS.from_proj4(proj_str_init)
-            crs_wgs = CRS.from_epsg(4326)
-            transformer_init = Transformer.from_crs(crs_wgs, crs_msk_init, always_xy=True)
-            
-            xs_init, ys_init = transformer_init.transform(wgs_points[:, 1], wgs_points[:, 0])
-            
-            # FE = Mean(MSK_Easting - Proj_Easting)
-            fe_guess = np.mean(msk_points[:, 1] - xs_init)
-            # FN = Mean(MSK_Northing - Proj_Northing)
-            fn_guess = np.mean(msk_points[:, 0] - ys_init)
-            
-            initial_guess = [avg_lon, fe_guess, fn_guess] # CM, FE, FN
-            
-            logger.debug(f"Начальные приближения: {initial_guess}, Fixed Scale: {fixed_scale}")
-            
-            # Целевая функция для минимизации (общая)
-            def objective(params):
-                if len(params) == 3:
-                    cm, fe, fn = params
-                    scale = 1.0
-                else:
-                    cm, scale, fe, fn = params
-                
-                # Ограничение на масштаб
-                if scale <= 1e-4:
-                    return 1e20
-                
-                try:
-                    # Создаем временную проекцию
-                    proj_str = (f"+proj=tmerc +lat_0=0 +lon_0={cm} "
-                               f"+k={scale} +x_0={fe} +y_0={fn} "
-                               f"+ellps=krass +units=m +no_defs")
-                    crs_msk = CRS.from_proj4(proj_str)
-                    transformer = Transformer.from_crs(crs_wgs, crs_msk, always_xy=True)
-                    
-                    # Проецируем все точки
-                    lons = wgs_points[:, 1]
-                    lats = wgs_points[:, 0]
-                    
-                    xs, ys = transformer.transform(lons, lats)
-                    
-                    # Считаем невязки
-                    diff_easting = xs - msk_points[:, 1] 
-                    diff_northing = ys - msk_points[:, 0]
-                    
-                    return np.sum(diff_easting**2 + diff_northing**2)
-                except Exception:
-                    return 1e20
-
-            # Этап 1: Оптимизация CM, FE, FN (Scale=1.0)
-            logger.debug("Запуск оптимизации (Scale=1.0)...")
-            res1 = minimize(objective, initial_guess, method='Nelder-Mead', options={'maxiter': 1000})
-            
-            if not res1.success:
-                logger.warning(f"Оптимизация (Scale=1.0) не сошлась: {res1.message}")
-            
-            cm, fe, fn = res1.x
-            scale = 1.0
-            
-            # Этап 2: Если scale не фиксирован, оптимизируем все параметры
-            if not fixed_scale:
-                initial_guess_2 = [cm, 1.0, fe, fn]
-                logger.debug("Запуск 2 этапа оптимизации (все параметры)...")
-                res2 = minimize(objective, initial_guess_2, method='Nelder-Mead', options={'maxiter': 1000})
-                
-                if not res2.success:
-                    logger.warning(f"Оптимизация (все параметры) не сошлась: {res2.message}")
-                
-                cm, scale, fe, fn = res2.x
+            wgs_points = np.array(wgs_points, dtype=float)
+            msk_points = np.array(msk_points, dtype=float)
+            lats = wgs_points[:, 0]
+            lons = wgs_points[:, 1]
+            northing = msk_points[:, 0]
+            easting = msk_points[:, 1]
+
+            start = time.perf_counter()
+            if method == METHOD_LM:
+                cm, scale, fe, fn, iterations = self._estimate_projection_lm(lats, lons, northing, easting, fixed_scale)
+            elif method == METHOD_NELDER_MEAD:
+                cm, scale, fe, fn, iterations = self._estimate_projection_nelder_mead(lats, lons, northing, easting, fixed_scale)
+            else:
+                raise ValueError(f"Неизвестный метод оценки проекции: {method}")
+            elapsed = time.perf_counter() - start
+
+            n_pred, e_pred = TransverseMercator(cm, scale, fe, fn).forward(lats, lons)
+            rms = float(np.sqrt(np.mean((n_pred - northing) ** 2 + (e_pred - easting) ** 2)))
 
             logger.info(f"Оцененные параметры проекции: CM={cm}, Scale={scale}, FE={fe}, FN={fn}")
+            logger.info(f"Оценка проекции ({method}): итераций {iterations}, время {elapsed * 1000:.1f} мс, RMS {rms:.4f} м")
             
             return {
                 "central_meridian": cm,
                 "scale_factor": scale,
                 "false_easting": fe,
-                "false_northing": fn
+                "false_northing": fn,
+                "method": method,
+                "iterations": iterations,
+                "elapsed": elapsed,
+                "rms": rms
             }
             
         except Exception as e:
             logger.exception("Ошибка при оценке параметров проекции")
             raise
 
+    def _solve_linear_projection(self, x_unit, y_unit, northing, easting, fixed_scale):
+        """
+        Решение в замкнутом виде для линейно входящих параметров при фиксированном CM:
+        Northing = k * x_unit + FN, Easting = k * y_unit + FE.
+        Возвращает (k, FE, FN, невязки, центрированная модель).
+        """
+        xc = x_unit - x_unit.mean()
+        yc = y_unit - y_unit.mean()
+        nc = northing - northing.mean()
+        ec = easting - easting.mean()
+
+        if fixed_scale:
+            k = 1.0
+        else:
+            k = (np.dot(xc, nc) + np.dot(yc, ec)) / (np.dot(xc, xc) + np.dot(yc, yc))
+
+        fn = northing.mean() - k * x_unit.mean()
+        fe = easting.mean() - k * y_unit.mean()
+        residuals = np.concatenate((nc - k * xc, ec - k * yc))
+        model = np.concatenate((xc, yc))
+        return k, fe, fn, residuals, model
+
+    def _estimate_projection_lm(self, lats, lons, northing, easting, fixed_scale):
+        """
+        Метод переменной проекции: нелинейно ищется только осевой меридиан,
+        масштаб и FE/FN для каждого кандидата вычисляются в замкнутом виде.
+        """
+        def reduced(params):
+            tm = TransverseMercator(params[0])
+            x_unit, y_unit, jac = tm.forward_with_jacobian(lats, lons)
+            k, fe, fn, residuals, model = self._solve_linear_projection(x_unit, y_unit, northing, easting, fixed_scale)
+            return k, fe, fn, residuals, model, jac
+
+        def fun(params):
+            return reduced(params)[3]
+
+        def jac(params):
+            k, _, _, _, model, jac_tm = reduced(params)
+            # Производная невязок по CM с исключенными FE/FN (центрирование)
+            d_model = np.concatenate((jac_tm[:, 0, 0], jac_tm[:, 1, 0]))
+            half = len(lats)
+            d_model[:half] -= d_model[:half].mean()
+            d_model[half:] -= d_model[half:].mean()
+            column = -k * d_model
+            if not fixed_scale:
+                # Приближение Кауфмана: проекция на дополнение к модельному столбцу масштаба
+                norm2 = np.dot(model, model)
+                if norm2 > 0:
+                    column -= model * (np.dot(model, column) / norm2)
+            return column[:, None]
+
+        # scipy загружается при первом расчете, а не при запуске приложения
+        from scipy.optimize import least_squares
+
+        initial_cm = float(np.mean(lons))
+        logger.debug(f"Начальное приближение CM: {initial_cm}, Fixed Scale: {fixed_scale}")
+
+        res = least_squares(fun, [initial_cm], jac=jac, method="lm", xtol=1e-15, ftol=1e-15, gtol=1e-15)
+        if not res.success:
+            logger.warning(f"Оптимизация (LM) не сошлась: {res.message}")
+
+        cm = float(res.x[0])
+        scale, fe, fn = reduced(res.x)[:3]
+        # Число шагов LM - вычислений якобиана (nfev включает пробные шаги), как nit у Нелдера-Мида
+        return cm, float(scale), float(fe), float(fn), int(res.njev)
+
+    def _estimate_projection_nelder_mead(self, lats, lons, northing, easting, fixed_scale):
+        """
+        Двухэтапная оптимизация симплекс-методом Нелдера-Мида по сумме квадратов невязок.
+        """
+        from scipy.optimize import minimize
+
+        # Начальные приближения
+        avg_lon = np.mean(lons)
+        
+        # Предварительная оценка FE/FN
+        # Проецируем с FE=0, FN=0, Scale=1
+        ys_init, xs_init = TransverseMercator(avg_lon).forward(lats, lons)
+        
+        # FE = Mean(MSK_Easting - Proj_Easting)
+        fe_guess = np.mean(easting - xs_init)
+        # FN = Mean(MSK_Northing - Proj_Northing)
+        fn_guess = np.mean(northing - ys_init)
+        
+        initial_guess = [avg_lon, fe_guess, fn_guess] # CM, FE, FN
+        
+        logger.debug(f"Начальные приближения: {initial_guess}, Fixed Scale: {fixed_scale}")
+        
+        # Целевая функция для минимизации (общая)
+        def objective(params):
+            if len(params) == 3:
+                cm, fe, fn = params
+                scale = 1.0
+            else:
+                cm, scale, fe, fn = params
+            
+            # Ограничение на масштаб
+            if scale <= 1e-4:
+                return 1e20
+            
+            # Проецируем все точки
+            ys, xs = TransverseMercator(cm, scale, fe, fn).forward(lats, lons)
+            if not (np.all(np.isfinite(xs)) and np.all(np.isfinite(ys))):
+                return 1e20
+            
+            # Считаем невязки
+            diff_easting = xs - easting
+            diff_northing = ys - northing
+            
+            return np.sum(diff_easting**2 + diff_northing**2)
+
+        # Этап 1: Оптимизация CM, FE, FN (Scale=1.0)
+        logger.debug("Запуск оптимизации (Scale=1.0)...")
+        res1 = minimize(objective, initial_guess, method='Nelder-Mead', options={'maxiter': 1000})
+        
+        if not res1.success:
+            logger.warning(f"Оптимизация (Scale=1.0) не сошлась: {res1.message}")
+        
+        cm, fe, fn = res1.x
+        scale = 1.0
+        iterations = res1.nit
+        
+        # Этап 2: Если scale не фиксирован, оптимизируем все параметры
+        if not fixed_scale:
+            initial_guess_2 = [cm, 1.0, fe, fn]
+            logger.debug("Запуск 2 этапа оптимизации (все параметры)...")
+            res2 = minimize(objective, initial_guess_2, method='Nelder-Mead', options={'maxiter': 1000})
+            
+            if not res2.success:
+                logger.warning(f"Оптимизация (все параметры) не сошлась: {res2.message}")
+            
+            cm, scale, fe, fn = res2.x
+            iterations += res2.nit
+
+        return float(cm), float(scale), float(fe), float(fn), int(iterations)
@@ -0,0 +1,108 @@
+import numpy as np
+from collections import namedtuple
+
+
+class Ellipsoid(namedtuple("Ellipsoid", ["name", "a", "f"])):
+    """
+    Эллипсоид: большая полуось a (м) и сжатие f.
+    """
+
+    @property
+    def b(self):
+        return self.a * (1.0 - self.f)
+
+    @property
+    def e2(self):
+        # Квадрат первого эксцентриситета
+        return self.f * (2.0 - self.f)
+
+    @property
+    def ep2(self):
+        # Квадрат второго эксцентриситета
+        return self.e2 / (1.0 - self.e2)
+
+
+WGS84 = Ellipsoid("WGS84", 6378137.0, 1 / 298.257223563)
+KRASSOVSKY = Ellipsoid("Krassovsky 1942", 6378245.0, 1 / 298.3)
+
+# Допуск итераций обратной задачи по широте (рад), ~6e-5 мм на поверхности Земли
+INVERSE_TOLERANCE = 1e-14
+INVERSE_MAX_ITER = 10
+
+
+def _as_points(points):
+    points = np.asarray(points, dtype=float)
+    if points.ndim == 1:
+        points = points.reshape(1, -1)
+    if points.shape[-1] != 3:
+        raise ValueError("Ожидается массив точек формы N×3")
+    return points
+
+
+def geodetic_to_geocentric(points, ellipsoid=WGS84):
+    """
+    Геодезические координаты (Lat, Lon в градусах, H в метрах), массив N×3,
+    в геоцентрические (X, Y, Z), массив N×3.
+    """
+    points = _as_points(points)
+    lat = np.radians(points[:, 0])
+    lon = np.radians(points[:, 1])
+    h = points[:, 2]
+
+    sin_lat = np.sin(lat)
+    cos_lat = np.cos(lat)
+    e2 = ellipsoid.e2
+    n = ellipsoid.a / np.sqrt(1.0 - e2 * sin_lat * sin_lat)
+
+    out = np.empty_like(points)
+    out[:, 0] = (n + h) * cos_lat * np.cos(lon)
+    out[:, 1] = (n + h) * cos_lat * np.sin(lon)
+    out[:, 2] = (n * (1.0 - e2) + h) * sin_lat
+    return out
+
+
+def geocentric_to_geodetic(points, ellipsoid=WGS84, tol=INVERSE_TOLERANCE, max_iter=INVERSE_MAX_ITER):
+    """
+    Геоцентрические координаты (X, Y, Z), массив N×3, в геодезические
+    (Lat, Lon в градусах, H в метрах), массив N×3.
+    Начальное приближение по Боурингу, уточнение итерациями до tol по широте.
+    """
+    points = _as_points(points)
+    x = points[:, 0]
+    y = points[:, 1]
+    z = points[:, 2]
+
+    a = ellipsoid.a
+    b = ellipsoid.b
+    e2 = ellipsoid.e2
+    ep2 = ellipsoid.ep2
+
+    p = np.hypot(x, y)
+    lon = np.arctan2(y, x)
+
+    # Приближение Боуринга (параметрическая широта)
+    theta = np.arctan2(z * a, p * b)
+    sin_t = np.sin(theta)
+    cos_t = np.cos(theta)
+    lat = np.arctan2(z + ep2 * b * sin_t ** 3, p - e2 * a * cos_t ** 3)
+
+    # Уточнение: phi = atan((Z + e2 * N * sin(phi)) / p)
+    for _ in range(max_iter):
+        sin_lat = np.sin(lat)
+        n = a / np.sqrt(1.0 - e2 * sin_lat * sin_lat)
+        lat_new = np.arctan2(z + e2 * n * sin_lat, p)
+        delta = np.max(np.abs(lat_new - lat)) if lat.size else 0.0
+        lat = lat_new
+        if delta < tol:
+            break
+
+    sin_lat = np.sin(lat)
+    cos_lat = np.cos(lat)
+    # Формула высоты, устойчивая на всех широтах (включая полюса)
+    h = p * cos_lat + z * sin_lat - a * np.sqrt(1.0 - e2 * sin_lat * sin_lat)
+
+    out = np.empty_like(points)
+    out[:, 0] = np.degrees(lat)
+    out[:, 1] = np.degrees(lon)
+    out[:, 2] = h
+    return out
@@ -0,0 +1,623 @@
+"""
+Сетка высот геоида (EGM2008) из GeoTIFF без GDAL и PROJ.
+
+Файл открывается один раз и отображается в память (mmap); тайлы (или полосы)
+распаковываются только при обращении к ним и хранятся в LRU-кэше.
+Поддерживаются TIFF и BigTIFF, сжатие deflate, предикторы 2 и 3 (как в сетках PROJ).
+Интерполяция высоты геоида N - векторная: билинейная (как vgridshift) или бикубическая.
+
+Для рабочих районов из сетки вырезаются региональные фрагменты (float32 .npy и заголовок .json)
+в ~/.GenWKT/geoid (или assets/geoid в сборке); точки внутри фрагмента считаются по нему.
+"""
+import json
+import mmap
+import re
+import struct
+import threading
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from src.config.loader import config
+from src.core.cache import ASSETS_DIR, LRUCache
+from src.core.logger import logger
+
+# Сетка EGM2008 из PROJ-data (1')
+EGM2008_GRID = "us_nga_egm2008_1.tif"
+
+# Наибольший фрагмент сетки (узлов), собираемый целиком под охват точек; больше - выборка по тайлам
+MAX_WINDOW_NODES = 4_000_000
+
+# Запас вокруг района при вырезании фрагмента сетки, градусы
+DEFAULT_SUBSET_PADDING = 0.5
+SUBSET_FORMAT = "genwkt-geoid-subset"
+SUBSET_DIR_NAME = "geoid"
+
+INTERPOLATION_BILINEAR = "bilinear"
+INTERPOLATION_BICUBIC = "bicubic"
+
+# Теги TIFF/GeoTIFF
+_TAG_IMAGE_WIDTH = 256
+_TAG_IMAGE_LENGTH = 257
+_TAG_BITS_PER_SAMPLE = 258
+_TAG_COMPRESSION = 259
+_TAG_STRIP_OFFSETS = 273
+_TAG_SAMPLES_PER_PIXEL = 277
+_TAG_ROWS_PER_STRIP = 278
+_TAG_STRIP_BYTE_COUNTS = 279
+_TAG_PREDICTOR = 317
+_TAG_TILE_WIDTH = 322
+_TAG_TILE_LENGTH = 323
+_TAG_TILE_OFFSETS = 324
+_TAG_TILE_BYTE_COUNTS = 325
+_TAG_SAMPLE_FORMAT = 339
+_TAG_MODEL_PIXEL_SCALE = 33550
+_TAG_MODEL_TIEPOINT = 33922
+_TAG_GEO_KEY_DIRECTORY = 34735
+_TAG_GDAL_METADATA = 42112
+_TAG_GDAL_NODATA = 42113
+
+_GEO_KEY_RASTER_TYPE = 1025
+_RASTER_PIXEL_IS_POINT = 2
+
+_COMPRESSION_NONE = 1
+_COMPRESSION_DEFLATE = (8, 32946)
+
+# Тип поля TIFF -> (формат struct, размер)
+_FIELD_TYPES = {
+    1: ("B", 1), 2: ("c", 1), 3: ("H", 2), 4: ("I", 4), 5: ("II", 8), 6: ("b", 1), 7: ("B", 1),
+    8: ("h", 2), 9: ("i", 4), 10: ("ii", 8), 11: ("f", 4), 12: ("d", 8), 16: ("Q", 8), 17: ("q", 8), 18: ("Q", 8),
+}
+
+# SampleFormat -> вид numpy (1 - целое без знака, 2 - со знаком, 3 - float)
+_SAMPLE_KINDS = {1: "u", 2: "i", 3: "f"}
+
+
+def _read_ifd(data, offset, byteorder, bigtiff):
+    """
+    Первый IFD: словарь тег -> кортеж значений (ASCII - строка).
+    """
+    count_format, entry_size, value_size = ("Q", 20, 8) if bigtiff else ("H", 12, 4)
+    (n_entries,) = struct.unpack_from(byteorder + count_format, data, offset)
+    offset += struct.calcsize(count_format)
+
+    tags = {}
+    for i in range(n_entries):
+        entry = offset + i * entry_size
+        tag, field_type = struct.unpack_from(byteorder + "HH", data, entry)
+        (count,) = struct.unpack_from(byteorder + ("Q" if bigtiff else "I"), data, entry + 4)
+        if field_type not in _FIELD_TYPES:
+            continue
+        fmt, size = _FIELD_TYPES[field_type]
+        value_offset = entry + (12 if bigtiff else 8)
+        if size * count > value_size:
+            (value_offset,) = struct.unpack_from(byteorder + ("Q" if bigtiff else "I"), data, value_offset)
+        if field_type == 2:
+            tags[tag] = bytes(data[value_offset:value_offset + count]).split(b"\0")[0].decode("latin-1")
+        else:
+            tags[tag] = struct.unpack_from(byteorder + fmt * count, data, value_offset)
+    return tags
+
+
+def _gdal_scale_offset(metadata):
+    """
+    Масштаб и смещение значений первого канала из GDAL_METADATA (как их применяет PROJ).
+    """
+    scale, offset = 1.0, 0.0
+    for item in re.finditer(r'<Item([^>]*)>([^<]*)</Item>', metadata or ""):
+        attrs, value = item.groups()
+        role = re.search(r'role="(\w+)"', attrs)
+        sample = re.search(r'sample="(\d+)"', attrs)
+        if role is None or (sample is not None and sample.group(1) != "0"):
+            continue
+        if role.group(1) == "scale":
+            scale = float(value)
+        elif role.group(1) == "offset":
+            offset = float(value)
+    return scale, offset
+
+
+class _NodeGrid:
+    """
+    Интерполяция по регулярной сетке узлов lat = lat0 + row * dlat, lon = lon0 + col * dlon.
+    Наследники задают width, height, wrap_columns и методы values_at/read_window.
+    """
+    wrap_columns = None
+
+    @property
+    def bounds(self):
+        """
+        (lat_min, lat_max, lon_min, lon_max) по узлам сетки.
+        """
+        lat_last = self.lat0 + (self.height - 1) * self.dlat
+        lon_last = self.lon0 + (self.width - 1) * self.dlon
+        return min(self.lat0, lat_last), max(self.lat0, lat_last), self.lon0, lon_last
+
+    def covers(self, lats, lons, margin=1):
+        """
+        Маска точек, для интерполяции которых хватает узлов сетки (с запасом margin узлов).
+        """
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        y, x = self._fractional_index(lats, lons)
+        inside = (y >= margin) & (y <= self.height - 1 - margin)
+        if self.wrap_columns is None:
+            inside &= (x >= margin) & (x <= self.width - 1 - margin)
+        return inside & np.isfinite(x)
+
+    def _fractional_index(self, lats, lons):
+        y = (lats - self.lat0) / self.dlat
+        x = (lons - self.lon0) / self.dlon
+        if self.wrap_columns is not None:
+            x = np.mod(x, self.wrap_columns)
+        return y, x
+
+    def _node_sampler(self, rows, cols, margin):
+        """
+        Функция (rows, cols) -> значения узлов для точек с опорными узлами rows/cols
+        (соседи - до margin узлов). Если охват точек невелик, фрагмент сетки читается
+        один раз, иначе значения выбираются по тайлам. Вне сетки - NaN.
+        """
+        window = None
+        if rows.size:
+            row0 = max(int(rows.min()) - margin, 0)
+            row1 = min(int(rows.max()) + margin + 1, self.height)
+            col0 = max(int(cols.min()) - margin, 0)
+            col1 = min(int(cols.max()) + margin + 1, self.width)
+            if row0 < row1 and col0 < col1 and (row1 - row0) * (col1 - col0) <= MAX_WINDOW_NODES:
+                window = self.read_window(row0, row1, col0, col1)
+
+        def sample(r, c):
+            if self.wrap_columns is not None:
+                c = np.mod(c, self.wrap_columns)
+            values = np.full(r.shape, np.nan)
+            if window is not None:
+                inside = (r >= row0) & (r < row1) & (c >= col0) & (c < col1)
+                values[inside] = window[r[inside] - row0, c[inside] - col0]
+            else:
+                inside = (r >= 0) & (r < self.height) & (c >= 0) & (c < self.width)
+                values[inside] = self.values_at(r[inside], c[inside])
+            return values
+
+        return sample
+
+    def interpolate(self, lats, lons, method=INTERPOLATION_BILINEAR):
+        """
+        Значения сетки в точках (lats, lons). Вне сетки и у NoData - NaN.
+        bicubic - кубическая свертка (Keys, a=-0.5) по 16 узлам; у края сетки недостающие
+        узлы заменяются ближайшими.
+        """
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        y, x = self._fractional_index(lats, lons)
+        valid = np.isfinite(y) & np.isfinite(x)
+        y = np.where(valid, y, -1.0)
+        x = np.where(valid, x, -1.0)
+        row = np.floor(y).astype(np.int64)
+        col = np.floor(x).astype(np.int64)
+        fy = y - row
+        fx = x - col
+
+        # Точка на последнем узле сетки: берется ячейка слева/сверху
+        last_row = (row == self.height - 1) & (fy == 0)
+        row[last_row] -= 1
+        fy[last_row] = 1.0
+        if self.wrap_columns is None:
+            last_col = (col == self.width - 1) & (fx == 0)
+            col[last_col] -= 1
+            fx[last_col] = 1.0
+
+        inside = valid & (row >= 0) & (row < self.height - 1)
+        if self.wrap_columns is None:
+            inside &= (col >= 0) & (col < self.width - 1)
+
+        if self.wrap_columns is not None:
+            col = np.mod(col, self.wrap_columns)
+        node_values = self._node_sampler(row[inside], col[inside], margin=2)
+
+        if method == INTERPOLATION_BILINEAR:
+            v00 = node_values(row, col)
+            v01 = node_values(row, col + 1)
+            v10 = node_values(row + 1, col)
+            v11 = node_values(row + 1, col + 1)
+            result = ((1 - fy) * ((1 - fx) * v00 + fx * v01) + fy * ((1 - fx) * v10 + fx * v11))
+        elif method == INTERPOLATION_BICUBIC:
+            wy = _cubic_weights(fy)
+            wx = _cubic_weights(fx)
+            result = np.zeros(np.shape(y))
+            for i in range(4):
+                r = np.clip(row + i - 1, 0, self.height - 1)
+                line = np.zeros(np.shape(y))
+                for j in range(4):
+                    c = col + j - 1
+                    if self.wrap_columns is None:
+                        c = np.clip(c, 0, self.width - 1)
+                    line += wx[j] * node_values(r, c)
+                result += wy[i] * line
+        else:
+            raise ValueError(f"Неизвестный метод интерполяции: {method}")
+
+        return np.where(inside, result, np.nan)
+
+
+class GeoTiffGrid(_NodeGrid):
+    """
+    Одноканальная географическая сетка GeoTIFF. Узел (row, col) имеет координаты
+    lat = lat0 + row * dlat, lon = lon0 + col * dlon (dlat обычно отрицательный).
+    Значения - float64 с примененными scale/offset; NoData -> NaN.
+    """
+
+    def __init__(self, path, tile_cache_size=None):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._parse_header()
+        except Exception:
+            self.close()
+            raise
+        self.tiles = LRUCache(tile_cache_size or config.get("geoid.tile_cache_size", 256))
+
+    def _parse_header(self):
+        data = self._data
+        byteorder = {b"II": "<", b"MM": ">"}.get(bytes(data[:2]))
+        if byteorder is None:
+            raise ValueError(f"Не TIFF-файл: {self.path}")
+        (version,) = struct.unpack_from(byteorder + "H", data, 2)
+        if version == 42:
+            bigtiff = False
+            (ifd_offset,) = struct.unpack_from(byteorder + "I", data, 4)
+        elif version == 43:
+            bigtiff = True
+            (ifd_offset,) = struct.unpack_from(byteorder + "Q", data, 8)
+        else:
+            raise ValueError(f"Неизвестная версия TIFF {version}: {self.path}")
+        tags = _read_ifd(data, ifd_offset, byteorder, bigtiff)
+
+        self.width = tags[_TAG_IMAGE_WIDTH][0]
+        self.height = tags[_TAG_IMAGE_LENGTH][0]
+        if tags.get(_TAG_SAMPLES_PER_PIXEL, (1,))[0] != 1:
+            raise ValueError(f"Поддерживаются только одноканальные сетки: {self.path}")
+
+        bits = tags.get(_TAG_BITS_PER_SAMPLE, (1,))[0]
+        kind = _SAMPLE_KINDS.get(tags.get(_TAG_SAMPLE_FORMAT, (1,))[0])
+        if kind is None or bits not in (8, 16, 32, 64):
+            raise ValueError(f"Неподдерживаемый тип значений сетки: {self.path}")
+        self.dtype = np.dtype(f"{byteorder}{kind}{bits // 8}")
+
+        self.compression = tags.get(_TAG_COMPRESSION, (_COMPRESSION_NONE,))[0]
+        if self.compression != _COMPRESSION_NONE and self.compression not in _COMPRESSION_DEFLATE:
+            raise ValueError(f"Неподдерживаемое сжатие TIFF ({self.compression}): {self.path}")
+        self.predictor = tags.get(_TAG_PREDICTOR, (1,))[0]
+        if self.predictor not in (1, 2, 3):
+            raise ValueError(f"Неподдерживаемый предиктор TIFF ({self.predictor}): {self.path}")
+
+        # Полосы обрабатываются как тайлы шириной во все изображение
+        if _TAG_TILE_OFFSETS in tags:
+            self.tile_width = tags[_TAG_TILE_WIDTH][0]
+            self.tile_height = tags[_TAG_TILE_LENGTH][0]
+            self._offsets = tags[_TAG_TILE_OFFSETS]
+            self._byte_counts = tags[_TAG_TILE_BYTE_COUNTS]
+        else:
+            self.tile_width = self.width
+            self.tile_height = min(tags.get(_TAG_ROWS_PER_STRIP, (self.height,))[0], self.height)
+            self._offsets = tags[_TAG_STRIP_OFFSETS]
+            self._byte_counts = tags[_TAG_STRIP_BYTE_COUNTS]
+        self.tiles_across = -(-self.width // self.tile_width)
+
+        # Привязка: масштаб пикселя и опорная точка; для PixelIsArea узел - центр пикселя
+        scale_x, scale_y = tags[_TAG_MODEL_PIXEL_SCALE][:2]
+        i, j, _, x, y, _ = tags[_TAG_MODEL_TIEPOINT][:6]
+        keys = tags.get(_TAG_GEO_KEY_DIRECTORY, ())
+        raster_type = None
+        for k in range(4, len(keys) - 3, 4):
+            if keys[k] == _GEO_KEY_RASTER_TYPE and keys[k + 1] == 0:
+                raster_type = keys[k + 3]
+        half = 0.0 if raster_type == _RASTER_PIXEL_IS_POINT else 0.5
+        self.dlon = scale_x
+        self.dlat = -scale_y
+        self.lon0 = x + (half - i) * scale_x
+        self.lat0 = y - (half - j) * scale_y
+
+        self.scale, self.offset = _gdal_scale_offset(tags.get(_TAG_GDAL_METADATA))
+        nodata = tags.get(_TAG_GDAL_NODATA)
+        self.nodata = float(nodata) if nodata not in (None, "") else None
+
+        # Глобальная по долготе сетка: столбцы повторяются с периодом 360°
+        period = 360.0 / self.dlon
+        self.wrap_columns = int(round(period)) if abs(period - round(period)) < 1e-6 and self.width >= round(period) else None
+
+    def _decode_tile(self, index):
+        start = self._offsets[index]
+        raw = self._data[start:start + self._byte_counts[index]]
+        if self.compression != _COMPRESSION_NONE:
+            raw = zlib.decompress(raw)
+
+        rows = self.tile_height
+        if self.tile_width == self.width:
+            # Последняя полоса может быть короче
+            rows = min(rows, self.height - (index * self.tile_height))
+        itemsize = self.dtype.itemsize
+
+        if self.predictor == 3:
+            # Плавающая точка: байты строки разложены по разрядам (старший первым) и продифференцированы
+            planes = np.frombuffer(raw, dtype=np.uint8, count=rows * self.tile_width * itemsize)
+            planes = np.cumsum(planes.reshape(rows, self.tile_width * itemsize), axis=1, dtype=np.uint8)
+            planes = planes.reshape(rows, itemsize, self.tile_width).transpose(0, 2, 1)
+            values = np.ascontiguousarray(planes).view(self.dtype.newbyteorder(">"))[..., 0]
+        else:
+            values = np.frombuffer(raw, dtype=self.dtype, count=rows * self.tile_width).reshape(rows, self.tile_width)
+            if self.predictor == 2:
+                values = np.cumsum(values, axis=1, dtype=self.dtype)
+
+        values = values.astype(np.float64)
+        if self.nodata is not None:
+            values[values == self.nodata] = np.nan
+        if self.scale != 1.0 or self.offset != 0.0:
+            values = values * self.scale + self.offset
+        return values
+
+    def tile(self, index):
+        """
+        Распакованный тайл (полоса) по номеру; хранится в LRU-кэше.
+        """
+        return self.tiles.get_or_create(index, lambda: self._decode_tile(index))
+
+    def values_at(self, rows, cols):
+        """
+        Значения узлов (rows, cols) - массивы индексов одинаковой формы внутри сетки.
+        Распаковываются только затронутые тайлы.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        result = np.empty(rows.shape, dtype=np.float64)
+        flat_rows, flat_cols, flat_result = rows.ravel(), cols.ravel(), result.reshape(-1)
+
+        tile_ids = (flat_rows // self.tile_height) * self.tiles_across + flat_cols // self.tile_width
+        order = np.argsort(tile_ids, kind="stable")
+        sorted_ids = tile_ids[order]
+        bounds = np.flatnonzero(np.diff(sorted_ids)) + 1
+        for group in np.split(order, bounds):
+            if not group.size:
+                continue
+            tile = self.tile(int(tile_ids[group[0]]))
+            flat_result[group] = tile[flat_rows[group] % self.tile_height, flat_cols[group] % self.tile_width]
+        return result
+
+    def read_window(self, row0, row1, col0, col1):
+        """
+        Прямоугольный фрагмент узлов [row0:row1, col0:col1] (внутри сетки),
+        собранный из покрывающих его тайлов.
+        """
+        window = np.empty((row1 - row0, col1 - col0), dtype=np.float64)
+        th, tw = self.tile_height, self.tile_width
+        for tile_row in range(row0 // th, -(-row1 // th)):
+            r0, r1 = max(row0, tile_row * th), min(row1, (tile_row + 1) * th)
+            for tile_col in range(col0 // tw, -(-col1 // tw)):
+                c0, c1 = max(col0, tile_col * tw), min(col1, (tile_col + 1) * tw)
+                tile = self.tile(tile_row * self.tiles_across + tile_col)
+                window[r0 - row0:r1 - row0, c0 - col0:c1 - col0] = tile[r0 - tile_row * th:r1 - tile_row * th,
+                                                                         c0 - tile_col * tw:c1 - tile_col * tw]
+        return window
+
+    def close(self):
+        data = getattr(self, "_data", None)
+        if data is not None:
+            data.close()
+            self._data = None
+        self._file.close()
+
+
+class ArrayGrid(_NodeGrid):
+    """
+    Сетка узлов в массиве (в т.ч. отображенном в память .npy) - региональный фрагмент.
+    """
+
+    def __init__(self, values, lat0, lon0, dlat, dlon, source=None, path=None):
+        self.values = values
+        self.height, self.width = values.shape
+        self.lat0, self.lon0, self.dlat, self.dlon = lat0, lon0, dlat, dlon
+        self.source = source
+        self.path = path
+
+    def values_at(self, rows, cols):
+        return np.asarray(self.values[rows, cols], dtype=np.float64)
+
+    def read_window(self, row0, row1, col0, col1):
+        return np.asarray(self.values[row0:row1, col0:col1], dtype=np.float64)
+
+    def save(self, path):
+        """
+        Запись фрагмента: path.npy (float32) и path.json (привязка). Возвращает путь к .json.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(path.with_suffix(".npy"), np.asarray(self.values, dtype=np.float32))
+        header = {
+            "format": SUBSET_FORMAT,
+            "version": 1,
+            "source": self.source,
+            "lat0": self.lat0, "lon0": self.lon0, "dlat": self.dlat, "dlon": self.dlon,
+            "rows": self.height, "cols": self.width,
+            "bounds": list(self.bounds),
+        }
+        with open(path.with_suffix(".json"), "w", encoding="utf-8") as f:
+            json.dump(header, f, indent=4)
+        return path.with_suffix(".json")
+
+    @classmethod
+    def load(cls, header_path):
+        header_path = Path(header_path)
+        with open(header_path, "r", encoding="utf-8") as f:
+            header = json.load(f)
+        if header.get("format") != SUBSET_FORMAT:
+            raise ValueError(f"Не фрагмент сетки геоида: {header_path}")
+        values = np.load(header_path.with_suffix(".npy"), mmap_mode="r")
+        if values.shape != (header["rows"], header["cols"]):
+            raise ValueError(f"Размер фрагмента не совпадает с заголовком: {header_path}")
+        return cls(values, header["lat0"], header["lon0"], header["dlat"], header["dlon"],
+                   source=header.get("source"), path=header_path)
+
+
+def _cubic_weights(t):
+    """
+    Веса кубической свертки Keys (a=-0.5) для узлов -1, 0, 1, 2.
+    """
+    a = -0.5
+    t2 = t * t
+    t3 = t2 * t
+    return (
+        a * (t3 - 2 * t2 + t),
+        (a + 2) * t3 - (a + 3) * t2 + 1,
+        -(a + 2) * t3 + (2 * a + 3) * t2 - a * t,
+        -a * (t3 - t2),
+    )
+
+
+class GeoidModel:
+    """
+    Высоты геоида N по сетке GeoTIFF: ортометрическая высота H = h - N.
+    """
+
+    def __init__(self, path, method=None, tile_cache_size=None):
+        self.grid = GeoTiffGrid(path, tile_cache_size)
+        self.method = method or config.get("geoid.interpolation", INTERPOLATION_BILINEAR)
+
+    def undulation(self, lats, lons, method=None):
+        return self.grid.interpolate(lats, lons, method or self.method)
+
+    def orthometric_heights(self, lats, lons, hs, method=None):
+        return np.asarray(hs, dtype=float) - self.undulation(lats, lons, method)
+
+    def ellipsoidal_heights(self, lats, lons, heights, method=None):
+        return np.asarray(heights, dtype=float) + self.undulation(lats, lons, method)
+
+    def close(self):
+        self.grid.close()
+
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def geoid_grid_path(name=EGM2008_GRID):
+    """
+    Путь к сетке геоида: настройка geoid.path или файл в ASSETS_DIR.
+    """
+    return Path(config.get("geoid.path", None) or ASSETS_DIR / name)
+
+
+def get_geoid_model(path=None):
+    """
+    Общая для процесса модель геоида (файл открывается один раз) или None, если файла нет.
+    """
+    path = Path(path) if path is not None else geoid_grid_path()
+    key = str(path)
+    with _models_lock:
+        if key not in _models:
+            if not path.exists():
+                logger.warning(f"Файл сетки геоида не найден: {path}")
+                _models[key] = None
+            else:
+                _models[key] = GeoidModel(path)
+                logger.info(f"Открыта сетка геоида {path.name}: {_models[key].grid.width}x{_models[key].grid.height}")
+        return _models[key]
+
+
+def clear_geoid_models():
+    with _models_lock:
+        for model in _models.values():
+            if model is not None:
+                model.close()
+        _models.clear()
+        _subsets.clear()
+
+
+def subset_dirs():
+    """
+    Каталоги фрагментов сетки: пользовательский кэш и фрагменты, поставляемые со сборкой.
+    """
+    return [config.user_dir / SUBSET_DIR_NAME, ASSETS_DIR / SUBSET_DIR_NAME]
+
+
+def extract_geoid_subset(lat_min, lat_max, lon_min, lon_max, padding=None, grid_path=None, out_dir=None, name=None):
+    """
+    Вырезание фрагмента сетки геоида под район (с запасом padding градусов) в кэш.
+    Возвращает путь к заголовку .json.
+    """
+    grid_path = Path(grid_path) if grid_path is not None else geoid_grid_path()
+    padding = config.get("geoid.subset_padding", DEFAULT_SUBSET_PADDING) if padding is None else padding
+    if lat_min > lat_max or lon_min > lon_max:
+        raise ValueError("Неверные границы района")
+
+    grid = GeoTiffGrid(grid_path)
+    try:
+        # Узлы, охватывающие район с запасом (и еще по узлу для бикубической интерполяции)
+        rows = sorted(((lat_min - padding - grid.lat0) / grid.dlat, (lat_max + padding - grid.lat0) / grid.dlat))
+        cols = ((lon_min - padding - grid.lon0) / grid.dlon, (lon_max + padding - grid.lon0) / grid.dlon)
+        row0 = max(int(np.floor(rows[0])) - 1, 0)
+        row1 = min(int(np.ceil(rows[1])) + 2, grid.height)
+        col0 = max(int(np.floor(cols[0])) - 1, 0)
+        col1 = min(int(np.ceil(cols[1])) + 2, grid.width)
+        if row0 >= row1 or col0 >= col1:
+            raise ValueError(f"Район вне сетки геоида {grid_path.name}")
+
+        subset = ArrayGrid(grid.read_window(row0, row1, col0, col1),
+                           grid.lat0 + row0 * grid.dlat, grid.lon0 + col0 * grid.dlon, grid.dlat, grid.dlon,
+                           source=grid_path.name)
+    finally:
+        grid.close()
+
+    if name is None:
+        name = f"{grid_path.stem}_{lat_min:g}_{lat_max:g}_{lon_min:g}_{lon_max:g}"
+    out_dir = Path(out_dir) if out_dir is not None else subset_dirs()[0]
+    header_path = subset.save(out_dir / name)
+    with _models_lock:
+        _subsets.clear()
+    logger.info(f"Фрагмент сетки геоида {subset.height}x{subset.width} сохранен: {header_path}")
+    return header_path
+
+
+_subsets = {}
+
+
+def get_geoid_subsets(source=EGM2008_GRID, directories=None):
+    """
+    Фрагменты сетки source из каталогов кэша (загружаются один раз на процесс).
+    """
+    directories = tuple(Path(d) for d in (directories or subset_dirs()))
+    key = (source, directories)
+    with _models_lock:
+        if key not in _subsets:
+            subsets = []
+            for directory in directories:
+                for header_path in sorted(directory.glob("*.json")) if directory.is_dir() else []:
+                    try:
+                        subset = ArrayGrid.load(header_path)
+                    except Exception as e:
+                        logger.warning(f"Фрагмент сетки геоида пропущен ({header_path}): {e}")
+                        continue
+                    if subset.source == source:
+                        subsets.append(subset)
+            if subsets:
+                logger.info(f"Найдено фрагментов сетки {source}: {len(subsets)}")
+            _subsets[key] = subsets
+        return _subsets[key]
+
+
+def regional_undulation(subsets, lats, lons, method=None):
+    """
+    Высоты геоида по фрагментам: (N, маска точек, покрытых фрагментами). Непокрытые - NaN.
+    """
+    method = method or config.get("geoid.interpolation", INTERPOLATION_BILINEAR)
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    undulation = np.full(lats.shape, np.nan)
+    covered = np.zeros(lats.shape, dtype=bool)
+    for subset in subsets:
+        inside = ~covered & subset.covers(lats, lons)
+        if inside.any():
+            undulation[inside] = subset.interpolate(lats[inside], lons[inside], method)
+            covered |= inside
+    return undulation, covered
@@ -0,0 +1,121 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from src.core.logger import logger
+from src.core.pipeline import EstimationPipeline, write_residual_report
+from src.core.reader import read_control_points
+
+# Суффиксы файлов опорных точек зоны при поиске в каталоге: <зона>_wgs.csv и <зона>_msk.csv
+WGS_SUFFIX = "_wgs"
+MSK_SUFFIX = "_msk"
+ZONE_EXTENSIONS = (".csv", ".txt")
+
+# Конвейер расчета, создаваемый в каждом процессе-обработчике (свои объекты pyproj)
+_worker_pipeline = None
+
+
+def discover_zones(source):
+    """
+    Список зон для пакетного расчета.
+    source - каталог с парами файлов <зона>_wgs.csv / <зона>_msk.csv
+    или JSON-манифест: [{"name": ..., "wgs": ..., "msk": ..., "crs_name": ..., "geoid": false}, ...]
+    (относительные пути - от каталога манифеста).
+    Возвращает список словарей name, wgs, msk, crs_name, geoid.
+    """
+    source = Path(source)
+    zones = []
+    if source.is_dir():
+        for wgs_path in sorted(source.iterdir()):
+            if wgs_path.suffix.lower() not in ZONE_EXTENSIONS or not wgs_path.stem.endswith(WGS_SUFFIX):
+                continue
+            name = wgs_path.stem[:-len(WGS_SUFFIX)]
+            msk_path = wgs_path.with_name(f"{name}{MSK_SUFFIX}{wgs_path.suffix}")
+            if not msk_path.exists():
+                logger.warning(f"Зона {name}: нет файла {msk_path.name}, пропущена")
+                continue
+            zones.append({"name": name, "wgs": str(wgs_path), "msk": str(msk_path), "crs_name": name, "geoid": False})
+    else:
+        with open(source, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        for entry in manifest:
+            name = entry["name"]
+            zones.append({
+                "name": name,
+                "wgs": str(source.parent / entry["wgs"]),
+                "msk": str(source.parent / entry["msk"]),
+                "crs_name": entry.get("crs_name", name),
+                "geoid": bool(entry.get("geoid", False)),
+            })
+    return zones
+
+
+def _init_worker():
+    global _worker_pipeline
+    _worker_pipeline = EstimationPipeline()
+
+
+def estimate_zone(zone, out_dir):
+    """
+    Расчет одной зоны: запись <зона>.prj и <зона>_residuals.csv в out_dir.
+    Ошибка зоны не прерывает пакет - возвращается в поле error.
+    """
+    if _worker_pipeline is None:
+        _init_worker()
+
+    summary = {"name": zone["name"], "points": 0, "rms": None, "max": None,
+               "prj": None, "report": None, "timings": {}, "error": None}
+    try:
+        ids, wgs_coords = read_control_points(zone["wgs"])
+        _, msk_coords = read_control_points(zone["msk"])
+        result = _worker_pipeline.run(wgs_coords, msk_coords,
+                                      use_geoid=zone.get("geoid", False),
+                                      crs_name=zone.get("crs_name") or zone["name"])
+
+        out_dir = Path(out_dir)
+        prj_path = out_dir / f"{zone['name']}.prj"
+        report_path = out_dir / f"{zone['name']}_residuals.csv"
+        with open(prj_path, "w", encoding="utf-8") as f:
+            f.write(result["wkt"])
+        write_residual_report(report_path, ids, result["residuals"])
+
+        norms = np.linalg.norm(result["residuals"], axis=1)
+        summary.update({
+            "points": len(ids),
+            "rms": float(np.sqrt(np.mean(norms ** 2))),
+            "max": float(norms.max()),
+            "prj": str(prj_path),
+            "report": str(report_path),
+            "timings": result["timings"],
+        })
+    except Exception as e:
+        logger.exception(f"Ошибка расчета зоны {zone['name']}")
+        summary["error"] = str(e)
+    return summary
+
+
+def estimate_zones(zones, out_dir, max_workers=None):
+    """
+    Параллельный расчет зон в пуле процессов; каждый процесс создает свой конвейер
+    (CoordinateConverter, кэш pyproj). Возвращает сводки в порядке входного списка.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(zones) or 1))
+
+    start = time.perf_counter()
+    if max_workers == 1:
+        summaries = [estimate_zone(zone, out_dir) for zone in zones]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as pool:
+            summaries = list(pool.map(estimate_zone, zones, [out_dir] * len(zones)))
+    elapsed = time.perf_counter() - start
+
+    failed = sum(1 for s in summaries if s["error"])
+    logger.info(f"Пакетный расчет: зон {len(zones)}, с ошибкой {failed}, "
+                f"процессов {max_workers}, время {elapsed:.3f} с")
+    return summaries
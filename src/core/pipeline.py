@@ -0,0 +1,190 @@
+import csv
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from src.core.converter import CoordinateConverter
+from src.core.estimator import ParameterEstimator
+from src.core.logger import logger
+
+# Этапы расчета в порядке выполнения (ключи словаря timings)
+STAGE_PROJECTION = "projection"
+STAGE_GEOCENTRIC = "geocentric"
+STAGE_HELMERT = "helmert"
+STAGE_RESIDUALS = "residuals"
+STAGE_VALIDATION = "validation"
+STAGE_WKT = "wkt"
+
+# Заголовки отчета о невязках (совпадают с таблицей сравнения ResultsWidget)
+REPORT_HEADERS = ["ID", "dX (м)", "dY (м)", "dH (м)"]
+
+
+class OperationCancelled(Exception):
+    """
+    Расчет прерван по запросу пользователя (is_cancelled() вернул True).
+    """
+
+
+def write_residual_report(path, ids, residuals):
+    """
+    Запись невязок по точкам в CSV.
+    """
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(REPORT_HEADERS)
+        writer.writerows((pt_id, f"{dx:.4f}", f"{dy:.4f}", f"{dh:.4f}") for pt_id, (dx, dy, dh) in zip(ids, residuals))
+
+
+class EstimationPipeline:
+    """
+    Расчет WKT по двум наборам координат без графического интерфейса:
+    параметры проекции -> геоцентрические координаты -> параметры Гельмерта ->
+    невязки -> WKT. Каждый этап доступен отдельно (так его вызывает MainWindow,
+    подставляя значения из полей ввода), run() выполняет все этапы подряд.
+    Время этапов (с) накапливается в словаре timings.
+
+    Параметры проекции передаются словарем с ключами cm_deg, scale, fe, fn, lat0.
+
+    progress_callback(stage) вызывается после завершения каждого этапа,
+    is_cancelled() проверяется перед началом этапа (OperationCancelled).
+    """
+
+    def __init__(self, converter=None, estimator=None, progress_callback=None, is_cancelled=None):
+        self.converter = converter or CoordinateConverter()
+        self.estimator = estimator or ParameterEstimator()
+        self.progress_callback = progress_callback
+        self.is_cancelled = is_cancelled
+        self.timings = {}
+
+    def reset(self):
+        self.timings = {}
+
+    @contextmanager
+    def _stage(self, name):
+        if self.is_cancelled is not None and self.is_cancelled():
+            raise OperationCancelled(f"Расчет отменен перед этапом {name}")
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+        if self.progress_callback is not None:
+            self.progress_callback(name)
+
+    @staticmethod
+    def validate(wgs_coords, msk_coords):
+        """
+        Проверка наборов точек: одинаковое количество и не меньше трех.
+        """
+        if len(wgs_coords) != len(msk_coords):
+            raise ValueError("Количество точек не совпадает.")
+        if len(wgs_coords) < 3:
+            raise ValueError("Нужно минимум 3 точки.")
+
+    def estimate_projection(self, wgs_coords, msk_coords):
+        """
+        Автоматический расчет параметров проекции (масштаб фиксирован).
+        """
+        with self._stage(STAGE_PROJECTION):
+            est = self.estimator.estimate_projection_parameters(wgs_coords, msk_coords, fixed_scale=True)
+        return {
+            "cm_deg": est["central_meridian"],
+            "scale": est["scale_factor"],
+            "fe": est["false_easting"],
+            "fn": est["false_northing"],
+            "lat0": 0.0,
+        }
+
+    def to_geocentric(self, wgs_coords, msk_coords, projection):
+        """
+        WGS84 (Lat, Lon, H) и МСК (X, Y, H) -> геоцентрические координаты.
+        Возвращает (wgs_cartesian, msk_cartesian).
+        """
+        with self._stage(STAGE_GEOCENTRIC):
+            wgs_cartesian = self.converter.wgs84_to_cartesian_batch(wgs_coords)
+            msk_cartesian = self.converter.msk_to_cartesian_batch(
+                msk_coords,
+                central_meridian_deg=projection["cm_deg"],
+                false_easting=projection["fe"],
+                false_northing=projection["fn"],
+                scale_factor=projection["scale"],
+                lat_origin=projection["lat0"],
+            )
+        return wgs_cartesian, msk_cartesian
+
+    def estimate_transformation(self, wgs_cartesian, msk_cartesian):
+        """
+        Автоматический расчет 7 параметров Гельмерта.
+        """
+        with self._stage(STAGE_HELMERT):
+            return self.estimator.calculate_helmert(wgs_cartesian, msk_cartesian)
+
+    def _cartesian_to_msk(self, cartesian, projection):
+        return self.converter.cartesian_to_msk_batch(
+            cartesian, projection["cm_deg"],
+            projection["fe"], projection["fn"],
+            projection["scale"], projection["lat0"]
+        )
+
+    def compute_residuals(self, wgs_cartesian, msk_coords, projection, params):
+        """
+        Невязки исходных МСК относительно пересчитанных: WGS Cart -> [Гельмерт] -> МСК.
+        Возвращает массив N×3 (dX, dY, dH).
+        """
+        with self._stage(STAGE_RESIDUALS):
+            transformed = self.estimator.apply_helmert(wgs_cartesian, params)
+            return np.asarray(msk_coords, dtype=float) - self._cartesian_to_msk(transformed, projection)
+
+    def compute_validation_residuals(self, wgs_cartesian, msk_cartesian, msk_coords, projection):
+        """
+        Невязки прогноза leave-one-out в МСК: каждая точка пересчитывается по параметрам,
+        найденным без нее. Возвращает массив N×3 (dX, dY, dH).
+        """
+        with self._stage(STAGE_VALIDATION):
+            cv = self.estimator.cross_validate_helmert(wgs_cartesian, msk_cartesian)
+            predicted = self._cartesian_to_msk(msk_cartesian - cv["residuals"], projection)
+            return np.asarray(msk_coords, dtype=float) - predicted
+
+    def build_wkt(self, params, projection, use_geoid=False, crs_name="unknown"):
+        with self._stage(STAGE_WKT):
+            return self.estimator.generate_wkt(
+                params, projection["cm_deg"], projection["fe"], projection["fn"],
+                projection["scale"], projection["lat0"], use_geoid=use_geoid, crs_name=crs_name
+            )
+
+    def run(self, wgs_coords, msk_coords, projection=None, params=None, use_geoid=False, crs_name="unknown"):
+        """
+        Полный расчет. projection/params - заданные пользователем параметры проекции
+        и трансформации; если не заданы, рассчитываются автоматически.
+        Возвращает словарь: projection, params, residuals (N×3), wkt, timings.
+        """
+        try:
+            self.reset()
+            self.validate(wgs_coords, msk_coords)
+            wgs_coords = np.asarray(wgs_coords, dtype=float)
+            msk_coords = np.asarray(msk_coords, dtype=float)
+
+            if projection is None:
+                projection = self.estimate_projection(wgs_coords, msk_coords)
+            wgs_cartesian, msk_cartesian = self.to_geocentric(wgs_coords, msk_coords, projection)
+            if params is None:
+                params = self.estimate_transformation(wgs_cartesian, msk_cartesian)
+            residuals = self.compute_residuals(wgs_cartesian, msk_coords, projection, params)
+            wkt = self.build_wkt(params, projection, use_geoid=use_geoid, crs_name=crs_name)
+
+            timings = dict(self.timings)
+            logger.info("Этапы расчета (с): " + ", ".join(f"{k}={v:.4f}" for k, v in timings.items()))
+            return {
+                "projection": projection,
+                "params": params,
+                "residuals": residuals,
+                "wkt": wkt,
+                "timings": timings,
+            }
+        except OperationCancelled:
+            logger.info("Расчет отменен")
+            raise
+        except Exception as e:
+            logger.exception("Ошибка в EstimationPipeline.run")
+            raise
@@ -0,0 +1,296 @@
+import hashlib
+import os
+import re
+from itertools import chain, islice
+
+import numpy as np
+
+from src.core.angles import DMS_SYMBOLS, parse_dms_array
+from src.core.logger import logger
+
+# Размер блока строк при потоковом чтении файлов координат
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Запись точки: ID (строка произвольной длины), Lat, Lon (градусы), H (м)
+POINT_DTYPE = np.dtype([("id", object), ("lat", "f8"), ("lon", "f8"), ("h", "f8")])
+
+# Разделители полей в порядке приоритета; None - пробельные символы.
+# Запятая проверяется последней: она может быть десятичным разделителем ("55,5;28,5")
+DELIMITERS = ("\t", ";", ",")
+# Число непустых строк, по которым определяется разделитель
+DETECT_SAMPLE_LINES = 50
+
+
+def empty_points(size=0):
+    return np.zeros(size, dtype=POINT_DTYPE)
+
+
+def detect_delimiter(lines):
+    """
+    Определение разделителя полей по образцу строк: первый из DELIMITERS,
+    встречающийся хотя бы в половине непустых строк, иначе None (пробелы).
+    """
+    sample = [line for line in (l.strip() for l in lines) if line][:DETECT_SAMPLE_LINES]
+    if not sample:
+        return None
+    for delimiter in DELIMITERS:
+        if sum(1 for line in sample if delimiter in line) * 2 >= len(sample):
+            return delimiter
+    return None
+
+
+def _to_float(value):
+    # Допускается десятичная запятая
+    return float(value.replace(",", "."))
+
+
+def _to_angle(value):
+    """
+    Угол в десятичных градусах или DMS ("55 30 15.2", 55°30'15.2"N).
+    DMS принимается только с несколькими полями или знаками °'" - иначе
+    идентификаторы вида "N1" распознавались бы как углы.
+    """
+    try:
+        return _to_float(value)
+    except ValueError:
+        if not any(ch.isspace() or ch in DMS_SYMBOLS for ch in value):
+            raise
+    degrees, invalid = parse_dms_array([value])
+    if invalid[0]:
+        raise ValueError(f"Неверный формат угла: '{value}'")
+    return float(degrees[0])
+
+
+def _split(line, delimiter):
+    parts = line.split(delimiter) if delimiter else line.split()
+    if len(parts) < 2 and delimiter:
+        # Разделителя в строке нет - пробуем пробелы
+        parts = line.split()
+    return [p.strip() for p in parts if p.strip()]
+
+
+def parse_point_line(line, delimiter=","):
+    """
+    Разбор строки координат (ID, Lat, Lon, H):
+    4+ поля: ID, Lat, Lon, H
+    3 поля: Lat, Lon, H (ID пустой); если первое поле не число - ID, Lat, Lon
+    2 поля: Lat, Lon (ID пустой, H=0)
+    Если в строке нет разделителя delimiter, поля разделяются пробелами.
+    Возвращает (id, lat, lon, h) или None, если строку разобрать нельзя.
+    """
+    line = line.strip()
+    if not line:
+        return None
+
+    parts = _split(line, delimiter)
+    if len(parts) < 2:
+        return None
+
+    pt_id = ""
+    h = 0.0
+    try:
+        if len(parts) >= 4:
+            pt_id = parts[0]
+            lat = _to_angle(parts[1])
+            lon = _to_angle(parts[2])
+            h = _to_float(parts[3])
+        elif len(parts) == 3:
+            lat = _to_angle(parts[0])
+            lon = _to_angle(parts[1])
+            h = _to_float(parts[2])
+        else:
+            lat = _to_angle(parts[0])
+            lon = _to_angle(parts[1])
+    except ValueError:
+        # Если не удалось распарсить как числа, возможно первый элемент это ID
+        if len(parts) != 3:
+            return None
+        try:
+            pt_id = parts[0]
+            lat = _to_angle(parts[1])
+            lon = _to_angle(parts[2])
+        except ValueError:
+            return None
+
+    return pt_id, lat, lon, h
+
+
+def _parse_line(line, delimiter):
+    """
+    Разбор строки с разделителем блока; если не удалось - с другими разделителями,
+    встречающимися в строке (в одном источнике строки могут быть записаны по-разному).
+    """
+    point = parse_point_line(line, delimiter)
+    if point is not None:
+        return point
+    for other in DELIMITERS + (None,):
+        if other != delimiter and (other is None or other in line):
+            point = parse_point_line(line, other)
+            if point is not None:
+                return point
+    return None
+
+
+def _parse_uniform(lines, delimiter):
+    """
+    Быстрый путь для блока с одинаковым числом полей (4+): ID, Lat, Lon, H.
+    Числа преобразуются одним вызовом astype для всего блока (float сам отбрасывает
+    пробелы вокруг значений). Возвращает None, если блок не подходит - тогда строки
+    разбираются по одной.
+    """
+    rows = [line.split(delimiter) for line in lines]
+    width = len(rows[0])
+    if width < 4 or any(len(r) != width for r in rows):
+        return None
+    table = np.array(rows, dtype=object)
+    try:
+        values = table[:, 1:4].astype(float)
+    except ValueError:
+        try:
+            values = np.char.replace(table[:, 1:4].astype(str), ",", ".").astype(float)
+        except ValueError:
+            values = _parse_uniform_angles(table)
+            if values is None:
+                return None
+    ids = [pt_id.strip() for pt_id in table[:, 0]]
+    if not all(ids):
+        # Пустые поля сдвигают столбцы - нужен построчный разбор
+        return None
+    points = empty_points(len(rows))
+    points["id"] = ids
+    points["lat"] = values[:, 0]
+    points["lon"] = values[:, 1]
+    points["h"] = values[:, 2]
+    return points
+
+
+def _parse_uniform_angles(table):
+    """
+    Столбцы Lat/Lon блока в DMS или вперемешку с десятичными градусами:
+    разбор parse_dms_array по столбцу целиком. None - если есть ошибочные значения.
+    """
+    angles, invalid = parse_dms_array(table[:, 1:3].astype(str))
+    if invalid.any():
+        return None
+    try:
+        h = np.char.replace(table[:, 3].astype(str), ",", ".").astype(float)
+    except ValueError:
+        return None
+    return np.column_stack([angles, h])
+
+
+def parse_points(lines, delimiter=None):
+    """
+    Разбор последовательности строк в массив записей POINT_DTYPE.
+    delimiter=None - разделитель определяется по самим строкам.
+    Нераспознанные строки пропускаются, их число пишется в лог.
+    """
+    lines = [line.strip() for line in lines]
+    lines = [line for line in lines if line]
+    if not lines:
+        return empty_points()
+    if delimiter is None:
+        delimiter = detect_delimiter(lines)
+
+    points = _parse_uniform(lines, delimiter)
+    if points is not None:
+        return points
+
+    parsed = [p for p in (_parse_line(line, delimiter) for line in lines) if p is not None]
+    rejected = len(lines) - len(parsed)
+    if rejected:
+        logger.warning(f"Пропущено нераспознанных строк: {rejected}")
+    points = empty_points(len(parsed))
+    if parsed:
+        ids, lats, lons, hs = zip(*parsed)
+        points["id"] = ids
+        points["lat"] = lats
+        points["lon"] = lons
+        points["h"] = hs
+    return points
+
+
+def points_digest(points):
+    """
+    Хэш набора точек (ID, Lat, Lon, H) - для пропуска повторной обработки,
+    если после правки текста разобранные точки не изменились.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for field in ("lat", "lon", "h"):
+        digest.update(np.ascontiguousarray(points[field]).tobytes())
+    digest.update("\x00".join(str(pt_id) for pt_id in points["id"].tolist()).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def iter_point_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE, encoding="utf-8"):
+    """
+    Потоковое чтение координат блоками по chunk_size строк.
+    source - путь к файлу или итерируемый набор строк.
+    Разделитель определяется один раз по началу источника.
+    Каждый блок - массив записей POINT_DTYPE (id, lat, lon, h); пустые блоки не выдаются.
+    """
+    f = open(source, "r", encoding=encoding) if isinstance(source, (str, os.PathLike)) else None
+    lines = iter(f if f is not None else source)
+    try:
+        head = list(islice(lines, chunk_size))
+        delimiter = detect_delimiter(head)
+        lines = chain(head, lines)
+        while True:
+            chunk = list(islice(lines, chunk_size))
+            if not chunk:
+                break
+            points = parse_points(chunk, delimiter)
+            if len(points):
+                yield points
+    finally:
+        if f is not None:
+            f.close()
+
+
+def count_lines(source):
+    """
+    Число строк источника (путь к файлу или набор строк) - для индикатора прогресса.
+    Файл считается в двоичном режиме блоками, без декодирования.
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        return len(source)
+    count = 0
+    last = b"\n"
+    with open(source, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            count += block.count(b"\n")
+            last = block[-1:]
+    # Последняя строка без перевода строки
+    return count + (last != b"\n")
+
+
+def read_points(source, encoding="utf-8"):
+    """
+    Чтение всех точек источника (путь к файлу или набор строк) в один массив POINT_DTYPE.
+    """
+    chunks = list(iter_point_chunks(source, encoding=encoding))
+    return np.concatenate(chunks) if chunks else empty_points()
+
+
+def parse_control_points(lines):
+    """
+    Разбор опорных точек (ID, X/Lat, Y/Lon, H) по правилам вкладки расчета:
+    разделитель - запятая или табуляция, строки с менее чем 4 полями пропускаются.
+    Возвращает (ids, массив N×3).
+    """
+    ids, coords = [], []
+    for line in lines:
+        parts = [p.strip() for p in re.split(r'[,\t]', line.strip()) if p.strip()]
+        if len(parts) < 4:
+            continue
+        ids.append(parts[0])
+        coords.append([float(v) for v in parts[1:4]])
+    return ids, np.array(coords, dtype=float).reshape(-1, 3)
+
+
+def read_control_points(file_path, encoding="utf-8"):
+    """
+    Чтение файла опорных точек, см. parse_control_points.
+    """
+    with open(file_path, "r", encoding=encoding) as f:
+        return parse_control_points(f)
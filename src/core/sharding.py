@@ -0,0 +1,183 @@
+"""
+Многопроцессный пересчет больших файлов координат (десятки и сотни миллионов строк).
+
+Файл делится на фрагменты по байтовым диапазонам (границы выравниваются по концу строки).
+Каждый процесс пула сам читает свой диапазон, разбирает строки, пересчитывает их пакетами
+и форматирует строки результата - в родительский процесс возвращается готовый текст.
+Родитель записывает фрагменты строго в порядке файла; одновременно в работе не больше
+max_in_flight фрагментов, поэтому память ограничена независимо от размера файла.
+"""
+import csv
+import io
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from src.config.loader import config
+from src.core.cache import TransformerCache
+from src.core.converter import CoordinateConverter
+from src.core.logger import logger
+from src.core.reader import DEFAULT_CHUNK_SIZE, detect_delimiter, parse_points
+
+# Заголовки выходного файла (совпадают с таблицей результатов WktConverterWidget)
+CONVERT_HEADERS = ["ID", "X (Север)", "Y (Восток)", "H (Высота)"]
+INVERSE_HEADERS = ["ID", "Lat", "Lon", "H (Высота)"]
+
+# Размер фрагмента файла, байт (~100 тыс. строк ID, Lat, Lon, H)
+DEFAULT_SHARD_SIZE = 8 * 1024 * 1024
+# Объем начала файла для определения разделителя, байт
+DELIMITER_SAMPLE_SIZE = 64 * 1024
+
+# Состояние процесса-обработчика: свой CoordinateConverter с отдельным кэшем
+# трансформеров и зон (сетки и фрагменты геоида в src.core.geoid - тоже свои в каждом процессе)
+_worker = None
+
+
+def shard_ranges(path, shard_size=None):
+    """
+    Байтовые диапазоны [start, end) фрагментов файла; каждый, кроме последнего,
+    заканчивается переводом строки.
+    """
+    shard_size = max(1, int(shard_size or config.get("convert.shard_size", DEFAULT_SHARD_SIZE)))
+    size = os.path.getsize(path)
+    ranges = []
+    with open(path, "rb") as f:
+        start = 0
+        while start < size:
+            end = start + shard_size
+            if end < size:
+                # Конец фрагмента - до конца строки, на которую попала граница
+                f.seek(end - 1)
+                f.readline()
+                end = f.tell()
+            else:
+                end = size
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _detect_file_delimiter(path, encoding="utf-8"):
+    # Разделитель определяется один раз по началу файла - одинаковый для всех фрагментов
+    with open(path, "rb") as f:
+        head = f.read(DELIMITER_SAMPLE_SIZE)
+    lines = head.decode(encoding, errors="ignore").split("\n")
+    if len(head) == DELIMITER_SAMPLE_SIZE and len(lines) > 1:
+        lines = lines[:-1]  # последняя строка может быть обрезана
+    return detect_delimiter(lines)
+
+
+def _init_worker(wkt, inverse, delimiter, chunk_size, encoding="utf-8"):
+    global _worker
+    _worker = {
+        "converter": CoordinateConverter(cache=TransformerCache()),
+        "wkt": wkt,
+        "inverse": inverse,
+        "delimiter": delimiter,
+        "chunk_size": chunk_size,
+        "encoding": encoding,
+    }
+
+
+def convert_shard(path, start, end):
+    """
+    Пересчет фрагмента [start, end) файла в процессе-обработчике.
+    Возвращает (строки CSV результата в байтах, число точек, число точек с ошибкой).
+    """
+    state = _worker
+    converter = state["converter"]
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    lines = data.decode(state["encoding"]).split("\n")
+
+    # Градусы - 9 знаков (доли миллиметра), метры - 4
+    decimals = 9 if state["inverse"] else 4
+    fmt_plan = f"{{:.{decimals}f}}".format
+    fmt_height = "{:.4f}".format
+    out = io.StringIO()
+    writer = csv.writer(out)
+    points = errors = 0
+    chunk_size = state["chunk_size"]
+    for i in range(0, len(lines), chunk_size):
+        chunk = parse_points(lines[i:i + chunk_size], state["delimiter"])
+        if not len(chunk):
+            continue
+        if state["inverse"]:
+            a, b, h, error_mask = converter.msk_to_wgs_batch(state["wkt"], chunk["lat"], chunk["lon"], chunk["h"])
+        else:
+            a, b, h, error_mask = converter.wkt_to_msk_batch(state["wkt"], chunk["lat"], chunk["lon"], chunk["h"])
+        ok = ~error_mask
+        # Перевод в списки Python: форматирование float быстрее, чем np.float64;
+        # map со связанным format - без разбора шаблона f-строки на каждую строку
+        writer.writerows(zip(chunk["id"][ok].tolist(), map(fmt_plan, a[ok].tolist()),
+                             map(fmt_plan, b[ok].tolist()), map(fmt_height, h[ok].tolist())))
+        points += len(chunk)
+        errors += int(np.count_nonzero(error_mask))
+    return out.getvalue().encode("utf-8"), points, errors
+
+
+def convert_file(wkt, input_path, output_path, inverse=False, max_workers=None, shard_size=None,
+                 max_in_flight=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Пересчет файла координат WGS84 (ID, Lat, Lon, H) в МСК по WKT (inverse=True - МСК -> WGS84)
+    в пуле процессов с записью CSV в исходном порядке строк.
+    max_workers - число процессов (по умолчанию - число ядер), max_in_flight - предел
+    фрагментов в работе и в очереди на запись (по умолчанию 2 на процесс).
+    Возвращает словарь: points, errors, shards, workers, elapsed.
+    """
+    start_time = time.perf_counter()
+    # Ошибки WKT - сразу, до запуска пула
+    try:
+        CoordinateConverter(cache=TransformerCache()).zone(wkt)
+    except Exception as e:
+        logger.exception("Ошибка в WKT для пересчета файла")
+        raise ValueError(f"Ошибка в преобразовании WKT: {e}")
+
+    ranges = shard_ranges(input_path, shard_size)
+    max_workers = max(1, min(max_workers or config.get("convert.workers", None) or os.cpu_count() or 1,
+                             len(ranges) or 1))
+    max_in_flight = max(max_workers, max_in_flight or config.get("convert.max_in_flight", 2 * max_workers))
+    init_args = (wkt, inverse, _detect_file_delimiter(input_path), chunk_size)
+
+    points = errors = 0
+    with open(output_path, "wb") as out:
+        header = io.StringIO()
+        csv.writer(header).writerow(INVERSE_HEADERS if inverse else CONVERT_HEADERS)
+        out.write(header.getvalue().encode("utf-8"))
+
+        if max_workers == 1:
+            _init_worker(*init_args)
+            results = (convert_shard(input_path, start, end) for start, end in ranges)
+            for data, n_points, n_errors in results:
+                out.write(data)
+                points += n_points
+                errors += n_errors
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=init_args) as pool:
+                shards = iter(ranges)
+                pending = deque(pool.submit(convert_shard, input_path, start, end)
+                                for start, end in islice(shards, max_in_flight))
+                try:
+                    while pending:
+                        # Запись по порядку: ждем самый ранний фрагмент, освободившееся место - следующему
+                        data, n_points, n_errors = pending.popleft().result()
+                        for start, end in islice(shards, 1):
+                            pending.append(pool.submit(convert_shard, input_path, start, end))
+                        out.write(data)
+                        points += n_points
+                        errors += n_errors
+                except BaseException:
+                    # Ошибка фрагмента: еще не начатые фрагменты отменяются
+                    for future in pending:
+                        future.cancel()
+                    raise
+
+    elapsed = time.perf_counter() - start_time
+    logger.info(f"Пересчет файла {input_path}: точек {points}, с ошибкой {errors}, фрагментов {len(ranges)}, "
+                f"процессов {max_workers}, время {elapsed:.3f} с")
+    return {"points": points, "errors": errors, "shards": len(ranges), "workers": max_workers, "elapsed": elapsed}
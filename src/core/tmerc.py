@@ -0,0 +1,185 @@
+import numpy as np
+from functools import lru_cache
+from src.core.geodesy import KRASSOVSKY
+
+# Порядок параметров в якобиане (совпадает с порядком в estimate_projection_parameters)
+JACOBIAN_PARAMS = ("central_meridian", "scale_factor", "false_easting", "false_northing")
+
+# Итерации Ньютона при переходе от конформной широты к геодезической
+_TAU_MAX_ITER = 5
+
+
+@lru_cache(maxsize=None)
+def _kruger_coefficients(ellipsoid):
+    """
+    Коэффициенты рядов Крюгера 6-го порядка по третьему сжатию n (Karney, 2011).
+    Возвращает (A, alpha[1..6], beta[1..6]).
+    """
+    n = ellipsoid.f / (2.0 - ellipsoid.f)
+    n2 = n * n
+    n3 = n2 * n
+    n4 = n3 * n
+    n5 = n4 * n
+    n6 = n5 * n
+
+    # Радиус спрямляющей сферы
+    A = ellipsoid.a / (1.0 + n) * (1.0 + n2 / 4 + n4 / 64 + n6 / 256)
+
+    alpha = np.array([
+        n / 2 - 2 * n2 / 3 + 5 * n3 / 16 + 41 * n4 / 180 - 127 * n5 / 288 + 7891 * n6 / 37800,
+        13 * n2 / 48 - 3 * n3 / 5 + 557 * n4 / 1440 + 281 * n5 / 630 - 1983433 * n6 / 1935360,
+        61 * n3 / 240 - 103 * n4 / 140 + 15061 * n5 / 26880 + 167603 * n6 / 181440,
+        49561 * n4 / 161280 - 179 * n5 / 168 + 6601661 * n6 / 7257600,
+        34729 * n5 / 80640 - 3418889 * n6 / 1995840,
+        212378941 * n6 / 319334400,
+    ])
+    beta = np.array([
+        n / 2 - 2 * n2 / 3 + 37 * n3 / 96 - n4 / 360 - 81 * n5 / 512 + 96199 * n6 / 604800,
+        n2 / 48 + n3 / 15 - 437 * n4 / 1440 + 46 * n5 / 105 - 1118711 * n6 / 3870720,
+        17 * n3 / 480 - 37 * n4 / 840 - 209 * n5 / 4480 + 5569 * n6 / 90720,
+        4397 * n4 / 161280 - 11 * n5 / 504 - 830251 * n6 / 7257600,
+        4583 * n5 / 161280 - 108847 * n6 / 3991680,
+        20648693 * n6 / 638668800,
+    ])
+    return A, alpha, beta
+
+
+def _conformal_tan(lat_rad, e):
+    """
+    Тангенс конформной широты по геодезической широте (в радианах).
+    """
+    sin_lat = np.sin(lat_rad)
+    return np.sinh(np.arctanh(sin_lat) - e * np.arctanh(e * sin_lat))
+
+
+def _geodetic_tan(tau_prime, e):
+    """
+    Тангенс геодезической широты по тангенсу конформной (метод Ньютона, Karney 2011).
+    """
+    e2 = e * e
+    tau = tau_prime.copy()
+    for _ in range(_TAU_MAX_ITER):
+        sqrt_tau = np.sqrt(1.0 + tau * tau)
+        sigma = np.sinh(e * np.arctanh(e * tau / sqrt_tau))
+        tau_i = tau * np.sqrt(1.0 + sigma * sigma) - sigma * sqrt_tau
+        d_tau = ((tau_prime - tau_i) / np.sqrt(1.0 + tau_i * tau_i)
+                 * (1.0 + (1.0 - e2) * tau * tau) / ((1.0 - e2) * sqrt_tau))
+        tau = tau + d_tau
+    return tau
+
+
+class TransverseMercator:
+    """
+    Поперечная проекция Меркатора (ряды Крюгера 6-го порядка), векторизованная по NumPy.
+    Точность в пределах ±6° от осевого меридиана - единицы нанометров.
+    """
+
+    def __init__(self, central_meridian, scale_factor=1.0, false_easting=0.0, false_northing=0.0,
+                 lat_origin=0.0, ellipsoid=KRASSOVSKY):
+        self.central_meridian = float(central_meridian)
+        self.scale_factor = float(scale_factor)
+        self.false_easting = float(false_easting)
+        self.false_northing = float(false_northing)
+        self.lat_origin = float(lat_origin)
+        self.ellipsoid = ellipsoid
+
+        self._e = np.sqrt(ellipsoid.e2)
+        self._A, self._alpha, self._beta = _kruger_coefficients(ellipsoid)
+        self._j2 = 2.0 * np.arange(1, 7)
+        # Длина дуги меридиана (в единицах A) до широты начала координат
+        self._xi0 = float(self._meridian_xi(np.radians(self.lat_origin)))
+
+    def _meridian_xi(self, lat_rad):
+        xi_prime = np.arctan(_conformal_tan(lat_rad, self._e))
+        return xi_prime + np.sum(self._alpha * np.sin(self._j2 * xi_prime))
+
+    def _series(self, lat, lon):
+        """
+        Промежуточные величины прямой задачи: (xi, eta, xi', eta', t, lambda).
+        """
+        lat_rad = np.radians(np.asarray(lat, dtype=float))
+        lam = np.radians(np.asarray(lon, dtype=float) - self.central_meridian)
+
+        t = _conformal_tan(lat_rad, self._e)
+        cos_lam = np.cos(lam)
+        xi_p = np.arctan2(t, cos_lam)
+        eta_p = np.arctanh(np.sin(lam) / np.sqrt(1.0 + t * t))
+
+        arg_xi = self._j2[:, None] * xi_p.ravel()[None, :]
+        arg_eta = self._j2[:, None] * eta_p.ravel()[None, :]
+        alpha = self._alpha[:, None]
+
+        xi = xi_p + np.sum(alpha * np.sin(arg_xi) * np.cosh(arg_eta), axis=0).reshape(xi_p.shape)
+        eta = eta_p + np.sum(alpha * np.cos(arg_xi) * np.sinh(arg_eta), axis=0).reshape(eta_p.shape)
+        return xi, eta, xi_p, eta_p, t, lam, arg_xi, arg_eta
+
+    def forward(self, lat, lon):
+        """
+        Геодезические (Lat, Lon в градусах) -> плоские (Northing, Easting в метрах).
+        """
+        xi, eta = self._series(lat, lon)[:2]
+        k0A = self.scale_factor * self._A
+        northing = self.false_northing + k0A * (xi - self._xi0)
+        easting = self.false_easting + k0A * eta
+        return northing, easting
+
+    def forward_with_jacobian(self, lat, lon):
+        """
+        Прямая задача с аналитическими частными производными.
+        Возвращает (northing, easting, jacobian), где jacobian имеет форму (N, 2, 4):
+        строки - (Northing, Easting), столбцы - JACOBIAN_PARAMS
+        (осевой меридиан в градусах, масштаб, False Easting, False Northing).
+        """
+        xi, eta, xi_p, eta_p, t, lam, arg_xi, arg_eta = self._series(lat, lon)
+        k0A = self.scale_factor * self._A
+        northing = self.false_northing + k0A * (xi - self._xi0)
+        easting = self.false_easting + k0A * eta
+
+        # Производные xi', eta' по долготе от осевого меридиана
+        cos_lam = np.cos(lam)
+        denom = t * t + cos_lam * cos_lam
+        dxi_p = t * np.sin(lam) / denom
+        deta_p = cos_lam * np.sqrt(1.0 + t * t) / denom
+
+        # d(zeta)/d(zeta') = p - i*q (условия Коши-Римана)
+        w = (self._j2 * self._alpha)[:, None]
+        p = 1.0 + np.sum(w * np.cos(arg_xi) * np.cosh(arg_eta), axis=0).reshape(xi.shape)
+        q = np.sum(w * np.sin(arg_xi) * np.sinh(arg_eta), axis=0).reshape(xi.shape)
+        dxi = p * dxi_p + q * deta_p
+        deta = p * deta_p - q * dxi_p
+
+        # lambda = lon - cm, поэтому d/d(cm) = -d/d(lambda); перевод из радиан в градусы
+        d_cm = -np.pi / 180.0
+
+        northing = np.atleast_1d(northing)
+        jac = np.zeros((northing.size, 2, 4))
+        jac[:, 0, 0] = np.ravel(k0A * dxi * d_cm)
+        jac[:, 1, 0] = np.ravel(k0A * deta * d_cm)
+        jac[:, 0, 1] = np.ravel(self._A * (xi - self._xi0))
+        jac[:, 1, 1] = np.ravel(self._A * eta)
+        jac[:, 1, 2] = 1.0
+        jac[:, 0, 3] = 1.0
+        return northing, np.atleast_1d(easting), jac
+
+    def inverse(self, northing, easting):
+        """
+        Плоские (Northing, Easting в метрах) -> геодезические (Lat, Lon в градусах).
+        """
+        k0A = self.scale_factor * self._A
+        xi = (np.asarray(northing, dtype=float) - self.false_northing) / k0A + self._xi0
+        eta = (np.asarray(easting, dtype=float) - self.false_easting) / k0A
+
+        arg_xi = self._j2[:, None] * np.ravel(xi)[None, :]
+        arg_eta = self._j2[:, None] * np.ravel(eta)[None, :]
+        beta = self._beta[:, None]
+        xi_p = xi - np.sum(beta * np.sin(arg_xi) * np.cosh(arg_eta), axis=0).reshape(np.shape(xi))
+        eta_p = eta - np.sum(beta * np.cos(arg_xi) * np.sinh(arg_eta), axis=0).reshape(np.shape(eta))
+
+        sinh_eta = np.sinh(eta_p)
+        cos_xi = np.cos(xi_p)
+        tau_prime = np.sin(xi_p) / np.hypot(sinh_eta, cos_xi)
+        lam = np.arctan2(sinh_eta, cos_xi)
+
+        lat = np.degrees(np.arctan(_geodetic_tan(np.atleast_1d(tau_prime), self._e))).reshape(np.shape(tau_prime))
+        lon = self.central_meridian + np.degrees(lam)
+        return lat, lon
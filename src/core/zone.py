@@ -0,0 +1,83 @@
+from collections import namedtuple
+
+from src.config.loader import config
+from src.core.cache import LRUCache, normalize_crs_definition, transformer_cache
+from src.core.geoid import EGM2008_GRID
+from src.core.logger import logger
+
+# Географическая WGS84 - исходная система для пересчета в МСК
+WGS84_GEOGRAPHIC = 4326
+
+# Вертикальная часть МСК: имя СК, имя датума и сетка геоида для перехода от
+# эллипсоидальных высот WGS84 (None - сетка не требуется/неизвестна)
+VerticalDatum = namedtuple("VerticalDatum", ["name", "datum", "geoid_grid"])
+
+
+def _vertical_datum(sub_crs):
+    datum = sub_crs.datum.name if sub_crs.datum is not None else None
+    # Простая проверка по имени, так как EPSG код может быть не доступен напрямую в имени
+    is_egm2008 = "EGM2008" in sub_crs.name or "EGM2008" in sub_crs.to_wkt()
+    return VerticalDatum(sub_crs.name, datum, EGM2008_GRID if is_egm2008 else None)
+
+
+class ParsedZone:
+    """
+    МСК, описанная WKT, разобранная один раз: CRS, горизонтальная часть, вертикальный
+    датум, сетка геоида и трансформеры WGS84 -> МСК и обратно.
+    """
+
+    def __init__(self, wkt, cache=None):
+        cache = cache if cache is not None else transformer_cache
+        self.wkt = wkt
+        self.key = normalize_crs_definition(wkt)
+        self.crs = cache.crs(wkt)
+
+        self.horizontal_crs = self.crs
+        self.vertical = None
+        if self.crs.is_compound:
+            horizontal = [sub_crs for sub_crs in self.crs.sub_crs_list if not sub_crs.is_vertical]
+            vertical = [_vertical_datum(sub_crs) for sub_crs in self.crs.sub_crs_list if sub_crs.is_vertical]
+            if horizontal:
+                self.horizontal_crs = horizontal[0]
+            if vertical:
+                # Вертикальная СК с геоидом имеет приоритет
+                self.vertical = next((v for v in vertical if v.geoid_grid), vertical[0])
+
+        # Горизонтальная трансформация (2D WGS84 -> МСК); для составной CRS from_crs
+        # обрабатывает горизонтальную часть, высота пересчитывается отдельно по геоиду
+        self.forward = cache.transformer(WGS84_GEOGRAPHIC, wkt)
+        # Обратная (МСК -> WGS84) создается вместе с прямой: зона разбирается в вызывающем
+        # потоке, фоновая конвертация только использует готовые трансформеры
+        self.inverse = cache.transformer(wkt, WGS84_GEOGRAPHIC)
+        logger.debug(f"Разобрана МСК {self.horizontal_crs.name}, вертикальная СК: {self.vertical}")
+
+    @property
+    def geoid_grid(self):
+        return self.vertical.geoid_grid if self.vertical is not None else None
+
+    @property
+    def has_egm2008(self):
+        return self.geoid_grid == EGM2008_GRID
+
+
+class ZoneCache:
+    """
+    LRU-кэш ParsedZone по содержимому WKT (хэш нормализованного текста).
+    """
+
+    def __init__(self, cache=None, size=None):
+        self.cache = cache if cache is not None else transformer_cache
+        self.zones = LRUCache(size or config.get("cache.zone_size", 32))
+
+    def get(self, wkt):
+        return self.zones.get_or_create(normalize_crs_definition(wkt), lambda: ParsedZone(wkt, self.cache))
+
+    def stats(self):
+        return self.zones.stats()
+
+    def clear(self):
+        self.zones.clear()
+
+
+# Глобальный экземпляр (поверх общего кэша трансформеров)
+zone_cache = ZoneCache()
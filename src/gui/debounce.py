@@ -0,0 +1,43 @@
+from PySide6.QtCore import QObject, QTimer
+
+# Задержка обновления карты после правки координат (мс); настройка map.refresh_delay_ms
+DEFAULT_REFRESH_DELAY_MS = 300
+
+
+class Debouncer(QObject):
+    """
+    Схлопывание серии вызовов в один: fn выполняется через delay_ms после последнего
+    trigger(). Каждый trigger() перезапускает однократный таймер, поэтому набор текста
+    или вставка большого фрагмента приводят к одному обновлению.
+    """
+
+    def __init__(self, fn, delay_ms, parent=None):
+        super().__init__(parent)
+        self.fn = fn
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.fn)
+        self.set_delay(delay_ms)
+
+    def set_delay(self, delay_ms):
+        self._timer.setInterval(max(0, int(delay_ms)))
+
+    def delay(self):
+        return self._timer.interval()
+
+    def trigger(self):
+        self._timer.start()
+
+    def cancel(self):
+        self._timer.stop()
+
+    def is_pending(self):
+        return self._timer.isActive()
+
+    def flush(self):
+        """
+        Немедленное выполнение отложенного вызова, если он есть.
+        """
+        if self._timer.isActive():
+            self._timer.stop()
+            self.fn()
@@ -1,20 +1,24 @@
-from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QMessageBox, QStackedWidget
+from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QMessageBox, QStackedWidget, QProgressBar
 from PySide6.QtGui import QIcon
-from PySide6.QtCore import QFile, QTextStream, Qt
+from PySide6.QtCore import QFile, QTextStream, Qt, QThreadPool
 import sys
 import os
-from src.gui.widgets.projection_widget import ProjectionWidget
+from src.gui.widgets.projection_widget import PROJECTION_DECIMALS, ProjectionWidget
 from src.gui.widgets.coords_widget import CoordsWidget
 from src.gui.widgets.results_widget import ResultsWidget
 from src.gui.widgets.wkt_converter_widget import WktConverterWidget
 from src.gui.widgets.settings_widget import SettingsWidget
 from src.core.converter import CoordinateConverter
 from src.core.estimator import ParameterEstimator
+from src.core.pipeline import (EstimationPipeline, STAGE_GEOCENTRIC, STAGE_HELMERT, STAGE_PROJECTION,
+                               STAGE_RESIDUALS, STAGE_VALIDATION)
+from src.core.reader import parse_control_points, parse_points, points_digest
 from src.core.logger import logger
 from src.config.loader import config
 from src.gui.widgets.map_widget import MapWidget
+from src.gui.workers import Worker
+from src.gui.debounce import DEFAULT_REFRESH_DELAY_MS, Debouncer
 from PySide6.QtWidgets import QCheckBox
-import numpy as np
 
 class MainWindow(QMainWindow):
     def resource_path(self, relative_path):
@@ -42,11 +46,15 @@ class MainWindow(QMainWindow):
         # Инициализация логики
         self.converter = CoordinateConverter()
         self.estimator = ParameterEstimator()
+        # Текущий фоновый расчет (Worker) или None
+        self.calc_worker = None
+        # Отложенное обновление карты при правке координат и состояние последнего обновления
+        self.calc_map_refresh = Debouncer(self.update_calc_map_from_input,
+                                          config.get("map.refresh_delay_ms", DEFAULT_REFRESH_DELAY_MS), self)
+        self._calc_map_state = None
         
         self.setup_ui()
 
-        self.setup_ui()
-
     def load_styles(self):
         # Load theme from config
         theme_name = config.get("app.theme", "Dark")
@@ -122,6 +130,7 @@ class MainWindow(QMainWindow):
         # Page 3: Settings
         self.page_settings = SettingsWidget()
         self.page_settings.theme_changed.connect(self.apply_theme)
+        self.page_settings.map_refresh_delay_changed.connect(self.set_map_refresh_delay)
         self.content_area.addWidget(self.page_settings)
         
         # Group buttons for exclusive checking
@@ -171,7 +180,7 @@ class MainWindow(QMainWindow):
         left_layout.addWidget(self.proj_widget)
         
         self.coords_widget = CoordsWidget()
-        self.coords_widget.wgs_changed.connect(self.update_calc_map_from_input)
+        self.coords_widget.wgs_changed.connect(self.calc_map_refresh.trigger)
         left_layout.addWidget(self.coords_widget)
         
         self.btn_calc = QPushButton("Сформировать WKT")
@@ -179,6 +188,17 @@ class MainWindow(QMainWindow):
         self.btn_calc.setObjectName("actionButton")
         self.btn_calc.clicked.connect(self.calculate)
         left_layout.addWidget(self.btn_calc)
+
+        # Ход фонового расчета и отмена
+        progress_layout = QHBoxLayout()
+        self.progress_calc = QProgressBar()
+        progress_layout.addWidget(self.progress_calc, stretch=1)
+        self.btn_cancel_calc = QPushButton("Отмена")
+        self.btn_cancel_calc.clicked.connect(self.cancel_calculation)
+        progress_layout.addWidget(self.btn_cancel_calc)
+        left_layout.addLayout(progress_layout)
+        self.progress_calc.setVisible(False)
+        self.btn_cancel_calc.setVisible(False)
         
         main_layout.addWidget(left_column, stretch=1)
         
@@ -192,6 +212,11 @@ class MainWindow(QMainWindow):
         self.results_widget.geoid_toggled.connect(self.on_geoid_toggled)
         self.results_widget.crs_name_changed.connect(lambda _: self.update_wkt_display())
         self.results_widget.save_clicked.connect(self.on_save_wkt)
+        self.results_widget.validation_toggled.connect(self.on_validation_toggled)
+        # Перекрестная проверка оценивает автоматически рассчитанные параметры трансформации
+        self.proj_widget.chk_custom_trans.toggled.connect(
+            lambda checked: self.results_widget.set_validation_available(not checked))
+        self.results_widget.set_validation_available(not self.proj_widget.is_custom_transformation())
         center_layout.addWidget(self.results_widget)
         
         main_layout.addWidget(center_column, stretch=1)
@@ -220,148 +245,193 @@ class MainWindow(QMainWindow):
 
     def calculate(self):
         try:
-            # 1. Получение и парсинг координат
+            # 1. Получение и парсинг координат (в потоке GUI - виджеты недоступны из фонового потока)
             data = self.coords_widget.get_data()
-            wgs_raw = self.parse_text_data(data["wgs"])
-            msk_raw = self.parse_text_data(data["msk"])
-            
-            if len(wgs_raw) != len(msk_raw):
-                raise ValueError("Количество точек не совпадает.")
-            
-            if len(wgs_raw) < 3:
-                raise ValueError("Нужно минимум 3 точки.")
+            # ID, Lat, Lon, H и ID, x, y, h (общий разбор с консольным режимом)
+            ids, wgs_coords_list = parse_control_points(data["wgs"].split('\n'))
+            _, msk_coords_list = parse_control_points(data["msk"].split('\n'))
+            EstimationPipeline.validate(wgs_coords_list, msk_coords_list)
+
+            # Пользовательские параметры; None - расчет автоматически
+            projection = None
+            if self.proj_widget.is_custom_projection():
+                proj_params = self.proj_widget.get_projection_params()
+                projection = {
+                    "cm_deg": self.converter.parse_dms(proj_params["cm"]),
+                    "scale": proj_params["scale"],
+                    "fe": proj_params["fe"],
+                    "fn": proj_params["fn"],
+                    "lat0": proj_params["lat0"]
+                }
+            trans_params = None
+            if self.proj_widget.is_custom_transformation():
+                trans_params = self.proj_widget.get_transformation_params()
+
+            # Предыдущий расчет больше не нужен
+            self.cancel_calculation()
+            worker = Worker(self.run_calculation, ids, wgs_coords_list, msk_coords_list, projection, trans_params,
+                            validation=self.results_widget.chk_validation.isChecked())
+            worker.signals.progress.connect(self.on_calculation_progress)
+            worker.signals.finished.connect(self.on_calculation_finished)
+            worker.signals.error.connect(self.on_calculation_error)
+            worker.signals.cancelled.connect(self.on_calculation_cancelled)
+            self.calc_worker = worker
+            self.set_calculation_busy(True)
+            worker.start()
 
-            wgs_coords_list = []
-            msk_coords_list = []
-            ids = []
-            
-            for i in range(len(wgs_raw)):
-                # WGS
-                w_id = wgs_raw[i][0]
-                w_lat = float(wgs_raw[i][1])
-                w_lon = float(wgs_raw[i][2])
-                w_h = float(wgs_raw[i][3])
-                
-                # MSK
-                m_id = msk_raw[i][0]
-                m_x = float(msk_raw[i][1])
-                m_y = float(msk_raw[i][2])
-                m_h = float(msk_raw[i][3])
-                
-                ids.append(w_id)
-                wgs_coords_list.append([w_lat, w_lon, w_h])
-                msk_coords_list.append([m_x, m_y, m_h])
-
-            # --- ЭТАП 1: ПРОЕКЦИЯ ---
-            if not self.proj_widget.is_custom_projection():
-                # Автоматический расчет параметров проекции
-                proj_est = self.estimator.estimate_projection_parameters(wgs_coords_list, msk_coords_list, fixed_scale=True)
-                # cm_dms = self.converter.format_dms(proj_est["central_meridian"])
-                cm_dms = f"{proj_est['central_meridian']:.9f}"
-                
-                ui_proj_params = {
-                    "cm": cm_dms,
-                    "scale": proj_est["scale_factor"],
-                    "fe": proj_est["false_easting"],
-                    "fn": proj_est["false_northing"],
+        except Exception as e:
+            logger.exception("Ошибка расчета")
+            QMessageBox.critical(self, "Ошибка", str(e))
+
+    def run_calculation(self, ids, wgs_coords, msk_coords, projection, trans_params, validation=False,
+                        progress_callback=None, is_cancelled=None):
+        """
+        Расчет в фоновом потоке (без обращения к виджетам).
+        projection/trans_params - пользовательские параметры или None для автоматического расчета;
+        автоматические значения округляются так же, как в полях ввода.
+        Перекрестная проверка переуравнивает параметры Гельмерта, поэтому с пользовательскими
+        параметрами трансформации не выполняется - в таблице остаются невязки этих параметров.
+        """
+        validation = validation and trans_params is None
+        stages = [STAGE_GEOCENTRIC, STAGE_RESIDUALS]
+        if projection is None:
+            stages.append(STAGE_PROJECTION)
+        if trans_params is None:
+            stages.append(STAGE_HELMERT)
+        if validation:
+            stages.append(STAGE_VALIDATION)
+        done = []
+
+        def on_stage(stage):
+            done.append(stage)
+            if progress_callback is not None:
+                progress_callback(len(done), len(stages))
+
+        pipeline = EstimationPipeline(self.converter, self.estimator, progress_callback=on_stage, is_cancelled=is_cancelled)
+        result = {
+            "ids": ids,
+            "wgs_coords": wgs_coords,
+            "auto_projection": projection is None,
+            "auto_transformation": trans_params is None,
+        }
+
+        # --- ЭТАП 1: ПРОЕКЦИЯ ---
+        if projection is None:
+            projection = ProjectionWidget.displayed_projection_params(pipeline.estimate_projection(wgs_coords, msk_coords))
+
+        # --- ЭТАП 2: ТРАНСФОРМАЦИЯ (ГЕЛЬМЕРТ) ---
+        # WGS -> Cartesian, MSK -> Cartesian (обратная задача проекции с текущими параметрами)
+        wgs_cartesian, msk_cartesian = pipeline.to_geocentric(wgs_coords, msk_coords, projection)
+        if trans_params is None:
+            trans_params = ProjectionWidget.displayed_transformation_params(
+                pipeline.estimate_transformation(wgs_cartesian, msk_cartesian))
+
+        # --- ЭТАП 3: ПРОВЕРКА ---
+        # WGS Cart -> [Helmert] -> MSK и сравнение с исходными MSK
+        diffs = pipeline.compute_residuals(wgs_cartesian, msk_coords, projection, trans_params)
+        if validation:
+            # Невязки прогноза (leave-one-out) для точек, исключенных из уравнивания
+            try:
+                diffs = pipeline.compute_validation_residuals(wgs_cartesian, msk_cartesian, msk_coords, projection)
+            except ValueError as e:
+                logger.warning(f"Перекрестная проверка не выполнена: {e}")
+
+        result.update({
+            "projection": projection,
+            "params": trans_params,
+            "residuals": diffs,
+            "timings": dict(pipeline.timings),
+        })
+        return result
+
+    def _is_current_calculation(self):
+        # Сигналы прерванного (замененного) расчета игнорируются
+        return self.calc_worker is not None and self.sender() is self.calc_worker.signals
+
+    def on_calculation_progress(self, done, total):
+        if self._is_current_calculation():
+            self.progress_calc.setRange(0, total)
+            self.progress_calc.setValue(done)
+
+    def on_calculation_finished(self, result):
+        if not self._is_current_calculation():
+            return
+        self.set_calculation_busy(False)
+        try:
+            projection = result["projection"]
+            params = result["params"]
+            if result["auto_projection"]:
+                self.proj_widget.set_projection_params({
+                    "cm": f"{projection['cm_deg']:.{PROJECTION_DECIMALS['cm']}f}",
+                    "scale": projection["scale"],
+                    "fe": projection["fe"],
+                    "fn": projection["fn"],
                     "lat0": 0
-                }
-                self.proj_widget.set_projection_params(ui_proj_params)
-            
-            # Получаем текущие параметры проекции из UI (автоматические или пользовательские)
-            proj_params = self.proj_widget.get_projection_params()
-            cm_deg = self.converter.parse_dms(proj_params["cm"])
-            
-            # --- ЭТАП 2: ТРАНСФОРМАЦИЯ (ГЕЛЬМЕРТ) ---
-            
-            # Подготовка координат для Гельмерта (WGS Cartesian -> MSK Cartesian)
-            wgs_cartesian = []
-            msk_cartesian = []
-            
-            for i in range(len(wgs_coords_list)):
-                w_lat, w_lon, w_h = wgs_coords_list[i]
-                m_x, m_y, m_h = msk_coords_list[i]
-                
-                # WGS -> Cartesian
-                wx, wy, wz = self.converter.wgs84_to_cartesian(w_lat, w_lon, w_h)
-                wgs_cartesian.append([wx, wy, wz])
-                
-                # MSK -> Cartesian (обратная задача проекции с текущими параметрами)
-                mx, my, mz = self.converter.msk_to_cartesian(
-                    northing=m_x, easting=m_y, h=m_h, 
-                    central_meridian_deg=cm_deg, 
-                    false_easting=proj_params["fe"], 
-                    false_northing=proj_params["fn"], 
-                    scale_factor=proj_params["scale"], 
-                    lat_origin=proj_params["lat0"]
-                )
-                msk_cartesian.append([mx, my, mz])
-                
-            wgs_cartesian = np.array(wgs_cartesian)
-            msk_cartesian = np.array(msk_cartesian)
-            
-            if not self.proj_widget.is_custom_transformation():
-                # Автоматический расчет параметров Гельмерта
-                helmert_params = self.estimator.calculate_helmert(wgs_cartesian, msk_cartesian)
-                self.proj_widget.set_transformation_params(helmert_params)
-            
-            # Получаем текущие параметры трансформации из UI
-            trans_params = self.proj_widget.get_transformation_params()
-            
-            # --- ЭТАП 3: ПРОВЕРКА И ВЫВОД ---
-            
-            # Применяем трансформацию: WGS Cart -> [Helmert] -> Transformed Cart
-            transformed_cart = self.estimator.apply_helmert(wgs_cartesian, trans_params)
-            
-            # Transformed Cart -> MSK (прямая задача проекции)
-            comparison_data = []
-            for i in range(len(transformed_cart)):
-                tx, ty, tz = transformed_cart[i]
-                n, e, h = self.converter.cartesian_to_msk(
-                    tx, ty, tz, cm_deg, 
-                    proj_params["fe"], proj_params["fn"], 
-                    proj_params["scale"], proj_params["lat0"]
-                )
-                
-                # Сравнение с исходными MSK
-                orig_n, orig_e, orig_h = msk_coords_list[i]
-                
-                dx = orig_n - n
-                dy = orig_e - e
-                dh = orig_h - h
-                
-                comparison_data.append((ids[i], dx, dy, dh))
-                
+                })
+            if result["auto_transformation"]:
+                self.proj_widget.set_transformation_params(params)
+
             # Обновление таблицы сравнения
+            ids = result["ids"]
+            comparison_data = [(ids[i], dx, dy, dh) for i, (dx, dy, dh) in enumerate(result["residuals"])]
             self.results_widget.set_comparison_data(comparison_data)
-            
-            # Генерация WKT
-            # Объединяем параметры
-            full_params = trans_params.copy() # Tx, Ty, Tz, Rx, Ry, Rz, Scale_ppm
-            
+
             # Сохраняем для обновления при переключении геоида
             self.last_calc_result = {
-                "params": full_params,
-                "cm_deg": cm_deg,
-                "fe": proj_params["fe"],
-                "fn": proj_params["fn"],
-                "scale": proj_params["scale"],
-                "lat0": proj_params["lat0"]
+                "params": dict(params), # Tx, Ty, Tz, Rx, Ry, Rz, Scale_ppm
+                "cm_deg": projection["cm_deg"],
+                "fe": projection["fe"],
+                "fn": projection["fn"],
+                "scale": projection["scale"],
+                "lat0": projection["lat0"]
             }
-            
+
             self.update_wkt_display()
-            
+
             logger.info("Расчет и формирование WKT выполнены успешно")
-            
+            logger.debug("Этапы расчета (с): " + ", ".join(f"{k}={v:.4f}" for k, v in result["timings"].items()))
+
             # Update map
-            self.last_wgs_coords = wgs_coords_list # Store for checkbox toggle
+            self.last_wgs_coords = result["wgs_coords"] # Store for checkbox toggle
             self.refresh_calc_map()
-            
-            
+
         except Exception as e:
             logger.exception("Ошибка расчета")
             QMessageBox.critical(self, "Ошибка", str(e))
 
+    def on_calculation_error(self, message):
+        if self._is_current_calculation():
+            self.set_calculation_busy(False)
+            QMessageBox.critical(self, "Ошибка", message)
+
+    def on_calculation_cancelled(self):
+        if self._is_current_calculation():
+            self.set_calculation_busy(False)
+            logger.info("Расчет отменен пользователем")
+
+    def cancel_calculation(self):
+        if self.calc_worker is not None:
+            self.calc_worker.cancel()
+            self.set_calculation_busy(False)
+
+    def set_calculation_busy(self, busy):
+        if not busy:
+            self.calc_worker = None
+        self.btn_calc.setEnabled(not busy)
+        self.progress_calc.setRange(0, 0)
+        self.progress_calc.setVisible(busy)
+        self.btn_cancel_calc.setVisible(busy)
+
+    def is_busy(self):
+        return self.calc_worker is not None
+
+    def closeEvent(self, event):
+        # Фоновые задачи прерываются до уничтожения виджетов
+        self.cancel_calculation()
+        self.page_wkt.cancel_conversion()
+        QThreadPool.globalInstance().waitForDone()
+        super().closeEvent(event)
+
     def refresh_calc_map(self):
         self.update_calc_map_from_input()
 
@@ -372,56 +442,27 @@ class MainWindow(QMainWindow):
         """
         try:
             data = self.coords_widget.get_data()
-            wgs_text = data["wgs"]
             
-            points = []
-            if wgs_text:
-                lines = wgs_text.strip().split('\n')
-                for line in lines:
-                    line = line.strip()
-                    if not line: continue
-                    
-                    # Try to parse line
-                    parts = line.replace(',', ' ').split()
-                    parts = [p.strip() for p in parts if p.strip()]
-                    
-                    if len(parts) >= 2:
-                        try:
-                            # Heuristic parsing
-                            lat, lon = 0.0, 0.0
-                            label = ""
-                            
-                            # Case 1: ID, Lat, Lon, H (4+)
-                            if len(parts) >= 4:
-                                label = parts[0]
-                                lat = float(parts[1])
-                                lon = float(parts[2])
-                            # Case 2: Lat, Lon, H (3) - could be ID, Lat, Lon
-                            elif len(parts) == 3:
-                                # Try as Lat, Lon, H
-                                try:
-                                    lat = float(parts[0])
-                                    lon = float(parts[1])
-                                except ValueError:
-                                    # Maybe ID, Lat, Lon
-                                    label = parts[0]
-                                    lat = float(parts[1])
-                                    lon = float(parts[2])
-                            # Case 3: Lat, Lon (2)
-                            elif len(parts) == 2:
-                                lat = float(parts[0])
-                                lon = float(parts[1])
-                                
-                            points.append((lat, lon, label))
-                        except ValueError:
-                            pass
+            # Общий разбор строк (src.core.reader): ID, Lat, Lon, H
+            wgs_points = parse_points(data["wgs"].split('\n'))
+            show_polygon = self.chk_calc_show_polygon.isChecked()
+            # Правка не изменила точки (пробелы, незавершенная строка) - карта не трогается
+            state = (points_digest(wgs_points), show_polygon)
+            if state == self._calc_map_state:
+                return
+            self._calc_map_state = state
+            points = list(zip(wgs_points["lat"].tolist(), wgs_points["lon"].tolist(), wgs_points["id"].tolist()))
             
-            self.calc_map_widget.update_map(points, show_polygon=self.chk_calc_show_polygon.isChecked())
+            self.calc_map_widget.update_map(points, show_polygon=show_polygon)
             
         except Exception as e:
             # Silent error for real-time updates to avoid spamming
             pass
 
+    def set_map_refresh_delay(self, delay_ms):
+        self.calc_map_refresh.set_delay(delay_ms)
+        self.page_wkt.map_refresh.set_delay(delay_ms)
+
     def update_wkt_display(self):
         if not hasattr(self, 'last_calc_result'):
             return
@@ -436,6 +477,11 @@ class MainWindow(QMainWindow):
         )
         self.results_widget.set_wkt_text(wkt)
 
+    def on_validation_toggled(self, checked):
+        # Пересчет таблицы сравнения, если расчет уже выполнялся
+        if hasattr(self, 'last_calc_result'):
+            self.calculate()
+
     def on_geoid_toggled(self, checked):
         self.update_wkt_display()
 
@@ -463,16 +509,3 @@ class MainWindow(QMainWindow):
             except Exception as e:
                 logger.exception("Ошибка сохранения файла")
                 QMessageBox.critical(self, "Ошибка", f"Не удалось сохранить файл: {e}")
-
-    def parse_text_data(self, text):
-        import re
-        data = []
-        lines = text.strip().split('\n')
-        for line in lines:
-            line = line.strip()
-            if not line: continue
-            parts = re.split(r'[,\t]', line)
-            parts = [p.strip() for p in parts if p.strip()]
-            if len(parts) >= 4:
-                data.append(parts[:4])
-        return data
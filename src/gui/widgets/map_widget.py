@@ -1,29 +1,212 @@
-from PySide6.QtWebEngineWidgets import QWebEngineView
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QSizePolicy
+from PySide6.QtCore import QEvent, Qt, QTimer
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QSizePolicy, QLabel
 from src.core.logger import logger
-import folium
+from src.config.loader import config
+import base64
 import io
+import json
+import math
+import numpy as np
+
+# Вид карты без точек (Москва)
+DEFAULT_LOCATION = [55.7558, 37.6173]
+DEFAULT_ZOOM = 5
+# Число точек, выше которого они рисуются кружками на canvas (один блок данных
+# вместо маркера-элемента DOM на каждую точку); настройка map.canvas_threshold
+CANVAS_THRESHOLD = 2000
+
+
+# Объект window.genwkt на странице Leaflet: слои точек (маркеры или кружки на canvas)
+# и полигона, которые обновляются из Python через runJavaScript без перезагрузки страницы
+_CONTROLLER_TEMPLATE = """
+        {% macro script(this, kwargs) %}
+        window.genwkt = (function (map) {
+            var markers = L.layerGroup().addTo(map);
+            var markerList = [];
+            // Режим большого числа точек: кружки на одном canvas вместо DOM-маркеров.
+            // featureGroup передает клики кружков группе (layerGroup - нет)
+            var renderer = L.canvas({padding: 0.5});
+            var circles = L.featureGroup().addTo(map);
+            var labels = [];
+            // Координаты текущих точек [[lat, lon], ...] - для полигона
+            var coords = [];
+            var polygon = null;
+            function popup(text) {
+                var el = document.createElement("span");
+                el.textContent = text;
+                return el;
+            }
+            circles.on("click", function (e) {
+                L.popup().setLatLng(e.latlng).setContent(popup(labels[e.layer.options.index])).openOn(map);
+            });
+            return {
+                // Замена точек с индекса start (точки до start не меняются)
+                setPoints: function (start, points) {
+                    circles.clearLayers();
+                    labels = [];
+                    while (markerList.length > start) {
+                        markers.removeLayer(markerList.pop());
+                    }
+                    coords.length = start;
+                    points.forEach(function (p) {
+                        coords.push([p[0], p[1]]);
+                        markerList.push(L.marker([p[0], p[1]]).bindPopup(popup(p[2])).addTo(markers));
+                    });
+                },
+                // Все точки одним блоком: base64 от Float64Array [lat0, lon0, lat1, lon1, ...]
+                setCanvasPoints: function (blob, pointLabels) {
+                    markers.clearLayers();
+                    markerList = [];
+                    circles.clearLayers();
+                    var bytes = Uint8Array.from(atob(blob), function (c) { return c.charCodeAt(0); });
+                    var values = new Float64Array(bytes.buffer);
+                    labels = pointLabels;
+                    coords = [];
+                    for (var i = 0; i < values.length; i += 2) {
+                        var ll = [values[i], values[i + 1]];
+                        coords.push(ll);
+                        circles.addLayer(L.circleMarker(ll, {renderer: renderer, index: i / 2, radius: 4, weight: 1,
+                                                             color: "#1f6fd1", fillOpacity: 0.8}));
+                    }
+                },
+                setPolygon: function (show) {
+                    if (polygon) {
+                        map.removeLayer(polygon);
+                        polygon = null;
+                    }
+                    if (show && coords.length >= 3) {
+                        polygon = L.polygon(coords, {color: "blue", weight: 2, fill: true, fillOpacity: 0.2}).addTo(map);
+                    }
+                },
+                fitBounds: function (bounds) { map.fitBounds(bounds); },
+                setView: function (center, zoom) { map.setView(center, zoom); }
+            };
+        })({{ this._parent.get_name() }});
+        {% endmacro %}
+    """
+
+
+def _layer_controller():
+    """
+    Элемент folium со скриптом window.genwkt (дочерний элемент карты).
+    """
+    from branca.element import MacroElement
+    from jinja2 import Template
+
+    controller = MacroElement()
+    controller._template = Template(_CONTROLLER_TEMPLATE)
+    return controller
+
+
+def common_prefix_length(old, new):
+    """
+    Число совпадающих начальных элементов двух списков точек.
+    """
+    n = min(len(old), len(new))
+    for i in range(n):
+        if old[i] != new[i]:
+            return i
+    return n
+
 
 class MapWidget(QWidget):
+    """
+    Карта на одной долгоживущей странице Leaflet (folium загружается один раз).
+    update_map отправляет на страницу только изменения: точки с первого отличающегося
+    индекса и полигон. До окончания загрузки страницы хранится только последнее состояние,
+    оно передается одним снимком после загрузки.
+    Больше canvas_threshold точек передаются одним блоком (base64 от массива float64)
+    и рисуются кружками на canvas.
+    QtWebEngine и folium загружаются после первой отрисовки виджета (заглушки).
+    """
+
     def __init__(self):
         super().__init__()
-        self.setup_ui()
         self.current_points = []
         self.show_polygon = True  # Default to True as requested
+        # Состояние, уже переданное странице: [(lat, lon, подпись)], флаг полигона
+        self._sent_points = []
+        self._sent_polygon = False
+        self._sent_canvas = False
+        self.canvas_threshold = config.get("map.canvas_threshold", CANVAS_THRESHOLD)
+        self._page_ready = False
+        self.setup_ui()
 
     def setup_ui(self):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
-        
-        self.web_view = QWebEngineView()
-        self.web_view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        layout.addWidget(self.web_view)
-        
+
+        # Заглушка до создания QWebEngineView (см. ensure_web_view)
+        self.web_view = None
+        self.placeholder = QLabel("Загрузка карты...")
+        self.placeholder.setAlignment(Qt.AlignCenter)
+        self.placeholder.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.placeholder.installEventFilter(self)
+        layout.addWidget(self.placeholder)
+
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.setMinimumWidth(400) # Minimum width as requested
-        
-        # Initial empty map
-        self.update_map([])
+
+    def eventFilter(self, obj, event):
+        if obj is self.placeholder and event.type() == QEvent.Paint and self.web_view is None:
+            # Карта создается после первой отрисовки: окно показывается без ожидания QtWebEngine
+            QTimer.singleShot(0, self.ensure_web_view)
+        return super().eventFilter(obj, event)
+
+    def ensure_web_view(self):
+        """
+        Создание QWebEngineView и загрузка пустой карты (один раз).
+        Точки update_map, вызванного раньше, передаются после загрузки страницы.
+        """
+        if self.web_view is not None:
+            return self.web_view
+        from PySide6.QtWebEngineWidgets import QWebEngineView
+
+        self.web_view = QWebEngineView()
+        self.web_view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.web_view.loadFinished.connect(self.on_load_finished)
+        self.layout().replaceWidget(self.placeholder, self.web_view)
+        self.placeholder.removeEventFilter(self)
+        self.placeholder.deleteLater()
+        self.placeholder = None
+
+        # Пустая карта; точки добавляются через update_map
+        self.load_page()
+        return self.web_view
+
+    def load_page(self):
+        """
+        Загрузка базовой страницы Leaflet. Выполняется один раз при создании QWebEngineView.
+        """
+        try:
+            import folium
+
+            m = folium.Map(location=DEFAULT_LOCATION, zoom_start=DEFAULT_ZOOM)
+            m.add_child(_layer_controller())
+            data = io.BytesIO()
+            m.save(data, close_file=False)
+            self._page_ready = False
+            self._reset_sent_state()
+            self.web_view.setHtml(data.getvalue().decode())
+        except Exception as e:
+            logger.exception("Ошибка загрузки карты")
+
+    def on_load_finished(self, ok):
+        if not ok:
+            logger.warning("Не удалось загрузить страницу карты")
+            return
+        self._page_ready = True
+        # Новая страница пуста: текущее состояние передается целиком
+        self._reset_sent_state()
+        self.update_map(self.current_points, self.show_polygon)
+
+    def _reset_sent_state(self):
+        self._sent_points = []
+        self._sent_polygon = False
+        self._sent_canvas = False
+
+    def _run_js(self, script):
+        self.web_view.page().runJavaScript(script)
 
     def update_map(self, points, show_polygon=True):
         """
@@ -33,44 +216,48 @@ class MapWidget(QWidget):
         """
         self.current_points = points
         self.show_polygon = show_polygon
-        
+        if not self._page_ready:
+            # Промежуточные состояния не копятся: после загрузки передается последнее
+            return
+
         try:
-            if not points:
-                # Default map (e.g., Moscow or world)
-                m = folium.Map(location=[55.7558, 37.6173], zoom_start=5)
+            new_points = []
+            for p in points:
+                lat, lon = float(p[0]), float(p[1])
+                if not (math.isfinite(lat) and math.isfinite(lon)):
+                    continue
+                label = str(p[2]) if len(p) > 2 else f"{lat:.5f}, {lon:.5f}"
+                new_points.append((lat, lon, label))
+
+            canvas = len(new_points) > self.canvas_threshold
+            if canvas:
+                points_changed = not self._sent_canvas or new_points != self._sent_points
+                if points_changed:
+                    blob = base64.b64encode(np.array([p[:2] for p in new_points], dtype="<f8").tobytes()).decode("ascii")
+                    labels = [p[2] for p in new_points]
+                    self._run_js(f"genwkt.setCanvasPoints('{blob}', {json.dumps(labels)});")
             else:
-                # Calculate center
-                lats = [p[0] for p in points]
-                lons = [p[1] for p in points]
-                center_lat = sum(lats) / len(lats)
-                center_lon = sum(lons) / len(lons)
-                
-                m = folium.Map(location=[center_lat, center_lon], zoom_start=10)
-                
-                # Add markers
-                for p in points:
-                    lat, lon = p[0], p[1]
-                    popup = str(p[2]) if len(p) > 2 else f"{lat:.5f}, {lon:.5f}"
-                    folium.Marker([lat, lon], popup=popup).add_to(m)
-                
-                # Add polygon if requested and we have enough points
-                if show_polygon and len(points) >= 3:
-                    folium.Polygon(
-                        locations=[(p[0], p[1]) for p in points],
-                        color="blue",
-                        weight=2,
-                        fill=True,
-                        fill_opacity=0.2
-                    ).add_to(m)
-                
-                # Fit bounds
-                m.fit_bounds([(min(lats), min(lons)), (max(lats), max(lons))])
-
-            # Save to HTML and load
-            data = io.BytesIO()
-            m.save(data, close_file=False)
-            html = data.getvalue().decode()
-            self.web_view.setHtml(html)
-            
+                # После режима canvas маркеры передаются заново
+                start = 0 if self._sent_canvas else common_prefix_length(self._sent_points, new_points)
+                points_changed = self._sent_canvas or start < len(self._sent_points) or start < len(new_points)
+                if points_changed:
+                    self._run_js(f"genwkt.setPoints({start}, {json.dumps(new_points[start:])});")
+
+            if points_changed or show_polygon != self._sent_polygon:
+                self._run_js(f"genwkt.setPolygon({json.dumps(bool(show_polygon))});")
+
+            if points_changed:
+                if new_points:
+                    lats = [p[0] for p in new_points]
+                    lons = [p[1] for p in new_points]
+                    bounds = [[min(lats), min(lons)], [max(lats), max(lons)]]
+                    self._run_js(f"genwkt.fitBounds({json.dumps(bounds)});")
+                else:
+                    self._run_js(f"genwkt.setView({json.dumps(DEFAULT_LOCATION)}, {DEFAULT_ZOOM});")
+
+            self._sent_points = new_points
+            self._sent_polygon = show_polygon
+            self._sent_canvas = canvas
+
         except Exception as e:
             logger.exception("Ошибка обновления карты")
@@ -3,6 +3,10 @@ from PySide6.QtWidgets import (QWidget, QGridLayout, QVBoxLayout, QLabel, QLineE
 from PySide6.QtCore import Qt
 from src.config.loader import config
 
+# Число знаков после запятой в полях ввода параметров
+PROJECTION_DECIMALS = {"cm": 9, "fe": 4, "fn": 4}
+TRANSFORMATION_DECIMALS = {"Tx": 4, "Ty": 4, "Tz": 4, "Rx": 5, "Ry": 5, "Rz": 5, "Scale_ppm": 5}
+
 class ProjectionWidget(QWidget):
     # auto_detect_clicked signal removed as button is removed
 
@@ -183,9 +187,9 @@ class ProjectionWidget(QWidget):
         if "scale" in params:
             self.entry_scale.setText(str(params["scale"]))
         if "fe" in params:
-            self.entry_fe.setText(f"{params['fe']:.4f}")
+            self.entry_fe.setText(f"{params['fe']:.{PROJECTION_DECIMALS['fe']}f}")
         if "fn" in params:
-            self.entry_fn.setText(f"{params['fn']:.4f}")
+            self.entry_fn.setText(f"{params['fn']:.{PROJECTION_DECIMALS['fn']}f}")
         if "lat0" in params:
             self.entry_lat0.setText(str(params["lat0"]))
 
@@ -201,13 +205,32 @@ class ProjectionWidget(QWidget):
         }
 
     def set_transformation_params(self, params):
-        if "Tx" in params: self.entry_tx.setText(f"{params['Tx']:.4f}")
-        if "Ty" in params: self.entry_ty.setText(f"{params['Ty']:.4f}")
-        if "Tz" in params: self.entry_tz.setText(f"{params['Tz']:.4f}")
-        if "Rx" in params: self.entry_rx.setText(f"{params['Rx']:.5f}")
-        if "Ry" in params: self.entry_ry.setText(f"{params['Ry']:.5f}")
-        if "Rz" in params: self.entry_rz.setText(f"{params['Rz']:.5f}")
-        if "Scale_ppm" in params: self.entry_s.setText(f"{params['Scale_ppm']:.5f}")
+        entries = dict(zip(TRANSFORMATION_DECIMALS, self.entries_trans))
+        for key, decimals in TRANSFORMATION_DECIMALS.items():
+            if key in params:
+                entries[key].setText(f"{params[key]:.{decimals}f}")
+
+    @staticmethod
+    def displayed_projection_params(projection):
+        """
+        Параметры проекции (cm_deg, scale, fe, fn, lat0) с тем же округлением,
+        что и в полях ввода: расчет в фоновом потоке ведется по значениям,
+        которые затем увидит пользователь.
+        """
+        return {
+            "cm_deg": float(f"{projection['cm_deg']:.{PROJECTION_DECIMALS['cm']}f}"),
+            "scale": projection["scale"],
+            "fe": float(f"{projection['fe']:.{PROJECTION_DECIMALS['fe']}f}"),
+            "fn": float(f"{projection['fn']:.{PROJECTION_DECIMALS['fn']}f}"),
+            "lat0": projection["lat0"],
+        }
+
+    @staticmethod
+    def displayed_transformation_params(params):
+        """
+        Параметры трансформации с округлением полей ввода (см. set_transformation_params).
+        """
+        return {key: float(f"{params[key]:.{decimals}f}") for key, decimals in TRANSFORMATION_DECIMALS.items()}
 
     def is_custom_projection(self):
         return self.chk_custom_proj.isChecked()
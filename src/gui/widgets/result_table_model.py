@@ -0,0 +1,94 @@
+import csv
+
+import numpy as np
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+
+class PointTableModel(QAbstractTableModel):
+    """
+    Таблица точек (ID и числовые столбцы) поверх массивов NumPy.
+    Ячейки форматируются только при отрисовке (data), поэтому объем памяти и время
+    заполнения не зависят от числа строк: QTableView запрашивает лишь видимые ячейки.
+    """
+
+    def __init__(self, headers, decimals=4, parent=None):
+        super().__init__(parent)
+        self.headers = list(headers)
+        self.decimals = decimals
+        self._ids = np.empty(0, dtype=object)
+        self._values = np.empty((0, len(self.headers) - 1), dtype=float)
+
+    def set_headers(self, headers, decimals=None):
+        """
+        Смена столбцов (и числа знаков) с очисткой содержимого.
+        decimals - одно число для всех столбцов или список по числовым столбцам.
+        """
+        self.headers = list(headers)
+        if decimals is not None:
+            self.decimals = decimals
+        self.clear()
+
+    def _decimals(self, column):
+        if isinstance(self.decimals, int):
+            return self.decimals
+        return self.decimals[column - 1]
+
+    def set_data(self, ids, *columns):
+        """
+        Замена содержимого: ids - массив идентификаторов, columns - числовые столбцы той же длины.
+        """
+        self.beginResetModel()
+        self._ids = np.asarray(ids, dtype=object)
+        self._values = np.column_stack(columns) if columns else np.empty((len(self._ids), 0))
+        self.endResetModel()
+
+    def clear(self):
+        self.set_data(np.empty(0, dtype=object), *([np.empty(0)] * (len(self.headers) - 1)))
+
+    def ids(self):
+        return self._ids
+
+    def column(self, index):
+        """
+        Числовой столбец index (0 - первый после ID) как массив.
+        """
+        return self._values[:, index]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def _format(self, row, column):
+        if column == 0:
+            return str(self._ids[row])
+        return f"{self._values[row, column - 1]:.{self._decimals(column)}f}"
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self._format(index.row(), index.column())
+        if role == Qt.TextAlignmentRole and index.column() > 0:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    def iter_rows(self):
+        """
+        Строки в том же виде, что и в таблице (для экспорта), без обращения к представлению.
+        """
+        formats = [f"{{:.{self._decimals(column)}f}}" for column in range(1, len(self.headers))]
+        for pt_id, values in zip(self._ids.tolist(), self._values.tolist()):
+            yield [str(pt_id)] + [fmt.format(v) for fmt, v in zip(formats, values)]
+
+    def write_csv(self, path):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(self.headers)
+            writer.writerows(self.iter_rows())
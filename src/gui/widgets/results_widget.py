@@ -6,6 +6,7 @@ class ResultsWidget(QWidget):
     geoid_toggled = Signal(bool)
     crs_name_changed = Signal(str)
     save_clicked = Signal()
+    validation_toggled = Signal(bool)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -26,6 +27,19 @@ class ResultsWidget(QWidget):
         title_comp.setStyleSheet("font-weight: bold; color: #FFFFFF; font-size: 14px;")
         comp_layout.addWidget(title_comp)
         
+        # Режим перекрестной проверки: невязки прогноза вместо невязок уравнивания
+        self.chk_validation = QCheckBox("Перекрестная проверка (leave-one-out)")
+        self.chk_validation.setToolTip("Невязка каждой точки по параметрам, рассчитанным без нее")
+        self.chk_validation.toggled.connect(self.validation_toggled.emit)
+        comp_layout.addWidget(self.chk_validation)
+        # Перекрестная проверка переуравнивает параметры - с заданными пользователем она недоступна
+        self.lbl_validation_note = QLabel("Перекрестная проверка недоступна: заданы пользовательские параметры "
+                                          "трансформации, таблица показывает невязки этих параметров")
+        self.lbl_validation_note.setWordWrap(True)
+        self.lbl_validation_note.setStyleSheet("color: #A0A0A0;")
+        self.lbl_validation_note.setVisible(False)
+        comp_layout.addWidget(self.lbl_validation_note)
+        
         self.table_comp = QTableWidget()
         self.table_comp.setColumnCount(4)
         self.table_comp.setHorizontalHeaderLabels(["ID", "dX (м)", "dY (м)", "dH (м)"])
@@ -87,5 +101,9 @@ class ResultsWidget(QWidget):
             self.table_comp.setItem(i, 2, QTableWidgetItem(f"{dy:.4f}"))
             self.table_comp.setItem(i, 3, QTableWidgetItem(f"{dh:.4f}"))
 
+    def set_validation_available(self, available):
+        self.chk_validation.setEnabled(available)
+        self.lbl_validation_note.setVisible(not available)
+
     def set_wkt_text(self, text):
         self.text_wkt.setText(text)
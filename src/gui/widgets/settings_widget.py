@@ -1,9 +1,11 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QComboBox, QFrame, QGridLayout
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QComboBox, QFrame, QGridLayout, QSpinBox
 from PySide6.QtCore import Signal
 from src.config.loader import config
+from src.gui.debounce import DEFAULT_REFRESH_DELAY_MS
 
 class SettingsWidget(QWidget):
     theme_changed = Signal(str)
+    map_refresh_delay_changed = Signal(int)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -38,6 +40,14 @@ class SettingsWidget(QWidget):
         self.combo_theme.currentTextChanged.connect(self.on_theme_changed)
         grid.addWidget(self.combo_theme, 0, 1)
 
+        # Задержка обновления карты при вводе координат
+        grid.addWidget(QLabel("Задержка обновления карты (мс):"), 1, 0)
+        self.spin_map_delay = QSpinBox()
+        self.spin_map_delay.setRange(0, 5000)
+        self.spin_map_delay.setSingleStep(50)
+        self.spin_map_delay.valueChanged.connect(self.on_map_delay_changed)
+        grid.addWidget(self.spin_map_delay, 1, 1)
+
         card_layout.addLayout(grid)
         card_layout.addStretch()
         
@@ -47,7 +57,14 @@ class SettingsWidget(QWidget):
     def load_settings(self):
         current_theme = config.get("app.theme", "Dark")
         self.combo_theme.setCurrentText(current_theme)
+        self.spin_map_delay.blockSignals(True)
+        self.spin_map_delay.setValue(int(config.get("map.refresh_delay_ms", DEFAULT_REFRESH_DELAY_MS)))
+        self.spin_map_delay.blockSignals(False)
 
     def on_theme_changed(self, theme_name):
         self.theme_changed.emit(theme_name)
         config.set("app.theme", theme_name) 
+
+    def on_map_delay_changed(self, delay_ms):
+        self.map_refresh_delay_changed.emit(delay_ms)
+        config.set("map.refresh_delay_ms", delay_ms)
@@ -1,16 +1,44 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                                QPushButton, QTextEdit, QLineEdit, QFrame, 
-                               QFileDialog, QMessageBox, QTableWidget, QTableWidgetItem, QHeaderView, QCheckBox)
-from PySide6.QtCore import Qt
+                               QFileDialog, QMessageBox, QTableView, QHeaderView, QCheckBox,
+                               QProgressBar)
+from PySide6.QtCore import Qt, QThreadPool
+from src.core.conversion import convert_points
 from src.core.converter import CoordinateConverter
+from src.core.reader import count_lines, empty_points, points_digest, read_points
 from src.core.logger import logger
+from src.config.loader import config
 from src.gui.widgets.map_widget import MapWidget
-import csv
+from src.gui.widgets.result_table_model import PointTableModel
+from src.gui.workers import Worker
+from src.gui.debounce import DEFAULT_REFRESH_DELAY_MS, Debouncer
+import os
+from itertools import islice
+
+# Файлы больше этого размера (байт) не загружаются в поле ввода, а читаются потоково
+TEXT_WIDGET_LIMIT = 2 * 1024 * 1024
+# Число строк предпросмотра для файла, подключенного как источник
+PREVIEW_LINES = 200
+
+# Подписи и столбцы результатов для прямого (WGS84 -> МСК) и обратного (МСК -> WGS84) пересчета
+RESULT_HEADERS = ["ID", "X (Север)", "Y (Восток)", "H (Высота)"]
+INVERSE_RESULT_HEADERS = ["ID", "Lat", "Lon", "H (Высота)"]
+# Градусы - 9 знаков (доли миллиметра), метры - 4
+INVERSE_DECIMALS = [9, 9, 4]
 
 class WktConverterWidget(QWidget):
     def __init__(self):
         super().__init__()
         self.converter = CoordinateConverter()
+        # Путь к большому файлу координат, читаемому потоково вместо поля ввода
+        self.coords_file = None
+        # Текущая фоновая конвертация (Worker) или None
+        self.convert_worker = None
+        # Отложенное обновление карты при правке координат и состояние последнего обновления
+        self.map_refresh = Debouncer(self.refresh_map, config.get("map.refresh_delay_ms", DEFAULT_REFRESH_DELAY_MS), self)
+        self._map_state = None
+        # Направление пересчета: False - WGS84 -> МСК, True - МСК -> WGS84
+        self.inverse = False
         self.setup_ui()
 
     def setup_ui(self):
@@ -61,10 +89,15 @@ class WktConverterWidget(QWidget):
         input_layout.setContentsMargins(15, 15, 15, 15)
         
         input_header = QHBoxLayout()
-        input_title = QLabel("Координаты WGS84 (ID, Lat, Lon, H)")
-        input_title.setStyleSheet("font-weight: bold; color: #FFFFFF;")
-        input_header.addWidget(input_title)
+        self.input_title = QLabel("Координаты WGS84 (ID, Lat, Lon, H)")
+        self.input_title.setStyleSheet("font-weight: bold; color: #FFFFFF;")
+        input_header.addWidget(self.input_title)
         input_header.addStretch()
+        # Переключатель направления: обратный пересчет для выноса проектных точек
+        self.chk_inverse = QCheckBox("МСК → WGS84")
+        self.chk_inverse.setStyleSheet("color: #FFFFFF;")
+        self.chk_inverse.toggled.connect(self.set_inverse)
+        input_header.addWidget(self.chk_inverse)
         btn_load_file = QPushButton("Загрузить из файла")
         btn_load_file.clicked.connect(self.load_coords_from_file)
         input_header.addWidget(btn_load_file)
@@ -72,9 +105,21 @@ class WktConverterWidget(QWidget):
         
         self.coords_input = QTextEdit()
         self.coords_input.setPlaceholderText("Введите координаты построчно (разделитель запятая или пробел):\n1,54.9183617,28.7378755,145\n2,54.8922442,28.7457653,147\n3,54.8688434,28.7250955,171")
-        self.coords_input.textChanged.connect(lambda: self.refresh_map())
+        self.coords_input.textChanged.connect(self.map_refresh.trigger)
         input_layout.addWidget(self.coords_input)
         
+        # Информация о подключенном файле (для больших файлов вместо текста)
+        file_layout = QHBoxLayout()
+        self.lbl_coords_file = QLabel()
+        self.lbl_coords_file.setWordWrap(True)
+        file_layout.addWidget(self.lbl_coords_file, stretch=1)
+        self.btn_clear_file = QPushButton("Очистить")
+        self.btn_clear_file.clicked.connect(self.clear_coords_file)
+        file_layout.addWidget(self.btn_clear_file)
+        input_layout.addLayout(file_layout)
+        self.lbl_coords_file.setVisible(False)
+        self.btn_clear_file.setVisible(False)
+        
         # Лейбл предупреждения о высоте
         self.lbl_height_warning = QLabel("Высоты не пересчитывались, т.к. в WKT не описана вертикальная система координат")
         self.lbl_height_warning.setStyleSheet("color: #FF5555; font-weight: bold;")
@@ -92,6 +137,17 @@ class WktConverterWidget(QWidget):
         self.btn_convert.setObjectName("actionButton")
         self.btn_convert.clicked.connect(self.convert)
         center_layout.addWidget(self.btn_convert)
+
+        # Ход фоновой конвертации и отмена
+        progress_layout = QHBoxLayout()
+        self.progress_convert = QProgressBar()
+        progress_layout.addWidget(self.progress_convert, stretch=1)
+        self.btn_cancel_convert = QPushButton("Отмена")
+        self.btn_cancel_convert.clicked.connect(self.cancel_conversion)
+        progress_layout.addWidget(self.btn_cancel_convert)
+        center_layout.addLayout(progress_layout)
+        self.progress_convert.setVisible(False)
+        self.btn_cancel_convert.setVisible(False)
         
         # 4. Секция результатов (МСК)
         card_result = QFrame()
@@ -100,21 +156,23 @@ class WktConverterWidget(QWidget):
         result_layout.setContentsMargins(15, 15, 15, 15)
         
         result_header = QHBoxLayout()
-        result_title = QLabel("Результат (МСК)")
-        result_title.setStyleSheet("font-weight: bold; color: #FFFFFF;")
-        result_header.addWidget(result_title)
+        self.result_title = QLabel("Результат (МСК)")
+        self.result_title.setStyleSheet("font-weight: bold; color: #FFFFFF;")
+        result_header.addWidget(self.result_title)
         result_header.addStretch()
         btn_save_file = QPushButton("Сохранить в файл")
         btn_save_file.clicked.connect(self.save_results_to_file)
         result_header.addWidget(btn_save_file)
         result_layout.addLayout(result_header)
         
-        self.result_table = QTableWidget()
-        self.result_table.setColumnCount(4)
-        self.result_table.setHorizontalHeaderLabels(["ID", "X (Север)", "Y (Восток)", "H (Высота)"])
+        self.result_model = PointTableModel(RESULT_HEADERS)
+        self.result_table = QTableView()
+        self.result_table.setModel(self.result_model)
         self.result_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         # self.result_table.setStyleSheet(...) # Removed inline style to use QSS
         self.result_table.verticalHeader().setVisible(False)
+        # Фиксированная высота строк: представление не измеряет каждую строку
+        self.result_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         result_layout.addWidget(self.result_table)
         
         center_layout.addWidget(card_result)
@@ -153,6 +211,25 @@ class WktConverterWidget(QWidget):
         right_layout.addWidget(card_map)
         main_layout.addWidget(right_column, stretch=2)
         
+    def set_inverse(self, inverse):
+        """
+        Смена направления пересчета: подписи ввода и таблицы результатов, очистка результатов.
+        В обратном направлении на карте - пересчитанные точки WGS84, а не ввод (МСК).
+        """
+        self.inverse = bool(inverse)
+        self.cancel_conversion()
+        if self.inverse:
+            self.input_title.setText("Координаты МСК (ID, X, Y, H)")
+            self.coords_input.setPlaceholderText("Введите координаты построчно (разделитель запятая или пробел):\n1,6097200.123,500000.456,145")
+            self.result_title.setText("Результат (WGS84)")
+            self.result_model.set_headers(INVERSE_RESULT_HEADERS, INVERSE_DECIMALS)
+        else:
+            self.input_title.setText("Координаты WGS84 (ID, Lat, Lon, H)")
+            self.coords_input.setPlaceholderText("Введите координаты построчно (разделитель запятая или пробел):\n1,54.9183617,28.7378755,145\n2,54.8922442,28.7457653,147\n3,54.8688434,28.7250955,171")
+            self.result_title.setText("Результат (МСК)")
+            self.result_model.set_headers(RESULT_HEADERS, 4)
+        self.refresh_map()
+
     def load_from_prj(self):
         file_name, _ = QFileDialog.getOpenFileName(self, "Открыть файл PRJ", "", "Projection Files (*.prj);;All Files (*)")
         if file_name:
@@ -169,35 +246,78 @@ class WktConverterWidget(QWidget):
         file_name, _ = QFileDialog.getOpenFileName(self, "Открыть файл координат", "", "Text Files (*.txt *.csv);;All Files (*)")
         if file_name:
             try:
-                with open(file_name, 'r', encoding='utf-8') as f:
-                    text = f.read()
-                    self.coords_input.setText(text)
+                if os.path.getsize(file_name) > config.get("reader.text_widget_limit", TEXT_WIDGET_LIMIT):
+                    self.set_coords_file(file_name)
+                else:
+                    self.clear_coords_file()
+                    with open(file_name, 'r', encoding='utf-8') as f:
+                        text = f.read()
+                        self.coords_input.setText(text)
                 logger.info(f"Загружены координаты из {file_name}")
             except Exception as e:
                 logger.exception(f"Не удалось загрузить файл координат: {file_name}")
                 QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить файл:\n{e}")
 
+    def set_coords_file(self, file_name):
+        """
+        Подключение файла координат как источника: в поле ввода - только предпросмотр,
+        конвертация читает файл блоками в фоновом потоке, карта показывает предпросмотр.
+        """
+        self.coords_file = file_name
+        with open(file_name, 'r', encoding='utf-8') as f:
+            preview = "".join(islice(f, PREVIEW_LINES))
+        self.coords_input.blockSignals(True)
+        self.coords_input.setPlainText(preview)
+        self.coords_input.blockSignals(False)
+        self.coords_input.setReadOnly(True)
+        size_mb = os.path.getsize(file_name) / (1024 * 1024)
+        self.lbl_coords_file.setText(f"Файл: {os.path.basename(file_name)} ({size_mb:.1f} МБ), "
+                                     f"показаны первые {PREVIEW_LINES} строк")
+        self.lbl_coords_file.setVisible(True)
+        self.btn_clear_file.setVisible(True)
+        self.refresh_map()
+
+    def clear_coords_file(self):
+        """
+        Отключение файла-источника и возврат к ручному вводу.
+        """
+        if self.coords_file is None:
+            return
+        self.coords_file = None
+        self.coords_input.setReadOnly(False)
+        self.lbl_coords_file.setVisible(False)
+        self.btn_clear_file.setVisible(False)
+        self.coords_input.clear()
+
+    def _point_source(self):
+        """
+        Источник точек для reader: путь к подключенному файлу или строки поля ввода.
+        """
+        if self.coords_file:
+            return self.coords_file
+        return self.coords_input.toPlainText().split('\n')
+
+    def _result_points(self):
+        """
+        Результаты обратного пересчета (ID, Lat, Lon, H) в виде массива POINT_DTYPE для карты.
+        """
+        points = empty_points(self.result_model.rowCount())
+        points["id"] = self.result_model.ids()
+        points["lat"] = self.result_model.column(0)
+        points["lon"] = self.result_model.column(1)
+        points["h"] = self.result_model.column(2)
+        return points
+
     def save_results_to_file(self):
-        if self.result_table.rowCount() == 0:
+        if self.result_model.rowCount() == 0:
             QMessageBox.warning(self, "Внимание", "Нет результатов для сохранения")
             return
 
         file_name, _ = QFileDialog.getSaveFileName(self, "Сохранить результаты", "", "CSV Files (*.csv);;Text Files (*.txt);;All Files (*)")
         if file_name:
             try:
-                with open(file_name, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    # Заголовки
-                    headers = [self.result_table.horizontalHeaderItem(i).text() for i in range(self.result_table.columnCount())]
-                    writer.writerow(headers)
-                    
-                    # Данные
-                    for row in range(self.result_table.rowCount()):
-                        row_data = []
-                        for col in range(self.result_table.columnCount()):
-                            item = self.result_table.item(row, col)
-                            row_data.append(item.text() if item else "")
-                        writer.writerow(row_data)
+                # Экспорт из массивов модели, а не из ячеек представления
+                self.result_model.write_csv(file_name)
                 
                 logger.info(f"Результаты сохранены в {file_name}")
                 QMessageBox.information(self, "Успех", f"Файл успешно сохранен:\n{file_name}")
@@ -215,147 +335,129 @@ class WktConverterWidget(QWidget):
             has_vertical = self.converter.check_vertical_crs(wkt)
             self.lbl_height_warning.setVisible(not has_vertical)
             
-            input_text = self.coords_input.toPlainText().strip()
-            if not input_text:
+            if not self.coords_file and not self.coords_input.toPlainText().strip():
                 raise ValueError("Введите координаты.")
             
-            lines = input_text.split('\n')
-            results = []
+            # Разбор строк блоками (ID, Lat, Lon, H) и пакетная трансформация каждого блока - в фоновом потоке
+            self.cancel_conversion()
+            worker = Worker(self.run_conversion, self.converter, wkt, self._point_source(), self.inverse)
+            worker.signals.progress.connect(self.on_conversion_progress)
+            worker.signals.finished.connect(self.on_conversion_finished)
+            worker.signals.error.connect(self.on_conversion_error)
+            worker.signals.cancelled.connect(self.on_conversion_cancelled)
+            self.convert_worker = worker
+            self.set_conversion_busy(True)
+            worker.start()
             
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Замена запятых на точки (кроме тех, что разделяют поля, если это CSV)
-                # Но пользователь может использовать запятую как разделитель полей.
-                # Поэтому сначала пробуем разделить по запятой.
-                
-                parts = line.split(',')
-                if len(parts) < 2:
-                    # Если запятых нет, пробуем пробелы
-                    parts = line.split()
-                
-                # Очистка частей
-                parts = [p.strip() for p in parts if p.strip()]
-                
-                if len(parts) < 2:
-                    continue 
+        except Exception as e:
+            logger.exception("Ошибка конвертации WKT")
+            QMessageBox.critical(self, "Ошибка", str(e))
 
-                pt_id = ""
-                lat = 0.0
-                lon = 0.0
-                h = 0.0
-                
-                try:
-                    # Логика определения полей:
-                    # 4 поля: ID, Lat, Lon, H
-                    # 3 поля: Lat, Lon, H (ID пустой)
-                    # 2 поля: Lat, Lon (ID пустой, H=0)
-                    
-                    if len(parts) >= 4:
-                        pt_id = parts[0]
-                        lat = float(parts[1])
-                        lon = float(parts[2])
-                        h = float(parts[3])
-                    elif len(parts) == 3:
-                        # Может быть ID, Lat, Lon ИЛИ Lat, Lon, H
-                        # Попробуем распарсить первое как число. Если это ID, оно может быть числом.
-                        # Но Lat тоже число.
-                        # Предположим стандарт Lat, Lon, H если 3 числа.
-                        lat = float(parts[0])
-                        lon = float(parts[1])
-                        h = float(parts[2])
-                    elif len(parts) == 2:
-                        lat = float(parts[0])
-                        lon = float(parts[1])
-                    
-                    n, e, h_msk = self.converter.wkt_to_msk(wkt, lat, lon, h)
-                    results.append((pt_id, n, e, h_msk))
-                    
-                except ValueError:
-                    # Если не удалось распарсить как числа, возможно первый элемент это ID
-                    if len(parts) == 3:
-                        try:
-                            pt_id = parts[0]
-                            lat = float(parts[1])
-                            lon = float(parts[2])
-                            n, e, h_msk = self.converter.wkt_to_msk(wkt, lat, lon, h)
-                            results.append((pt_id, n, e, h_msk))
-                        except ValueError:
-                            continue
-                    else:
-                        continue
-            
-            # Заполнение таблицы
-            self.result_table.setRowCount(len(results))
-            for i, (pt_id, n, e, h_msk) in enumerate(results):
-                self.result_table.setItem(i, 0, QTableWidgetItem(str(pt_id)))
-                self.result_table.setItem(i, 1, QTableWidgetItem(f"{n:.4f}"))
-                self.result_table.setItem(i, 2, QTableWidgetItem(f"{e:.4f}"))
-                self.result_table.setItem(i, 3, QTableWidgetItem(f"{h_msk:.4f}"))
+    @staticmethod
+    def run_conversion(converter, wkt, source, inverse=False, progress_callback=None, is_cancelled=None):
+        """
+        Конвертация в фоновом потоке; прогресс - число обработанных точек из числа строк источника.
+        """
+        total = count_lines(source)
+        progress = (lambda done: progress_callback(min(done, total), total)) if progress_callback else None
+        return convert_points(converter, wkt, source, progress_callback=progress,
+                              is_cancelled=is_cancelled, inverse=inverse)
+
+    def _is_current_conversion(self):
+        # Сигналы прерванной (замененной) конвертации игнорируются
+        return self.convert_worker is not None and self.sender() is self.convert_worker.signals
+
+    def on_conversion_progress(self, done, total):
+        if self._is_current_conversion():
+            self.progress_convert.setRange(0, total)
+            self.progress_convert.setValue(done)
+
+    def on_conversion_finished(self, result):
+        if not self._is_current_conversion():
+            return
+        self.set_conversion_busy(False)
+        try:
+            # Заполнение таблицы: модель хранит массивы, ячейки форматируются при отрисовке
+            if "lat" in result:
+                self.result_model.set_data(result["ids"], result["lat"], result["lon"], result["h"])
+            else:
+                self.result_model.set_data(result["ids"], result["northing"], result["easting"], result["h"])
             
-            logger.info(f"Конвертировано {len(results)} точек по WKT")
+            logger.info(f"Конвертировано {self.result_model.rowCount()} точек по WKT")
             
             # Обновление карты
-            self.refresh_map(results_data=results)
-            
+            self.refresh_map()
+
+            # Пропущенные точки не попадают в таблицу и на карту - об этом сообщается явно
+            errors = result.get("errors", 0)
+            if errors:
+                logger.warning(f"Не пересчитано {errors} точек по WKT")
+                QMessageBox.warning(self, "Внимание",
+                                    f"Не пересчитано точек: {errors}.\n"
+                                    "Точки вне сетки геоида (или вне ее фрагментов, если полная сетка "
+                                    "не найдена) и точки с ошибкой пересчета пропущены.")
             
         except Exception as e:
             logger.exception("Ошибка конвертации WKT")
             QMessageBox.critical(self, "Ошибка", str(e))
 
+    def on_conversion_error(self, message):
+        if self._is_current_conversion():
+            self.set_conversion_busy(False)
+            QMessageBox.critical(self, "Ошибка", message)
+
+    def on_conversion_cancelled(self):
+        if self._is_current_conversion():
+            self.set_conversion_busy(False)
+            logger.info("Конвертация отменена пользователем")
+
+    def cancel_conversion(self):
+        if self.convert_worker is not None:
+            self.convert_worker.cancel()
+            self.set_conversion_busy(False)
+
+    def set_conversion_busy(self, busy):
+        if not busy:
+            self.convert_worker = None
+        self.btn_convert.setEnabled(not busy)
+        self.progress_convert.setRange(0, 0)
+        self.progress_convert.setVisible(busy)
+        self.btn_cancel_convert.setVisible(busy)
+
+    def is_busy(self):
+        return self.convert_worker is not None
+
+    def closeEvent(self, event):
+        self.cancel_conversion()
+        QThreadPool.globalInstance().waitForDone()
+        super().closeEvent(event)
+
     def refresh_map(self, results_data=None):
         """
         Обновляет карту. Если results_data не передан, пытается взять данные из полей ввода.
         """
         try:
-            points = []
             # Если данные переданы (из convert), используем их (но нам нужны WGS координаты для карты)
             # Карта рисует WGS точки.
             
-            # Поэтому лучше всегда парсить ввод WGS
-            input_text = self.coords_input.toPlainText().strip()
-            if not input_text:
-                self.map_widget.update_map([], show_polygon=self.chk_show_polygon.isChecked())
+            # Поэтому лучше всегда парсить ввод WGS; при обратном пересчете ввод - МСК,
+            # на карте - результаты WGS84. Подключенный файл не читается целиком в потоке GUI:
+            # на карте - только его предпросмотр (первые PREVIEW_LINES строк)
+            if self.inverse:
+                data = self._result_points()
+                if self.coords_file:
+                    data = data[:PREVIEW_LINES]
+            else:
+                data = read_points(self.coords_input.toPlainText().split('\n'))
+            show_polygon = self.chk_show_polygon.isChecked()
+            # Правка не изменила точки (пробелы, незавершенная строка) - карта не трогается
+            state = (points_digest(data), show_polygon)
+            if state == self._map_state:
                 return
-
-            lines = input_text.split('\n')
-            for line in lines:
-                line = line.strip()
-                if not line: continue
-                parts = line.split(',')
-                if len(parts) < 2: parts = line.split()
-                parts = [p.strip() for p in parts if p.strip()]
-                
-                if len(parts) >= 2:
-                    try:
-                        pt_id = ""
-                        lat = 0.0
-                        lon = 0.0
-                        
-                        if len(parts) >= 4:
-                            pt_id = parts[0]
-                            lat = float(parts[1])
-                            lon = float(parts[2])
-                        elif len(parts) == 3:
-                            lat = float(parts[0])
-                            lon = float(parts[1])
-                        elif len(parts) == 2:
-                            lat = float(parts[0])
-                            lon = float(parts[1])
-                            
-                        points.append((lat, lon, pt_id))
-                    except ValueError:
-                        if len(parts) == 3: # Try ID, Lat, Lon
-                             try:
-                                pt_id = parts[0]
-                                lat = float(parts[1])
-                                lon = float(parts[2])
-                                points.append((lat, lon, pt_id))
-                             except: pass
+            self._map_state = state
+            points = list(zip(data["lat"].tolist(), data["lon"].tolist(), data["id"].tolist()))
             
-            self.map_widget.update_map(points, show_polygon=self.chk_show_polygon.isChecked())
+            self.map_widget.update_map(points, show_polygon=show_polygon)
             
         except Exception as e:
             logger.exception("Ошибка обновления карты")
@@ -0,0 +1,56 @@
+import threading
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+from src.core.logger import logger
+from src.core.pipeline import OperationCancelled
+
+
+class WorkerSignals(QObject):
+    """
+    Сигналы фоновой задачи (QRunnable не является QObject и сам сигналы не испускает).
+    Доставляются в поток GUI через очередь событий.
+    """
+    progress = Signal(int, int)  # выполнено, всего (0 - объем неизвестен)
+    finished = Signal(object)    # результат функции
+    error = Signal(str)
+    cancelled = Signal()
+
+
+class Worker(QRunnable):
+    """
+    Выполнение fn(*args, progress_callback=..., is_cancelled=..., **kwargs) в QThreadPool.
+    fn не должна обращаться к виджетам: входные данные читаются до запуска,
+    результат применяется в обработчике сигнала finished.
+    Отмена - кооперативная: fn проверяет is_cancelled() и выбрасывает OperationCancelled.
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def start(self, pool=None):
+        (pool or QThreadPool.globalInstance()).start(self)
+
+    @Slot()
+    def run(self):
+        try:
+            result = self.fn(*self.args, progress_callback=self.signals.progress.emit,
+                             is_cancelled=self.is_cancelled, **self.kwargs)
+        except OperationCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            logger.exception("Ошибка фоновой задачи")
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
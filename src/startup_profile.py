@@ -0,0 +1,123 @@
+"""
+Профиль запуска приложения (python main.py --profile-startup).
+
+Время импорта считается по вызовам builtins.__import__ в главном потоке и
+суммируется по пакетам верхнего уровня - сжатый аналог python -X importtime.
+Дополнительно замеряются этапы запуска (импорты, QApplication, окно, первый кадр).
+Модуль импортируется до всех остальных, поэтому Qt в нем загружается только внутри функций.
+"""
+import builtins
+import sys
+import threading
+import time
+
+PROFILE_STARTUP_FLAG = "--profile-startup"
+
+
+class StartupProfiler:
+    """
+    Замер времени импортов и этапов запуска.
+    Для каждого импорта, загрузившего новые модули, учитывается собственное время
+    (без вложенных импортов), как столбец self в -X importtime.
+    """
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.phases = []
+        self.packages = {}  # пакет -> [собственное время, число импортов]
+        self._last_mark = self.start_time
+        self._original_import = None
+        self._thread_id = None
+        self._stack = []  # время вложенных импортов для текущих вызовов
+
+    def install(self):
+        if self._original_import is not None:
+            return
+        self._original_import = builtins.__import__
+        self._thread_id = threading.get_ident()
+        builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._original_import is None:
+            return
+        builtins.__import__ = self._original_import
+        self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        if threading.get_ident() != self._thread_id:
+            return original(name, globals, locals, fromlist, level)
+
+        loaded_before = len(sys.modules)
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            # Импорт уже загруженного модуля в отчет не попадает
+            if len(sys.modules) != loaded_before:
+                self._record(self._package_name(name, globals, level), elapsed - children)
+
+    @staticmethod
+    def _package_name(name, globals, level):
+        if level and globals:
+            # Относительный импорт - пакет вызывающего модуля
+            name = globals.get("__package__") or globals.get("__name__") or name
+        return name.split(".")[0] or "?"
+
+    def _record(self, package, self_time):
+        entry = self.packages.setdefault(package, [0.0, 0])
+        entry[0] += self_time
+        entry[1] += 1
+
+    def mark(self, phase):
+        """
+        Завершение этапа запуска: время с предыдущей отметки.
+        """
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last_mark))
+        self._last_mark = now
+
+    def total_import_time(self):
+        return sum(self_time for self_time, _ in self.packages.values())
+
+    def report(self, top=15):
+        """
+        Текстовый отчет: этапы запуска и самые долгие пакеты по собственному времени импорта.
+        """
+        lines = ["Профиль запуска:"]
+        for phase, elapsed in self.phases:
+            lines.append(f"  {phase:<28}{elapsed * 1000:10.1f} мс")
+        lines.append(f"  {'Всего':<28}{(self._last_mark - self.start_time) * 1000:10.1f} мс")
+
+        lines.append(f"Импорт модулей: {self.total_import_time() * 1000:.1f} мс")
+        lines.append(f"  {'Пакет':<28}{'мс':>10}{'импортов':>10}")
+        ranked = sorted(self.packages.items(), key=lambda item: item[1][0], reverse=True)
+        for package, (self_time, count) in ranked[:top]:
+            lines.append(f"  {package:<28}{self_time * 1000:10.1f}{count:>10}")
+        rest = ranked[top:]
+        if rest:
+            rest_time = sum(self_time for _, (self_time, _) in rest)
+            lines.append(f"  {f'прочие ({len(rest)})':<28}{rest_time * 1000:10.1f}")
+        return "\n".join(lines)
+
+
+def call_after_first_paint(widget, callback):
+    """
+    Вызов callback после первой отрисовки виджета (из цикла событий, когда кадр уже выведен).
+    """
+    from PySide6.QtCore import QEvent, QObject, QTimer
+
+    class _PaintWatcher(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint:
+                obj.removeEventFilter(self)
+                QTimer.singleShot(0, callback)
+            return False
+
+    # Дочерний объект виджета - живет, пока жив виджет
+    widget.installEventFilter(_PaintWatcher(widget))
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from src.core.angles import format_dms_array, parse_dms_array
+from src.core.converter import CoordinateConverter
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("30.0002885", 30.0002885),
+    ("30,0002885", 30.0002885),
+    ("29 59 59,91779", 29 + 59 / 60 + 59.91779 / 3600),
+    ("29 59 59.91779", 29 + 59 / 60 + 59.91779 / 3600),
+    ("12 30.5", 12 + 30.5 / 60),
+    ("-0 30 00", -0.5),
+    ("55°30'15.2\"N", 55 + 30 / 60 + 15.2 / 3600),
+    ("37°36'0\"W", -37.6),
+    ("S 12 30", -12.5),
+    ("55.5 E", 55.5),
+    ("55°30'E", 55.5),
+    (" +7 ", 7.0),
+])
+def test_parse_valid(text, expected):
+    degrees, invalid = parse_dms_array([text, "1 0 0"])
+    assert not invalid.any()
+    assert degrees[0] == pytest.approx(expected, abs=1e-12)
+
+
+@pytest.mark.parametrize("text", ["invalid", "", "29 61 00", "29 59 60", "1 2 3 4", "5-", "1..5", "N55 E"])
+def test_parse_invalid(text):
+    degrees, invalid = parse_dms_array(["10", text])
+    assert invalid.tolist() == [False, True]
+    assert degrees[0] == 10.0 and np.isnan(degrees[1])
+
+
+@pytest.mark.parametrize("text", ["55.5e", "55 30W", "1e3", "1E3", "inf", "1_000"])
+@pytest.mark.parametrize("column", [["10"], ["10 30 00"]])
+def test_parse_invalid_independent_of_column(text, column):
+    # Допустимость значения не зависит от того, разбирается ли столбец быстрым путем
+    degrees, invalid = parse_dms_array(column + [text])
+    assert invalid.tolist() == [False, True]
+    assert np.isnan(degrees[1])
+
+
+def test_parse_matches_float_exactly():
+    rng = np.random.default_rng(0)
+    values = rng.uniform(-90, 90, 2000)
+    # Мантисса длиннее 15 цифр и десятичная запятая вперемешку с DMS
+    text = [repr(v).replace(".", ",") for v in values.tolist()] + ["1 0 0"]
+    degrees, invalid = parse_dms_array(text)
+    assert not invalid.any()
+    assert (degrees[:-1] == values).all()
+
+
+def test_format_roundtrip_and_shape():
+    rng = np.random.default_rng(1)
+    values = rng.uniform(-180, 180, (50, 2))
+    text = format_dms_array(values)
+    assert text.shape == values.shape
+    degrees, invalid = parse_dms_array(text)
+    assert not invalid.any()
+    np.testing.assert_allclose(degrees, values, atol=1e-9)
+
+    assert format_dms_array([29.99999999999, -0.5, np.nan]).tolist() == ["30 00 00.00000", "-0 30 00.00000", ""]
+
+
+def test_matches_scalar_converter():
+    converter = CoordinateConverter()
+    text = ["30.0002885", "30,0002885", "29 59 59,91779", "-29 59 59.91779", "0 0 0"]
+    degrees, _ = converter.parse_dms_array(text)
+    assert degrees.tolist() == [converter.parse_dms(t) for t in text]
+    values = [29.99997716388889, -45.25, 0.0]
+    assert converter.format_dms_array(values).tolist() == [converter.format_dms(v) for v in values]
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from src.core.converter import CoordinateConverter
+
+WKT = 'PROJCS["Transverse_Mercator",GEOGCS["GCS_Pulkovo_1942",DATUM["D_Pulkovo_1942",SPHEROID["Krassowsky_1942",6378245.0,298.3]],PRIMEM["Greenwich",0.0],UNIT["Degree",0.0174532925199433]],PROJECTION["Transverse_Mercator"],PARAMETER["False_Easting",500000.0],PARAMETER["False_Northing",0.0],PARAMETER["Central_Meridian",39.0],PARAMETER["Scale_Factor",1.0],PARAMETER["Latitude_Of_Origin",0.0],UNIT["Meter",1.0]]'
+
+
+@pytest.fixture
+def converter():
+    return CoordinateConverter()
+
+
+def test_batch_matches_scalar(converter):
+    lats = np.array([55.0, 55.5, 56.0, 54.2])
+    lons = np.array([39.0, 38.5, 40.0, 37.1])
+    hs = np.array([100.0, 120.5, 200.0, 0.0])
+
+    northing, easting, h_msk, error_mask = converter.wkt_to_msk_batch(WKT, lats, lons, hs)
+
+    assert not error_mask.any()
+    for i in range(len(lats)):
+        n, e, h = converter.wkt_to_msk(WKT, lats[i], lons[i], hs[i])
+        assert northing[i] == pytest.approx(n, abs=1e-6)
+        assert easting[i] == pytest.approx(e, abs=1e-6)
+        assert h_msk[i] == pytest.approx(h, abs=1e-6)
+
+
+def test_batch_error_mask(converter):
+    # Вторая точка с NaN, третья за пределами допустимых широт
+    northing, easting, h_msk, error_mask = converter.wkt_to_msk_batch(
+        WKT, [55.0, np.nan, 95.0], [39.0, 39.0, 39.0], [100.0, 100.0, 100.0]
+    )
+
+    assert error_mask.tolist() == [False, True, True]
+    assert np.isfinite(northing[0])
+    assert np.isnan(northing[1:]).all()
+    assert np.isnan(h_msk[1:]).all()
+
+
+def test_batch_invalid_wkt(converter):
+    with pytest.raises(ValueError):
+        converter.wkt_to_msk_batch("INVALID WKT", [55.0], [39.0], [0.0])
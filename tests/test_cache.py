@@ -0,0 +1,41 @@
+import pytest
+from src.core.cache import LRUCache, TransformerCache, normalize_crs_definition
+from src.core.converter import CoordinateConverter
+
+
+def test_lru_cache_counters():
+    cache = LRUCache(maxsize=2)
+    assert cache.get_or_create("a", lambda: 1) == 1
+    assert cache.get_or_create("a", lambda: 2) == 1
+    cache.get_or_create("b", lambda: 3)
+    cache.get_or_create("c", lambda: 4)  # вытесняет "a"
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["evictions"] == 1
+    assert stats["size"] == 2
+    assert cache.get_or_create("a", lambda: 5) == 5
+
+
+def test_normalize_proj_string_order():
+    a = normalize_crs_definition("+proj=tmerc +lon_0=30 +k=1.0 +ellps=krass")
+    b = normalize_crs_definition("+ellps=krass  +k=1.0 +proj=tmerc +lon_0=30")
+    assert a == b
+    assert normalize_crs_definition(4326) == "EPSG:4326"
+    assert normalize_crs_definition('PROJCS["a"]').startswith("WKT:")
+
+
+def test_converter_reuses_transformers():
+    converter = CoordinateConverter(cache=TransformerCache())
+
+    first = converter.msk_to_cartesian(6000000, 500000, 100, 30.0)
+    misses = converter.cache_stats()["transformers"]["misses"]
+
+    for _ in range(10):
+        again = converter.msk_to_cartesian(6000000, 500000, 100, 30.0)
+
+    stats = converter.cache_stats()["transformers"]
+    assert stats["misses"] == misses
+    assert stats["hits"] == 10
+    assert again == pytest.approx(first)
@@ -0,0 +1,109 @@
+import csv
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.cli import main
+from src.core.converter import CoordinateConverter
+from src.core.estimator import ParameterEstimator
+from src.core.pipeline import REPORT_HEADERS
+from src.core.sharding import CONVERT_HEADERS, INVERSE_HEADERS
+
+ROOT = Path(__file__).resolve().parents[1]
+
+POINTS = """1,55.9132151,28.7827337,148.13
+2,55.9177362,28.8195407,153.07
+3 55.8997317 28.8448859 150.32
+bad line
+55.8879009,28.8148194,144.81
+5,55.8993879,28.7702963
+"""
+
+CONTROL_WGS = """1,55.9132151,28.7827337,148.13
+2,55.9177362,28.8195407,153.07
+3,55.8997317,28.8448859,150.32
+4,55.8879009,28.8148194,144.81
+5,55.8993879,28.7702963,140.8"""
+
+CONTROL_MSK = """1\t7686.0995773235\t-8996.72764806\t128.313878864
+2\t8149.5516395103\t-6686.6830560778\t133.2730658024
+3\t6118.3181298608\t-5135.559022994\t130.5397422902
+4\t4832.9892219482\t-7038.7691853523\t125.0153974839
+5\t6160.4605288561\t-9801.7721945621\t120.9794011708"""
+
+
+@pytest.fixture
+def wkt():
+    params = {"Tx": 23.57, "Ty": -140.95, "Tz": -79.8, "Rx": 0.0, "Ry": -0.35, "Rz": -0.79, "Scale_ppm": -0.22}
+    return ParameterEstimator().generate_wkt(params, 28.8, 500000.0, 0.0, 1.0, 0.0)
+
+
+def test_convert_matches_scalar(tmp_path, wkt):
+    (tmp_path / "zone.prj").write_text(wkt, encoding="utf-8")
+    (tmp_path / "points.csv").write_text(POINTS, encoding="utf-8")
+    out = tmp_path / "result.csv"
+
+    code = main(["convert", "--wkt", str(tmp_path / "zone.prj"), "--in", str(tmp_path / "points.csv"),
+                 "--out", str(out), "--chunk-size", "2"])
+    assert code == 0
+
+    with open(out, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == CONVERT_HEADERS
+    assert len(rows) == 6
+
+    converter = CoordinateConverter()
+    n, e, h = converter.wkt_to_msk(wkt, 55.9132151, 28.7827337, 148.13)
+    np.testing.assert_allclose([float(v) for v in rows[1][1:]], [n, e, h], atol=1e-4)
+
+
+def test_convert_inverse_round_trip(tmp_path, wkt):
+    (tmp_path / "zone.prj").write_text(wkt, encoding="utf-8")
+    (tmp_path / "points.csv").write_text(CONTROL_WGS, encoding="utf-8")
+    msk, wgs = tmp_path / "msk.csv", tmp_path / "wgs.csv"
+    assert main(["convert", "--wkt", str(tmp_path / "zone.prj"), "--in", str(tmp_path / "points.csv"),
+                 "--out", str(msk)]) == 0
+    # Строка заголовков прямого пересчета пропускается как неразобранная
+    assert main(["convert", "--wkt", str(tmp_path / "zone.prj"), "--in", str(msk), "--out", str(wgs), "--inverse"]) == 0
+
+    with open(wgs, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == INVERSE_HEADERS
+    expected = [line.split(",") for line in CONTROL_WGS.splitlines()]
+    assert [row[0] for row in rows[1:]] == [row[0] for row in expected]
+    # X, Y округлены до 0.1 мм - это ~1e-9°
+    np.testing.assert_allclose([[float(v) for v in row[1:]] for row in rows[1:]],
+                               [[float(v) for v in row[1:]] for row in expected], atol=1e-4)
+    np.testing.assert_allclose([[float(v) for v in row[1:3]] for row in rows[1:]],
+                               [[float(v) for v in row[1:3]] for row in expected], rtol=0, atol=1e-8)
+
+
+def test_convert_missing_input(tmp_path, wkt):
+    (tmp_path / "zone.prj").write_text(wkt, encoding="utf-8")
+    code = main(["convert", "--wkt", str(tmp_path / "zone.prj"), "--in", str(tmp_path / "missing.csv"),
+                 "--out", str(tmp_path / "result.csv")])
+    assert code == 1
+
+
+def test_cli_does_not_import_gui():
+    code = "import sys, src.cli; sys.exit(any(m.split('.')[0] in ('PySide6', 'folium') for m in sys.modules))"
+    assert subprocess.run([sys.executable, "-c", code], cwd=ROOT).returncode == 0
+
+
+def test_estimate_writes_wkt_and_report(tmp_path, capsys):
+    (tmp_path / "wgs.csv").write_text(CONTROL_WGS, encoding="utf-8")
+    (tmp_path / "msk.csv").write_text(CONTROL_MSK, encoding="utf-8")
+
+    code = main(["estimate", "--wgs", str(tmp_path / "wgs.csv"), "--msk", str(tmp_path / "msk.csv"),
+                 "--out", str(tmp_path / "zone.prj"), "--report", str(tmp_path / "report.csv"), "--name", "Zone1"])
+    assert code == 0
+    assert 'PROJCS["Zone1"' in (tmp_path / "zone.prj").read_text(encoding="utf-8")
+
+    with open(tmp_path / "report.csv", encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == REPORT_HEADERS
+    assert [r[0] for r in rows[1:]] == ["1", "2", "3", "4", "5"]
+    assert "helmert" in capsys.readouterr().out
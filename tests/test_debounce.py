@@ -0,0 +1,38 @@
+from src.gui.debounce import Debouncer
+from src.gui.widgets.wkt_converter_widget import WktConverterWidget
+
+
+def test_debouncer_collapses_bursts(qtbot):
+    calls = []
+    debouncer = Debouncer(lambda: calls.append(1), 30)
+    for _ in range(10):
+        debouncer.trigger()
+    assert debouncer.is_pending()
+    qtbot.waitUntil(lambda: not debouncer.is_pending())
+    qtbot.wait(50)
+    assert calls == [1]
+
+    debouncer.trigger()
+    debouncer.flush()
+    assert calls == [1, 1] and not debouncer.is_pending()
+
+
+def test_map_refresh_coalesced_and_skipped(qtbot, monkeypatch):
+    widget = WktConverterWidget()
+    qtbot.addWidget(widget)
+    widget.map_refresh.set_delay(30)
+    updates = []
+    monkeypatch.setattr(widget.map_widget, "update_map", lambda points, show_polygon: updates.append(points))
+
+    # Посимвольный ввод - одно обновление карты
+    text = "1, 55.0, 39.0, 100\n2, 56.0, 40.0, 200"
+    for i in range(1, len(text) + 1):
+        widget.coords_input.setPlainText(text[:i])
+    qtbot.waitUntil(lambda: len(updates) == 1)
+    assert [p[2] for p in updates[0]] == ["1", "2"]
+
+    # Точки не изменились (только пробелы и пустые строки) - обновление пропускается
+    widget.coords_input.setPlainText("1,55.0,39.0,100\n\n2,56.0,40.0,200\n")
+    qtbot.waitUntil(lambda: not widget.map_refresh.is_pending())
+    qtbot.wait(50)
+    assert len(updates) == 1
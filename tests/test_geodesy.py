@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from pyproj import Transformer
+from src.core.geodesy import WGS84, KRASSOVSKY, geodetic_to_geocentric, geocentric_to_geodetic
+from src.core.converter import CoordinateConverter
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(42)
+    n = 2000
+    return np.column_stack((
+        rng.uniform(-89.9, 89.9, n),
+        rng.uniform(-180.0, 180.0, n),
+        rng.uniform(-500.0, 9000.0, n),
+    ))
+
+
+@pytest.mark.parametrize("ellipsoid, geographic, geocentric", [
+    (WGS84, "EPSG:4326", "EPSG:4978"),
+    (KRASSOVSKY, "+proj=longlat +ellps=krass +no_defs", "+proj=geocent +ellps=krass +units=m +no_defs"),
+])
+def test_matches_pyproj(points, ellipsoid, geographic, geocentric):
+    transformer = Transformer.from_crs(geographic, geocentric, always_xy=True)
+    expected = np.column_stack(transformer.transform(points[:, 1], points[:, 0], points[:, 2]))
+
+    xyz = geodetic_to_geocentric(points, ellipsoid)
+    assert np.abs(xyz - expected).max() < 1e-4
+
+    # Обратная задача: субмиллиметровое совпадение (1e-9 град ~ 0.1 мм)
+    back = geocentric_to_geodetic(expected, ellipsoid)
+    assert np.abs(back[:, :2] - points[:, :2]).max() < 1e-9
+    assert np.abs(back[:, 2] - points[:, 2]).max() < 1e-4
+
+
+def test_converter_backends_agree():
+    wgs = [[55.9132151, 28.7827337, 148.13], [55.9177362, 28.8195407, 153.07]]
+    msk = [[7686.0995773235, -8996.72764806, 128.31], [8149.5516395103, -6686.6830560778, 133.27]]
+    proj = dict(central_meridian_deg=29.99997716, false_easting=67119.6943, false_northing=-6191992.4462)
+
+    numpy_conv = CoordinateConverter(backend="numpy")
+    pyproj_conv = CoordinateConverter(backend="pyproj")
+
+    assert np.allclose(numpy_conv.wgs84_to_cartesian_batch(wgs), pyproj_conv.wgs84_to_cartesian_batch(wgs), atol=1e-4)
+
+    cart_numpy = numpy_conv.msk_to_cartesian_batch(msk, **proj)
+    cart_pyproj = pyproj_conv.msk_to_cartesian_batch(msk, **proj)
+    assert np.allclose(cart_numpy, cart_pyproj, atol=1e-4)
+
+    assert np.allclose(numpy_conv.cartesian_to_msk_batch(cart_numpy, **proj), msk, atol=1e-4)
+    assert np.allclose(pyproj_conv.cartesian_to_msk_batch(cart_pyproj, **proj), msk, atol=1e-4)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        CoordinateConverter(backend="gdal")
@@ -0,0 +1,268 @@
+import struct
+import zlib
+
+import numpy as np
+import pytest
+
+from src.core.cache import TransformerCache
+from src.core.converter import BACKEND_NUMPY, BACKEND_PYPROJ, CoordinateConverter
+from src.core.estimator import ParameterEstimator
+from src.cli import main as cli_main
+from src.core.geoid import (INTERPOLATION_BICUBIC, ArrayGrid, GeoidModel, GeoTiffGrid, clear_geoid_models,
+                            extract_geoid_subset, get_geoid_subsets, regional_undulation)
+
+
+def write_geotiff(path, values, lat_top, lon_left, step, tile=16, predictor=3, compress=True,
+                  pixel_is_point=False, nodata=None):
+    """
+    Минимальный GeoTIFF float32 (тайлы, deflate, предиктор) - как сетки PROJ-data.
+    lat_top/lon_left - угол (PixelIsArea) или первый узел (PixelIsPoint).
+    """
+    values = np.asarray(values, dtype=np.float32)
+    height, width = values.shape
+    tiles = []
+    for r in range(0, height, tile):
+        for c in range(0, width, tile):
+            block = np.zeros((tile, tile), dtype=np.float32)
+            part = values[r:r + tile, c:c + tile]
+            block[:part.shape[0], :part.shape[1]] = part
+            if predictor == 3:
+                planes = block.astype(">f4").view(np.uint8).reshape(tile, tile, 4).transpose(0, 2, 1).reshape(tile, -1)
+                raw = np.diff(planes, axis=1, prepend=np.uint8(0)).astype(np.uint8).tobytes()
+            else:
+                raw = block.astype("<f4").tobytes()
+            tiles.append(zlib.compress(raw) if compress else raw)
+
+    geo_keys = [1, 1, 0, 3, 1024, 0, 1, 2, 1025, 0, 1, 2 if pixel_is_point else 1, 2048, 0, 1, 4326]
+    entries = [
+        (256, 3, [width]), (257, 3, [height]), (258, 3, [32]), (259, 3, [8 if compress else 1]),
+        (262, 3, [1]), (277, 3, [1]), (284, 3, [1]), (317, 3, [predictor]),
+        (322, 3, [tile]), (323, 3, [tile]), (324, 4, None), (325, 4, [len(t) for t in tiles]),
+        (339, 3, [3]), (33550, 12, [step, step, 0.0]), (33922, 12, [0, 0, 0, lon_left, lat_top, 0.0]),
+        (34735, 3, geo_keys),
+    ]
+    if nodata is not None:
+        entries.append((42113, 2, f"{nodata}\0".encode()))
+
+    formats = {2: "s", 3: "H", 4: "I", 12: "d"}
+    ifd_offset = 8
+    extra_start = ifd_offset + 2 + 12 * len(entries) + 4
+
+    def build(offsets):
+        # IFD и значения, не помещающиеся в запись (после IFD)
+        ifd, extra = struct.pack("<H", len(entries)), bytearray()
+        for tag, field_type, value in entries:
+            if tag == 324:
+                value = offsets
+            if field_type == 2:
+                data, count = value, len(value)
+            else:
+                data, count = struct.pack("<" + formats[field_type] * len(value), *value), len(value)
+            if len(data) <= 4:
+                ifd += struct.pack("<HHI", tag, field_type, count) + data.ljust(4, b"\0")
+            else:
+                ifd += struct.pack("<HHII", tag, field_type, count, extra_start + len(extra))
+                extra += data
+        return ifd + struct.pack("<I", 0) + bytes(extra)
+
+    data_start = ifd_offset + len(build([0] * len(tiles)))
+    offsets = list(data_start + np.cumsum([0] + [len(t) for t in tiles[:-1]]))
+    ifd = build([int(o) for o in offsets])
+
+    with open(path, "wb") as f:
+        f.write(b"II" + struct.pack("<HI", 42, ifd_offset) + ifd)
+        for t in tiles:
+            f.write(t)
+
+
+@pytest.fixture
+def synthetic_grid(tmp_path):
+    # Узлы через 0.25° над районом 50..58 N, 30..42 E; гладкая поверхность "геоида" 10..20 м
+    step = 0.25
+    lats = 58.0 - step / 2 - step * np.arange(32)
+    lons = 30.0 + step / 2 + step * np.arange(48)
+    lat_grid, lon_grid = np.meshgrid(lats, lons, indexing="ij")
+    values = 15 + 3 * np.sin(np.radians(lat_grid) * 7) + 2 * np.cos(np.radians(lon_grid) * 5)
+    path = tmp_path / "synthetic_geoid.tif"
+    write_geotiff(path, values, 58.0, 30.0, step)
+    yield path, lats, lons, values
+    clear_geoid_models()
+
+
+def test_reads_nodes_and_georeferencing(synthetic_grid):
+    path, lats, lons, values = synthetic_grid
+    grid = GeoTiffGrid(path, tile_cache_size=4)
+    try:
+        assert (grid.width, grid.height) == (48, 32)
+        assert grid.lat0 == pytest.approx(lats[0]) and grid.lon0 == pytest.approx(lons[0])
+        np.testing.assert_array_equal(grid.read_window(0, 32, 0, 48), values.astype(np.float32))
+
+        # В узлах интерполяция возвращает значения узлов
+        n = grid.interpolate(lats[[0, 5, 31]], lons[[0, 20, 47]])
+        np.testing.assert_allclose(n, values.astype(np.float32)[[0, 5, 31], [0, 20, 47]], atol=1e-9)
+
+        # Только нужные тайлы распаковываются, кэш ограничен
+        grid.interpolate(np.full(100, 55.0), np.full(100, 37.0))
+        assert grid.tiles.stats()["size"] <= 4
+        assert np.isnan(grid.interpolate([60.0, 54.0], [35.0, 50.0])).all()
+    finally:
+        grid.close()
+
+
+def test_matches_proj_vgridshift(synthetic_grid):
+    path, _, _, values = synthetic_grid
+    rng = np.random.default_rng(1)
+    lats = rng.uniform(50.2, 57.8, 2000)
+    lons = rng.uniform(30.2, 41.8, 2000)
+    hs = rng.uniform(-50, 500, 2000)
+
+    pipeline = TransformerCache().pipeline(f"+proj=pipeline +step +proj=vgridshift +grids={path} +multiplier=1 +inv")
+    _, _, expected = pipeline.transform(lons, lats, hs)
+
+    model = GeoidModel(path, method="bilinear")
+    try:
+        np.testing.assert_allclose(model.orthometric_heights(lats, lons, hs), expected, atol=1e-3)
+        # Бикубическая интерполяция гладкой поверхности - в пределах сантиметров от билинейной
+        bicubic = model.orthometric_heights(lats, lons, hs, method=INTERPOLATION_BICUBIC)
+        assert np.max(np.abs(bicubic - expected)) < 0.05
+    finally:
+        model.close()
+
+
+def test_predictor_and_nodata_variants(tmp_path):
+    values = np.arange(20 * 20, dtype=np.float32).reshape(20, 20) / 7
+    values[3, 4] = -9999
+    path = tmp_path / "plain.tif"
+    write_geotiff(path, values, 10.0, 20.0, 0.5, predictor=1, compress=False, pixel_is_point=True, nodata=-9999)
+    grid = GeoTiffGrid(path)
+    try:
+        assert grid.lat0 == 10.0 and grid.lon0 == 20.0
+        window = grid.read_window(0, 20, 0, 20)
+        assert np.isnan(window[3, 4])
+        window[3, 4] = -9999
+        np.testing.assert_array_equal(window, values)
+    finally:
+        grid.close()
+
+
+def test_converter_grid_height_backend(synthetic_grid):
+    path, _, _, _ = synthetic_grid
+    params = {"Tx": 0, "Ty": 0, "Tz": 0, "Rx": 0, "Ry": 0, "Rz": 0, "Scale_ppm": 0}
+    wkt = ParameterEstimator().generate_wkt(params, cm_deg=36, fe=500000, fn=0, scale=1, lat0=0, use_geoid=True)
+    lats = np.array([55.7558, 54.1, 60.0])
+    lons = np.array([37.6173, 33.3, 37.0])
+    hs = np.array([200.0, 150.0, 100.0])
+
+    results = {}
+    for backend in (BACKEND_PYPROJ, BACKEND_NUMPY):
+        converter = CoordinateConverter(height_backend=backend)
+        converter.geoid_path = path
+        results[backend] = converter.wkt_to_msk_batch(wkt, lats, lons, hs)
+
+    northing, easting, h_msk, errors = results[BACKEND_NUMPY]
+    np.testing.assert_allclose(h_msk[:2], results[BACKEND_PYPROJ][2][:2], atol=1e-3)
+    np.testing.assert_allclose(northing[:2], results[BACKEND_PYPROJ][0][:2])
+    # Точка вне сетки - ошибка, как у vgridshift
+    assert errors.tolist() == [False, False, True]
+    assert results[BACKEND_PYPROJ][3].tolist() == [False, False, True]
+
+    converter = CoordinateConverter(height_backend=BACKEND_NUMPY)
+    converter.geoid_path = path
+    _, _, h = converter.wkt_to_msk(wkt, 55.7558, 37.6173, 200.0)
+    assert h == pytest.approx(h_msk[0], abs=1e-9)
+
+
+def test_subset_extraction(synthetic_grid, tmp_path):
+    path, _, _, _ = synthetic_grid
+    header = extract_geoid_subset(54.0, 55.0, 35.0, 36.0, padding=0.5, grid_path=path, out_dir=tmp_path / "subsets")
+    subset = ArrayGrid.load(header)
+    assert subset.source == path.name
+    assert subset.values.dtype == np.float32
+    lat_min, lat_max, lon_min, lon_max = subset.bounds
+    assert lat_min < 53.5 and lat_max > 55.5 and lon_min < 34.5 and lon_max > 36.5
+    assert subset.width * subset.height < 48 * 32 / 4
+
+    subsets = get_geoid_subsets(path.name, directories=[tmp_path / "subsets"])
+    assert len(subsets) == 1 and get_geoid_subsets("other.tif", directories=[tmp_path / "subsets"]) == []
+    lats = np.array([54.5, 53.6, 56.5])
+    lons = np.array([35.5, 36.4, 35.5])
+    undulation, covered = regional_undulation(subsets, lats, lons, method="bilinear")
+    assert covered.tolist() == [True, True, False]
+
+    grid = GeoTiffGrid(path)
+    try:
+        # По фрагменту - то же, что по полной сетке (в т.ч. бикубическая интерполяция)
+        np.testing.assert_allclose(undulation[:2], grid.interpolate(lats[:2], lons[:2]), rtol=0, atol=1e-12)
+        np.testing.assert_allclose(subset.interpolate(lats[:2], lons[:2], INTERPOLATION_BICUBIC),
+                                   grid.interpolate(lats[:2], lons[:2], INTERPOLATION_BICUBIC), rtol=0, atol=1e-12)
+    finally:
+        grid.close()
+
+
+def test_converter_prefers_subset(synthetic_grid, tmp_path, monkeypatch):
+    path, _, _, _ = synthetic_grid
+    subset_dir = tmp_path / "subsets"
+    monkeypatch.setattr("src.core.geoid.subset_dirs", lambda: [subset_dir])
+    params = {"Tx": 0, "Ty": 0, "Tz": 0, "Rx": 0, "Ry": 0, "Rz": 0, "Scale_ppm": 0}
+    wkt = ParameterEstimator().generate_wkt(params, cm_deg=36, fe=500000, fn=0, scale=1, lat0=0, use_geoid=True)
+    lats = np.array([54.5, 57.0])
+    lons = np.array([35.5, 40.0])
+    hs = np.array([200.0, 100.0])
+
+    full = CoordinateConverter(height_backend=BACKEND_PYPROJ)
+    full.geoid_path = path
+    expected = full.wkt_to_msk_batch(wkt, lats, lons, hs)[2]
+
+    assert cli_main(["geoid-subset", "--bbox", "54", "55", "35", "36", "--grid", str(path)]) == 0
+    clear_geoid_models()
+
+    # Полной сетки нет (как в сборке только с фрагментами): точка внутри фрагмента считается, вне - ошибка
+    converter = CoordinateConverter(height_backend=BACKEND_PYPROJ)
+    converter.geoid_path = tmp_path / "absent" / path.name
+    northing, easting, h_msk, errors = converter.wkt_to_msk_batch(wkt, lats, lons, hs)
+    assert errors.tolist() == [False, True]
+    assert h_msk[0] == pytest.approx(expected[0], abs=1e-3)
+    assert np.isnan(h_msk[1]) and np.isnan(northing[1])
+    assert np.isnan(converter.wkt_to_msk(wkt, lats[1], lons[1], hs[1])[2])
+
+    # Обратный пересчет: точка вне фрагмента - тоже ошибка, а не высота NaN в результате
+    plan = full.wkt_to_msk_batch(wkt, lats, lons, hs)
+    lat_back, _, h_back, errors = converter.msk_to_wgs_batch(wkt, plan[0], plan[1], plan[2])
+    assert errors.tolist() == [False, True]
+    assert h_back[0] == pytest.approx(hs[0], abs=1e-3)
+    assert np.isnan(lat_back[1]) and np.isnan(h_back[1])
+
+    # С полной сеткой точки вне фрагмента считаются по ней
+    converter.geoid_path = path
+    _, _, h_msk, errors = converter.wkt_to_msk_batch(wkt, lats, lons, hs)
+    assert not errors.any()
+    np.testing.assert_allclose(h_msk, expected, atol=1e-3)
+
+
+@pytest.mark.parametrize("backend", [BACKEND_PYPROJ, BACKEND_NUMPY])
+def test_inverse_heights_round_trip(synthetic_grid, tmp_path, monkeypatch, backend):
+    path, _, _, _ = synthetic_grid
+    monkeypatch.setattr("src.core.geoid.subset_dirs", lambda: [tmp_path / "subsets"])
+    params = {"Tx": 23.57, "Ty": -140.95, "Tz": -79.8, "Rx": 0, "Ry": -0.35, "Rz": -0.79, "Scale_ppm": -0.22}
+    wkt = ParameterEstimator().generate_wkt(params, cm_deg=36, fe=500000, fn=0, scale=1, lat0=0, use_geoid=True)
+    lats = np.array([54.5, 55.7558, 57.0, 60.0])
+    lons = np.array([35.5, 37.6173, 40.0, 37.0])
+    hs = np.array([200.0, 150.0, 1200.0, 100.0])
+
+    converter = CoordinateConverter(cache=TransformerCache(), height_backend=backend)
+    converter.geoid_path = path
+    northing, easting, h_msk, errors = converter.wkt_to_msk_batch(wkt, lats, lons, hs)
+    assert errors.tolist() == [False, False, False, True]
+
+    # Точка вне сетки: план считается, высота - нет
+    _, _, h_back, inverse_errors = converter.msk_to_wgs_batch(wkt, northing[:3], easting[:3], h_msk[:3])
+    assert not inverse_errors.any()
+    np.testing.assert_allclose(h_back, hs[:3], rtol=0, atol=1e-6)
+    n, e, _ = converter.wkt_to_msk(wkt, 60.0, 37.0, 100.0)
+    assert converter.msk_to_wgs_batch(wkt, [n], [e], [100.0])[3].tolist() == [True]
+
+    # Фрагмент сетки дает те же высоты
+    extract_geoid_subset(54.0, 55.0, 35.0, 36.0, grid_path=path, out_dir=tmp_path / "subsets")
+    lat_back, lon_back, h_back, _ = converter.msk_to_wgs_batch(wkt, northing[:3], easting[:3], h_msk[:3])
+    np.testing.assert_allclose(h_back, hs[:3], rtol=0, atol=1e-6)
+    np.testing.assert_allclose(lat_back, lats[:3], rtol=0, atol=1e-11)
@@ -85,3 +85,80 @@ def test_save_filename_logic(app, monkeypatch):
     app.results_widget.entry_crs_name.clear()
     app.on_save_wkt()
     assert captured_args['dir'] == "projection_egm2008.prj"
+
+
+SAMPLE_WGS = """1,55.9132151,28.7827337,148.13
+2,55.9177362,28.8195407,153.07
+3,55.8997317,28.8448859,150.32
+4,55.8879009,28.8148194,144.81
+5,55.8993879,28.7702963,140.8"""
+
+SAMPLE_MSK = """1,7686.0995773235,-8996.72764806,128.313878864
+2,8149.5516395103,-6686.6830560778,133.2730658024
+3,6118.3181298608,-5135.559022994,130.5397422902
+4,4832.9892219482,-7038.7691853523,125.0153974839
+5,6160.4605288561,-9801.7721945621,120.9794011708"""
+
+def _table_values(table):
+    return [[float(table.item(r, c).text()) for c in range(1, 4)] for r in range(table.rowCount())]
+
+def test_validation_toggle(app, qtbot):
+    # Перекрестная проверка заменяет невязки уравнивания невязками прогноза
+    app.coords_widget.text_wgs.setText(SAMPLE_WGS)
+    # Смещение одной точки на 5 см, чтобы невязки были ненулевыми
+    app.coords_widget.text_msk.setText(SAMPLE_MSK.replace("6118.3181", "6118.3681"))
+    app.calculate()
+    qtbot.waitUntil(lambda: not app.is_busy())
+    fit = _table_values(app.results_widget.table_comp)
+    assert len(fit) == 5
+
+    app.results_widget.chk_validation.setChecked(True)
+    qtbot.waitUntil(lambda: not app.is_busy())
+    loo = _table_values(app.results_widget.table_comp)
+    assert len(loo) == 5
+    fit_sq = sum(v * v for row in fit for v in row)
+    loo_sq = sum(v * v for row in loo for v in row)
+    assert loo_sq > fit_sq
+
+def test_validation_unavailable_with_custom_transformation(app, qtbot):
+    # С пользовательскими параметрами таблица показывает невязки именно этих параметров
+    app.coords_widget.text_wgs.setText(SAMPLE_WGS)
+    app.coords_widget.text_msk.setText(SAMPLE_MSK.replace("6118.3181", "6118.3681"))
+    app.calculate()
+    qtbot.waitUntil(lambda: not app.is_busy())
+    fit = _table_values(app.results_widget.table_comp)
+
+    app.proj_widget.chk_custom_trans.setChecked(True)
+    assert not app.results_widget.chk_validation.isEnabled()
+    assert app.results_widget.lbl_validation_note.isVisibleTo(app.results_widget)
+
+    app.results_widget.chk_validation.setChecked(True)
+    qtbot.waitUntil(lambda: not app.is_busy())
+    assert _table_values(app.results_widget.table_comp) == fit
+
+    app.proj_widget.chk_custom_trans.setChecked(False)
+    assert app.results_widget.chk_validation.isEnabled()
+    assert not app.results_widget.lbl_validation_note.isVisibleTo(app.results_widget)
+
+def test_calculation_in_background(app, qtbot):
+    # Расчет выполняется в фоновом потоке, окно остается отзывчивым
+    app.coords_widget.text_wgs.setText(SAMPLE_WGS)
+    app.coords_widget.text_msk.setText(SAMPLE_MSK)
+    app.calculate()
+    assert app.is_busy()
+    assert not app.btn_calc.isEnabled()
+    qtbot.waitUntil(lambda: not app.is_busy())
+    assert app.btn_calc.isEnabled()
+    assert app.proj_widget.entry_cm.text() != ""
+    assert 'PROJCS["unknown"' in app.results_widget.text_wkt.toPlainText()
+
+def test_calculation_cancel(app, qtbot):
+    app.coords_widget.text_wgs.setText(SAMPLE_WGS)
+    app.coords_widget.text_msk.setText(SAMPLE_MSK)
+    app.calculate()
+    app.cancel_calculation()
+    assert not app.is_busy()
+    qtbot.wait(200)
+    # Результат отмененного расчета не применяется
+    assert not hasattr(app, 'last_calc_result')
+    assert app.results_widget.table_comp.rowCount() == 0
@@ -31,32 +31,33 @@ def test_wkt_converter_multiline(qtbot):
     
     # Click Convert
     qtbot.mouseClick(widget.btn_convert, Qt.LeftButton)
+    qtbot.waitUntil(lambda: not widget.is_busy())
     
     # Check warning label (Should be visible as WKT has no vertical CRS)
     assert widget.lbl_height_warning.isVisible() == True
     
     # Check results in table
-    assert widget.result_table.rowCount() == 3
-    assert widget.result_table.columnCount() == 4 # ID, X, Y, H
+    assert widget.result_model.rowCount() == 3
+    assert widget.result_model.columnCount() == 4 # ID, X, Y, H
     
     # Row 0: 1, 55.0, 39.0, 100
-    id0 = widget.result_table.item(0, 0).text()
-    x0 = widget.result_table.item(0, 1).text()
-    h0 = widget.result_table.item(0, 3).text()
+    id0 = widget.result_model.index(0, 0).data()
+    x0 = widget.result_model.index(0, 1).data()
+    h0 = widget.result_model.index(0, 3).data()
     
     assert id0 == "1"
     assert float(h0) == 100.0
     
     # Row 1: 56.0, 40.0, 200 (No ID)
-    id1 = widget.result_table.item(1, 0).text()
-    h1 = widget.result_table.item(1, 3).text()
+    id1 = widget.result_model.index(1, 0).data()
+    h1 = widget.result_model.index(1, 3).data()
     
     assert id1 == "" # Empty ID
     assert float(h1) == 200.0
     
     # Row 2: PT2, 57.0, 41.0 (No H)
-    id2 = widget.result_table.item(2, 0).text()
-    h2 = widget.result_table.item(2, 3).text()
+    id2 = widget.result_model.index(2, 0).data()
+    h2 = widget.result_model.index(2, 3).data()
     
     assert id2 == "PT2"
     assert float(h2) == 0.0 # Default H
@@ -77,6 +78,16 @@ def test_wkt_converter_warning_hidden(qtbot):
     
     # Click Convert
     qtbot.mouseClick(widget.btn_convert, Qt.LeftButton)
+    qtbot.waitUntil(lambda: not widget.is_busy())
     
     # Check warning label (Should be HIDDEN)
     assert widget.lbl_height_warning.isVisible() == False
+
+
+def test_run_conversion_without_progress_callback():
+    # Прямой вызов (без Worker) - прогресс не передается
+    from src.core.converter import CoordinateConverter
+    wkt = 'PROJCS["Transverse_Mercator",GEOGCS["GCS_Pulkovo_1942",DATUM["D_Pulkovo_1942",SPHEROID["Krassowsky_1942",6378245.0,298.3]],PRIMEM["Greenwich",0.0],UNIT["Degree",0.0174532925199433]],PROJECTION["Transverse_Mercator"],PARAMETER["False_Easting",500000.0],PARAMETER["False_Northing",0.0],PARAMETER["Central_Meridian",39.0],PARAMETER["Scale_Factor",1.0],PARAMETER["Latitude_Of_Origin",0.0],UNIT["Meter",1.0]]'
+    result = WktConverterWidget.run_conversion(CoordinateConverter(), wkt, ["1, 55.0, 39.0, 100", "2, 56.0, 40.0, 200"])
+    assert len(result["northing"]) == 2
+    assert result["errors"] == 0
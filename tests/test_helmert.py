@@ -0,0 +1,198 @@
+import numpy as np
+import pytest
+from src.core.estimator import ParameterEstimator
+
+
+def legacy_helmert(source_coords, target_coords):
+    # Прежняя реализация с заполнением матрицы в цикле (эталон для регрессии)
+    n = len(source_coords)
+    A = np.zeros((3 * n, 7))
+    L = np.zeros((3 * n))
+    for i in range(n):
+        X, Y, Z = source_coords[i]
+        tgt = target_coords[i]
+        L[3*i] = tgt[0] - X
+        L[3*i + 1] = tgt[1] - Y
+        L[3*i + 2] = tgt[2] - Z
+        A[3*i, 0] = 1
+        A[3*i + 1, 1] = 1
+        A[3*i + 2, 2] = 1
+        A[3*i + 1, 3] = Z
+        A[3*i + 2, 3] = -Y
+        A[3*i, 4] = -Z
+        A[3*i + 2, 4] = X
+        A[3*i, 5] = Y
+        A[3*i + 1, 5] = -X
+        A[3*i, 6] = X
+        A[3*i + 1, 6] = Y
+        A[3*i + 2, 6] = Z
+    x = np.linalg.lstsq(A, L, rcond=None)[0]
+    return np.concatenate((x[:3], np.degrees(x[3:6]) * 3600, [x[6] * 1e6]))
+
+
+def legacy_apply(source_coords, params):
+    Tx, Ty, Tz = params["Tx"], params["Ty"], params["Tz"]
+    m = params["Scale_ppm"] * 1e-6
+    wx, wy, wz = (np.radians(params[k] / 3600) for k in ("Rx", "Ry", "Rz"))
+    out = []
+    for X, Y, Z in source_coords:
+        out.append([X + Tx + m*X + wz*Y - wy*Z,
+                    Y + Ty - wz*X + m*Y + wx*Z,
+                    Z + Tz + wy*X - wx*Y + m*Z])
+    return np.array(out)
+
+
+@pytest.fixture
+def network():
+    # Геоцентрические координаты сети ~20 км и искаженные "целевые" координаты
+    rng = np.random.default_rng(3)
+    base = np.array([3090000.0, 1700000.0, 5260000.0])
+    src = base + rng.uniform(-10000, 10000, (200, 3))
+    params = {"Tx": 23.0, "Ty": 75.5, "Tz": 71.2, "Rx": -1.43, "Ry": -0.44, "Rz": 1.02, "Scale_ppm": -0.1}
+    tgt = legacy_apply(src, params) + rng.normal(0, 0.02, src.shape)
+    return src, tgt
+
+
+KEYS = ["Tx", "Ty", "Tz", "Rx", "Ry", "Rz", "Scale_ppm"]
+
+
+@pytest.mark.parametrize("solver", ["lstsq", "normal", "qr"])
+def test_vectorized_matches_legacy(network, solver):
+    src, tgt = network
+    expected = legacy_helmert(src, tgt)
+
+    params = ParameterEstimator().calculate_helmert(src, tgt, solver=solver)
+    actual = np.array([params[k] for k in KEYS])
+
+    # На малой сети переносы сильно коррелированы с вращениями и масштабом,
+    # поэтому сравниваем с допусками порядка 0.1 мм на геоцентрических расстояниях
+    assert np.allclose(actual[:3], expected[:3], atol=1e-3)
+    assert np.allclose(actual[3:6], expected[3:6], atol=1e-5)
+    assert actual[6] == pytest.approx(expected[6], abs=1e-4)
+
+
+def test_apply_matches_legacy(network):
+    src, _ = network
+    params = {"Tx": 23.0, "Ty": 75.5, "Tz": 71.2, "Rx": -1.43, "Ry": -0.44, "Rz": 1.02, "Scale_ppm": -0.1}
+    assert np.allclose(ParameterEstimator().apply_helmert(src, params), legacy_apply(src, params), atol=1e-8, rtol=0)
+
+
+def test_unknown_solver(network):
+    src, tgt = network
+    with pytest.raises(ValueError):
+        ParameterEstimator().calculate_helmert(src, tgt, solver="cholesky")
+
+
+def test_streaming_matches_batch(network):
+    src, tgt = network
+    estimator = ParameterEstimator()
+    expected = estimator.calculate_helmert(src, tgt, solver="normal")
+
+    chunks = ((src[i:i + 37], tgt[i:i + 37]) for i in range(0, len(src), 37))
+    params, acc = estimator.calculate_helmert_streaming(chunks)
+
+    for k in KEYS:
+        assert params[k] == pytest.approx(expected[k], abs=1e-6)
+    assert acc.n_points == len(src)
+
+    # Апостериорная дисперсия и ковариация по явной матрице плана
+    from src.core.estimator import helmert_design_matrix, helmert_vector_from_params
+    A = helmert_design_matrix(src)
+    v = (tgt - src).ravel() - A @ helmert_vector_from_params(params)
+    variance = v @ v / (3 * len(src) - 7)
+    assert acc.variance == pytest.approx(variance, rel=1e-6)
+    assert np.sqrt(acc.variance) == pytest.approx(0.02, rel=0.1)
+
+    cov = variance * np.linalg.inv(A.T @ A)
+    assert acc.std["Tx"] == pytest.approx(np.sqrt(cov[0, 0]), rel=1e-4)
+    assert acc.std["Scale_ppm"] == pytest.approx(np.sqrt(cov[6, 6]) * 1e6, rel=1e-4)
+
+
+def test_streaming_needs_points():
+    acc = ParameterEstimator().calculate_helmert_streaming
+    with pytest.raises(ValueError):
+        acc([(np.zeros((2, 3)), np.zeros((2, 3)))])
+
+
+@pytest.mark.parametrize("loss", ["huber", "tukey"])
+def test_robust_rejects_blunders(network, loss):
+    src, tgt = network
+    tgt = tgt.copy()
+    blunders = [5, 50, 120, 199]
+    tgt[blunders] += np.array([1.5, -2.0, 0.8])
+
+    estimator = ParameterEstimator()
+    plain = estimator.calculate_helmert(src, tgt)
+    params, inliers = estimator.calculate_helmert_robust(src, tgt, threshold=0.1, n_hypotheses=500, loss=loss, seed=1)
+
+    assert not inliers[blunders].any()
+    assert inliers.sum() >= len(src) - len(blunders) - 2
+
+    # Робастное решение восстанавливает модель лучше обычного МНК
+    clean = np.ones(len(src), dtype=bool)
+    clean[blunders] = False
+    robust_err = np.abs(estimator.apply_helmert(src, params) - tgt)[clean].max()
+    plain_err = np.abs(estimator.apply_helmert(src, plain) - tgt)[clean].max()
+    assert robust_err < 0.1
+    assert robust_err < plain_err
+
+
+@pytest.mark.parametrize("loss", ["huber", "tukey"])
+def test_robust_exhaustive_small_set(loss):
+    src = np.array([[3090000.0, 1700000.0, 5260000.0], [3091000.0, 1700500.0, 5259000.0],
+                    [3089500.0, 1701000.0, 5260700.0], [3090700.0, 1699200.0, 5260300.0],
+                    [3090200.0, 1700900.0, 5259600.0], [3089800.0, 1699600.0, 5259900.0]])
+    tgt = src + np.array([10.0, 20.0, 30.0])
+    tgt[2] += 5.0
+
+    # 6 точек -> 20 троек, перебираются все
+    estimator = ParameterEstimator()
+    params, inliers = estimator.calculate_helmert_robust(src, tgt, threshold=0.05, loss=loss)
+    assert inliers.tolist() == [True, True, False, True, True, True]
+    # На сети ~1 км сдвиги коррелируют с поворотами, поэтому проверяем невязки, а не Tx
+    residuals = np.linalg.norm(estimator.apply_helmert(src, params) - tgt, axis=1)
+    assert np.all(residuals[inliers] < 0.05)
+
+
+@pytest.mark.parametrize("threshold", [0, -0.1])
+def test_robust_rejects_non_positive_threshold(network, threshold):
+    src, tgt = network
+    with pytest.raises(ValueError):
+        ParameterEstimator().calculate_helmert_robust(src, tgt, threshold=threshold)
+
+
+def _refit_prediction_residuals(src, tgt, held_out):
+    estimator = ParameterEstimator()
+    keep = np.setdiff1d(np.arange(len(src)), held_out)
+    params = estimator.calculate_helmert(src[keep], tgt[keep], solver="normal")
+    return tgt[held_out] - estimator.apply_helmert(src[held_out], params)
+
+
+def test_leave_one_out_matches_refit(network):
+    src, tgt = network
+    src, tgt = src[:30], tgt[:30]
+    cv = ParameterEstimator().cross_validate_helmert(src, tgt)
+
+    assert cv["folds"] == 30
+    for i in (0, 7, 29):
+        expected = _refit_prediction_residuals(src, tgt, np.array([i]))[0]
+        np.testing.assert_allclose(cv["residuals"][i], expected, atol=1e-6)
+    # Невязки прогноза не меньше невязок уравнивания
+    assert cv["rms"] > cv["fit_rms"]
+
+
+def test_k_fold_matches_refit(network):
+    src, tgt = network
+    src, tgt = src[:40], tgt[:40]
+    cv = ParameterEstimator().cross_validate_helmert(src, tgt, folds=5, seed=1)
+
+    folds = np.array_split(np.random.default_rng(1).permutation(40), 5)
+    for fold in folds[:2]:
+        expected = _refit_prediction_residuals(src, tgt, fold)
+        np.testing.assert_allclose(cv["residuals"][fold], expected, atol=1e-6)
+
+
+def test_cross_validation_needs_redundancy():
+    src = np.random.default_rng(0).normal(size=(3, 3)) * 1000.0 + 4e6
+    with pytest.raises(ValueError):
+        ParameterEstimator().cross_validate_helmert(src, src)
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from src.core.cache import TransformerCache
+from src.core.converter import CoordinateConverter
+from src.core.estimator import ParameterEstimator
+
+PARAMS = {"Tx": 23.57, "Ty": -140.95, "Tz": -79.8, "Rx": 0, "Ry": -0.35, "Rz": -0.79, "Scale_ppm": -0.22}
+
+
+@pytest.fixture
+def wkt():
+    return ParameterEstimator().generate_wkt(PARAMS, cm_deg=37.5, fe=1300000, fn=-6200000, scale=1, lat0=0)
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(3)
+    return rng.uniform(54, 57, 5000), rng.uniform(36, 39, 5000), rng.uniform(-20, 1500, 5000)
+
+
+def test_round_trip(wkt, points):
+    lats, lons, hs = points
+    converter = CoordinateConverter(cache=TransformerCache())
+    northing, easting, h_msk, _ = converter.wkt_to_msk_batch(wkt, lats, lons, hs)
+
+    lat_back, lon_back, h_back, errors = converter.msk_to_wgs_batch(wkt, northing, easting, h_msk)
+    assert not errors.any()
+    # ~1e-11° - сотые доли миллиметра
+    np.testing.assert_allclose(lat_back, lats, rtol=0, atol=1e-11)
+    np.testing.assert_allclose(lon_back, lons, rtol=0, atol=1e-11)
+    np.testing.assert_array_equal(h_back, hs)
+
+    # Повторный вызов - те же трансформеры из кэша
+    before = converter.cache_stats()["transformers"]["misses"]
+    converter.msk_to_wgs_batch(wkt, northing[:10], easting[:10], h_msk[:10])
+    assert converter.cache_stats()["transformers"]["misses"] == before
+
+
+def test_closure_check_marks_unclosed_points(wkt, points, monkeypatch):
+    lats, lons, hs = points
+    converter = CoordinateConverter(cache=TransformerCache())
+    northing, easting, h_msk, _ = converter.wkt_to_msk_batch(wkt, lats, lons, hs)
+
+    # Без уточнений обратный трансформер не учитывает высоту в TOWGS84: высокие точки не замыкаются
+    monkeypatch.setattr("src.core.converter.INVERSE_MAX_ITERATIONS", 0)
+    lat_back, _, h_back, errors = converter.msk_to_wgs_batch(wkt, northing, easting, h_msk, closure_tolerance=1e-3)
+    assert errors.any() and errors[hs > 1000].all()
+    assert np.isnan(lat_back[errors]).all() and np.isnan(h_back[errors]).all()
+
+
+def test_invalid_points(wkt):
+    converter = CoordinateConverter(cache=TransformerCache())
+    n, e, h = converter.wkt_to_msk(wkt, 55.75, 37.61, 150.0)
+    lats, lons, hs, errors = converter.msk_to_wgs_batch(wkt, [n, np.nan], [e, e], [h, h])
+    assert errors.tolist() == [False, True]
+    assert (lats[0], lons[0], hs[0]) == pytest.approx((55.75, 37.61, 150.0), abs=1e-10)
+
+    with pytest.raises(ValueError):
+        converter.msk_to_wgs_batch(wkt, [n, n], [e], [h])
+    with pytest.raises(ValueError):
+        converter.msk_to_wgs_batch("not a wkt", [n], [e], [h])
+
+
+def test_height_follows_refined_position(points, monkeypatch):
+    # Синтетический "геоид" с большим уклоном: высота зависит от уточненного положения точки
+    def heights(self, lats, lons, hs, inverse=False):
+        undulation = 1000.0 * (lats - 55.0) + 500.0 * (lons - 37.0)
+        return hs + undulation if inverse else hs - undulation
+
+    monkeypatch.setattr(CoordinateConverter, "_egm2008_heights", heights)
+    wkt = ParameterEstimator().generate_wkt(PARAMS, cm_deg=37.5, fe=1300000, fn=-6200000, scale=1, lat0=0,
+                                            use_geoid=True)
+    lats, lons, hs = points
+    converter = CoordinateConverter(cache=TransformerCache())
+    northing, easting, h_msk, _ = converter.wkt_to_msk_batch(wkt, lats, lons, hs)
+
+    lat_back, lon_back, h_back, errors = converter.msk_to_wgs_batch(wkt, northing, easting, h_msk)
+    assert not errors.any()
+    np.testing.assert_allclose(lat_back, lats, rtol=0, atol=1e-11)
+    np.testing.assert_allclose(h_back, hs, rtol=0, atol=1e-6)
@@ -0,0 +1,103 @@
+import base64
+
+import numpy as np
+import pytest
+
+from src.gui.widgets.map_widget import MapWidget, _layer_controller, common_prefix_length
+
+
+@pytest.fixture
+def map_widget(qtbot, monkeypatch):
+    widget = MapWidget()
+    qtbot.addWidget(widget)
+    widget.ensure_web_view()
+    widget._page_ready = True
+    scripts = []
+    monkeypatch.setattr(widget, "_run_js", scripts.append)
+    # Страница загружается один раз - при создании QWebEngineView
+    monkeypatch.setattr(widget.web_view, "setHtml", lambda *args: pytest.fail("страница карты перезагружена"))
+    widget.scripts = scripts
+    return widget
+
+
+def test_common_prefix_length():
+    assert common_prefix_length([], [(1, 2, "a")]) == 0
+    assert common_prefix_length([(1, 2, "a"), (3, 4, "b")], [(1, 2, "a"), (3, 4, "c")]) == 1
+    assert common_prefix_length([(1, 2, "a")], [(1, 2, "a"), (3, 4, "b")]) == 1
+
+
+def test_incremental_updates(map_widget):
+    map_widget.update_map([(55.0, 37.0, "1"), (56.0, 38.0, "2")], show_polygon=False)
+    assert map_widget.scripts[0] == 'genwkt.setPoints(0, [[55.0, 37.0, "1"], [56.0, 38.0, "2"]]);'
+
+    # Дописана точка: передается только она
+    map_widget.scripts.clear()
+    map_widget.update_map([(55.0, 37.0, "1"), (56.0, 38.0, "2"), (57.0, 39.0)], show_polygon=False)
+    assert map_widget.scripts[0] == 'genwkt.setPoints(2, [[57.0, 39.0, "57.00000, 39.00000"]]);'
+
+    # Без изменений - ни одного скрипта
+    map_widget.scripts.clear()
+    map_widget.update_map([(55.0, 37.0, "1"), (56.0, 38.0, "2"), (57.0, 39.0)], show_polygon=False)
+    assert map_widget.scripts == []
+
+    # Переключение полигона не трогает точки
+    map_widget.update_map([(55.0, 37.0, "1"), (56.0, 38.0, "2"), (57.0, 39.0)], show_polygon=True)
+    assert map_widget.scripts == ["genwkt.setPolygon(true);"]
+
+
+def test_canvas_mode_above_threshold(map_widget):
+    map_widget.canvas_threshold = 3
+    points = [(55.0 + i / 10, 37.0 + i / 10, f"P{i}") for i in range(5)]
+    map_widget.update_map(points, show_polygon=False)
+
+    script = map_widget.scripts[0]
+    assert script.startswith("genwkt.setCanvasPoints('")
+    blob = script.split("'")[1]
+    coords = np.frombuffer(base64.b64decode(blob), dtype="<f8").reshape(-1, 2)
+    np.testing.assert_array_equal(coords, [p[:2] for p in points])
+    assert '["P0", "P1", "P2", "P3", "P4"]' in script
+
+    # Возврат к маркерам: все точки передаются заново
+    map_widget.scripts.clear()
+    map_widget.update_map(points[:2], show_polygon=False)
+    assert map_widget.scripts[0] == 'genwkt.setPoints(0, [[55.0, 37.0, "P0"], [55.1, 37.1, "P1"]]);'
+
+
+def test_canvas_circles_in_feature_group():
+    import folium
+
+    m = folium.Map()
+    m.add_child(_layer_controller())
+    html = m.get_root().render()
+    # Клики кружков доходят до обработчика подписей только через featureGroup
+    assert "var circles = L.featureGroup().addTo(map);" in html
+    assert 'circles.on("click"' in html
+
+
+def test_only_latest_state_sent_after_page_loaded(qtbot, monkeypatch):
+    widget = MapWidget()
+    qtbot.addWidget(widget)
+    widget.ensure_web_view()
+    scripts = []
+    monkeypatch.setattr(widget, "_run_js", scripts.append)
+    widget._page_ready = False
+    widget.update_map([(55.0, 37.0, "1")])
+    widget.update_map([(56.0, 38.0, "2"), (57.0, 39.0, "3")], show_polygon=False)
+    assert scripts == []
+
+    widget.on_load_finished(True)
+    assert scripts[0] == 'genwkt.setPoints(0, [[56.0, 38.0, "2"], [57.0, 39.0, "3"]]);'
+    assert not any("55.0" in script for script in scripts)
+
+
+def test_web_view_created_after_show(qtbot):
+    widget = MapWidget()
+    qtbot.addWidget(widget)
+    # До показа QtWebEngine не создается, сохраняется только последнее состояние
+    widget.update_map([(55.0, 37.0, "1")])
+    assert widget.web_view is None
+    assert widget.current_points == [(55.0, 37.0, "1")]
+
+    widget.show()
+    qtbot.waitUntil(lambda: widget.web_view is not None)
+    assert widget.ensure_web_view() is widget.web_view
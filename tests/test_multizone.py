@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from src.cli import main
+from src.core.multizone import discover_zones, estimate_zone, estimate_zones
+
+WGS = """1,55.9132151,28.7827337,148.13
+2,55.9177362,28.8195407,153.07
+3,55.8997317,28.8448859,150.32
+4,55.8879009,28.8148194,144.81
+5,55.8993879,28.7702963,140.8"""
+
+MSK = """1,7686.0995773235,-8996.72764806,128.313878864
+2,8149.5516395103,-6686.6830560778,133.2730658024
+3,6118.3181298608,-5135.559022994,130.5397422902
+4,4832.9892219482,-7038.7691853523,125.0153974839
+5,6160.4605288561,-9801.7721945621,120.9794011708"""
+
+
+@pytest.fixture
+def zones_dir(tmp_path):
+    src = tmp_path / "zones"
+    src.mkdir()
+    for name in ("north", "south"):
+        (src / f"{name}_wgs.csv").write_text(WGS, encoding="utf-8")
+        (src / f"{name}_msk.csv").write_text(MSK, encoding="utf-8")
+    # Зона с несовпадающим числом точек
+    (src / "broken_wgs.csv").write_text(WGS, encoding="utf-8")
+    (src / "broken_msk.csv").write_text("\n".join(MSK.splitlines()[:4]), encoding="utf-8")
+    # Файл без пары игнорируется
+    (src / "orphan_wgs.csv").write_text(WGS, encoding="utf-8")
+    return src
+
+
+def test_discover_directory(zones_dir):
+    zones = discover_zones(zones_dir)
+    assert [z["name"] for z in zones] == ["broken", "north", "south"]
+
+
+def test_discover_manifest(zones_dir):
+    manifest = zones_dir / "manifest.json"
+    manifest.write_text(json.dumps([
+        {"name": "n1", "wgs": "north_wgs.csv", "msk": "north_msk.csv", "crs_name": "MSK-N", "geoid": True},
+    ]), encoding="utf-8")
+    zones = discover_zones(manifest)
+    assert zones == [{"name": "n1", "wgs": str(zones_dir / "north_wgs.csv"), "msk": str(zones_dir / "north_msk.csv"),
+                      "crs_name": "MSK-N", "geoid": True}]
+
+
+def test_process_pool_matches_serial(zones_dir, tmp_path):
+    zones = discover_zones(zones_dir)
+    parallel = estimate_zones(zones, tmp_path / "out", max_workers=2)
+    (tmp_path / "serial").mkdir()
+
+    assert [s["name"] for s in parallel] == ["broken", "north", "south"]
+    assert parallel[0]["error"]
+    for summary in parallel[1:]:
+        assert summary["error"] is None
+        assert summary["points"] == 5
+        serial = estimate_zone(zones[[z["name"] for z in zones].index(summary["name"])], tmp_path / "serial")
+        assert summary["rms"] == pytest.approx(serial["rms"], abs=1e-9)
+    assert (tmp_path / "out" / "north.prj").read_text(encoding="utf-8").startswith('PROJCS["north"')
+    assert (tmp_path / "out" / "south_residuals.csv").exists()
+
+
+def test_batch_command(zones_dir, tmp_path, capsys):
+    (zones_dir / "broken_wgs.csv").unlink()
+    code = main(["batch", "--zones", str(zones_dir), "--out-dir", str(tmp_path / "prj"), "--workers", "1"])
+    assert code == 0
+    assert sorted(p.name for p in (tmp_path / "prj").iterdir()) == [
+        "north.prj", "north_residuals.csv", "south.prj", "south_residuals.csv"]
+    assert "Зон: 2" in capsys.readouterr().out
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from src.core.conversion import convert_points
+from src.core.converter import CoordinateConverter
+from src.core.pipeline import (EstimationPipeline, OperationCancelled, STAGE_GEOCENTRIC, STAGE_HELMERT,
+                               STAGE_PROJECTION, STAGE_RESIDUALS, STAGE_WKT)
+
+WGS = [[55.9132151, 28.7827337, 148.13],
+       [55.9177362, 28.8195407, 153.07],
+       [55.8997317, 28.8448859, 150.32],
+       [55.8879009, 28.8148194, 144.81],
+       [55.8993879, 28.7702963, 140.8]]
+
+MSK = [[7686.0995773235, -8996.72764806, 128.313878864],
+       [8149.5516395103, -6686.6830560778, 133.2730658024],
+       [6118.3181298608, -5135.559022994, 130.5397422902],
+       [4832.9892219482, -7038.7691853523, 125.0153974839],
+       [6160.4605288561, -9801.7721945621, 120.9794011708]]
+
+
+@pytest.fixture
+def pipeline():
+    return EstimationPipeline()
+
+
+def test_run_full_pipeline(pipeline):
+    result = pipeline.run(WGS, MSK, crs_name="Zone1")
+
+    assert set(result["timings"]) == {STAGE_PROJECTION, STAGE_GEOCENTRIC, STAGE_HELMERT, STAGE_RESIDUALS, STAGE_WKT}
+    assert result["residuals"].shape == (5, 3)
+    assert np.max(np.abs(result["residuals"])) < 0.01
+    assert 'PROJCS["Zone1"' in result["wkt"]
+    assert result["projection"]["cm_deg"] == pytest.approx(30.0, abs=0.01)
+
+
+def test_run_with_fixed_parameters(pipeline):
+    auto = pipeline.run(WGS, MSK)
+    fixed = pipeline.run(WGS, MSK, projection=auto["projection"], params=auto["params"])
+
+    # Заданные параметры не пересчитываются
+    assert STAGE_PROJECTION not in fixed["timings"]
+    assert STAGE_HELMERT not in fixed["timings"]
+    np.testing.assert_allclose(fixed["residuals"], auto["residuals"], atol=1e-9)
+
+
+def test_stages_match_run(pipeline):
+    result = pipeline.run(WGS, MSK)
+    projection = pipeline.estimate_projection(WGS, MSK)
+    wgs_cart, msk_cart = pipeline.to_geocentric(WGS, MSK, projection)
+    params = pipeline.estimate_transformation(wgs_cart, msk_cart)
+    residuals = pipeline.compute_residuals(wgs_cart, MSK, projection, params)
+    np.testing.assert_allclose(residuals, result["residuals"], atol=1e-9)
+
+
+@pytest.mark.parametrize("wgs, msk", [(WGS, MSK[:4]), (WGS[:2], MSK[:2])])
+def test_run_invalid_input(pipeline, wgs, msk):
+    with pytest.raises(ValueError):
+        pipeline.run(wgs, msk)
+
+
+def test_progress_and_cancel():
+    stages = []
+    pipeline = EstimationPipeline(progress_callback=stages.append)
+    pipeline.run(WGS, MSK)
+    assert stages == [STAGE_PROJECTION, STAGE_GEOCENTRIC, STAGE_HELMERT, STAGE_RESIDUALS, STAGE_WKT]
+
+    # Отмена после первого этапа
+    pipeline = EstimationPipeline(progress_callback=stages.append, is_cancelled=lambda: len(stages) > 5)
+    with pytest.raises(OperationCancelled):
+        pipeline.run(WGS, MSK)
+    assert stages[5:] == [STAGE_PROJECTION]
+
+
+def test_convert_points_chunks_and_cancel():
+    wkt = EstimationPipeline().run(WGS, MSK)["wkt"]
+    lines = [f"{i},{lat},{lon},{h}" for i, (lat, lon, h) in enumerate(WGS)] + ["bad line"]
+    converter = CoordinateConverter()
+    progress = []
+    result = convert_points(converter, wkt, lines, chunk_size=2, progress_callback=progress.append)
+
+    assert result["ids"].tolist() == ["0", "1", "2", "3", "4"]
+    assert result["errors"] == 0
+    np.testing.assert_allclose(np.column_stack([result["northing"], result["easting"]]),
+                               np.array(MSK)[:, :2], atol=0.05)
+    assert progress == [2, 4, 5]
+
+    with pytest.raises(OperationCancelled):
+        convert_points(converter, wkt, lines, chunk_size=2, is_cancelled=lambda: len(progress) > 3,
+                       progress_callback=progress.append)
+    assert progress[3:] == [2]
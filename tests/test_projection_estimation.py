@@ -83,3 +83,40 @@ def test_generate_wkt_custom_name():
     
     assert f'PROJCS["{crs_name}"' in wkt
     assert f'GEOGCS["{crs_name}"' in wkt
+
+@pytest.mark.parametrize("fixed_scale", [True, False])
+def test_lm_matches_nelder_mead(fixed_scale):
+    estimator = ParameterEstimator()
+    wgs_points = [
+        [55.9132151, 28.7827337, 148.13],
+        [55.9177362, 28.8195407, 153.07],
+        [55.8997317, 28.8448859, 150.32],
+        [55.8879009, 28.8148194, 144.81],
+        [55.8993879, 28.7702963, 140.8]
+    ]
+    msk_points = [
+        [7686.0995773235, -8996.72764806, 128.313878864],
+        [8149.5516395103, -6686.6830560778, 133.2730658024],
+        [6118.3181298608, -5135.559022994, 130.5397422902],
+        [4832.9892219482, -7038.7691853523, 125.0153974839],
+        [6160.4605288561, -9801.7721945621, 120.9794011708]
+    ]
+
+    lm = estimator.estimate_projection_parameters(wgs_points, msk_points, fixed_scale=fixed_scale, method="lm")
+    nm = estimator.estimate_projection_parameters(wgs_points, msk_points, fixed_scale=fixed_scale, method="nelder-mead")
+
+    assert lm["method"] == "lm"
+    # Шаги (вычисления якобиана), а не вызовы функции - сопоставимо с nit симплекса
+    assert 0 < lm["iterations"] < nm["iterations"]
+    # Невязочный метод не хуже симплекса
+    assert lm["rms"] <= nm["rms"] + 1e-6
+    assert np.isclose(lm["central_meridian"], nm["central_meridian"], atol=1e-6)
+    assert np.isclose(lm["scale_factor"], nm["scale_factor"], atol=1e-8)
+    assert np.isclose(lm["false_easting"], nm["false_easting"], atol=0.01)
+    assert np.isclose(lm["false_northing"], nm["false_northing"], atol=0.01)
+
+
+def test_unknown_projection_method():
+    estimator = ParameterEstimator()
+    with pytest.raises(ValueError):
+        estimator.estimate_projection_parameters([[55, 28, 0]] * 3, [[0, 0, 0]] * 3, method="bfgs")
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from src.core.reader import (POINT_DTYPE, detect_delimiter, iter_point_chunks, parse_point_line, parse_points,
+                             points_digest,
+                             read_points)
+
+
+def test_parse_point_line_rules():
+    assert parse_point_line("1,55.5,28.5,100") == ("1", 55.5, 28.5, 100.0)
+    assert parse_point_line("55.5 28.5 100") == ("", 55.5, 28.5, 100.0)
+    assert parse_point_line("P1,55.5,28.5") == ("P1", 55.5, 28.5, 0.0)
+    assert parse_point_line("55.5,28.5") == ("", 55.5, 28.5, 0.0)
+    assert parse_point_line("P1;55,5;28,5;7", delimiter=";") == ("P1", 55.5, 28.5, 7.0)
+    assert parse_point_line("bad line") is None
+    assert parse_point_line("") is None
+
+
+@pytest.mark.parametrize("lines, expected", [
+    (["1,2,3", "4,5,6"], ","),
+    (["1\t2\t3", "4\t5\t6"], "\t"),
+    (["1;2,5;3"], ";"),
+    (["1\t2,5\t3"], "\t"),
+    (["1 2 3", "4 5 6"], None),
+    (["1, 2, 3", "4 5 6"], ","),
+    ([], None),
+])
+def test_detect_delimiter(lines, expected):
+    assert detect_delimiter(lines) == expected
+
+
+def test_uniform_and_mixed_chunks_agree():
+    uniform = ["1,55.0,39.0,100", "2,56.0,40.0,200", "3,57.0,41.0,300"]
+    mixed = uniform + ["58.0 42.0 400"]
+    fast = parse_points(uniform)
+    slow = parse_points(mixed)
+
+    assert fast.dtype == POINT_DTYPE
+    assert fast.tolist() == slow[:3].tolist()
+    assert slow[3].tolist() == ("", 58.0, 42.0, 400.0)
+
+
+def test_line_falls_back_to_other_delimiters(monkeypatch):
+    warnings = []
+    monkeypatch.setattr("src.core.reader.logger.warning", warnings.append)
+    # Разделитель блока - пробелы, но строка с запятыми тоже разбирается
+    points = parse_points(["1 55.0 39.0 100", "56.0 40.0 200", "2, 57.0, 41.0, 5", "bad line"])
+    assert points["id"].tolist() == ["1", "", "2"]
+    np.testing.assert_allclose(points["lat"], [55.0, 56.0, 57.0])
+    assert warnings == ["Пропущено нераспознанных строк: 1"]
+
+
+def test_mixed_formats():
+    points = parse_points(["1, 55.0, 39.0, 100", "56.0 40.0 200", "PT2, 57.0, 41.0", "ID,Lat,Lon,H"])
+    assert points["id"].tolist() == ["1", "", "PT2"]
+    np.testing.assert_allclose(points["h"], [100.0, 200.0, 0.0])
+
+
+def test_iter_point_chunks_file(tmp_path):
+    path = tmp_path / "points.txt"
+    path.write_text("ID;Lat;Lon;H\n" + "\n".join(f"P{i};55,{i};28,{i};{i}" for i in range(10)), encoding="utf-8")
+
+    chunks = list(iter_point_chunks(path, chunk_size=4))
+    assert [len(c) for c in chunks] == [3, 4, 3]
+    points = read_points(path)
+    assert points["id"].tolist() == [f"P{i}" for i in range(10)]
+    np.testing.assert_allclose(points["h"], np.arange(10))
+    np.testing.assert_allclose(points["lat"], [55.0 + i / 10 for i in range(10)])
+
+
+def test_iter_point_chunks_lines():
+    chunks = list(iter_point_chunks(["55 39 1", "", "bad", "56 40 2"], chunk_size=2))
+    assert len(chunks) == 2
+    assert read_points(["55 39 1"]).tolist() == [("", 55.0, 39.0, 1.0)]
+    assert len(read_points([])) == 0
+
+
+def test_dms_columns():
+    lines = ["P1;55 30 15,2;37°36'0\"E;150,5", "P2;55.5;37.6;10"]
+    points = parse_points(lines)
+    assert points["id"].tolist() == ["P1", "P2"]
+    np.testing.assert_allclose(points["lat"], [55.5042222222, 55.5])
+    np.testing.assert_allclose(points["lon"], [37.6, 37.6])
+    # Построчный разбор дает то же, ID вида "N1" не считается углом
+    assert parse_point_line(lines[0], delimiter=";") == ("P1", points["lat"][0], 37.6, 150.5)
+    assert parse_point_line("N1, 55, 37") == ("N1", 55.0, 37.0, 0.0)
+
+
+def test_points_digest():
+    a = parse_points(["1,55.0,39.0,100", "2,56.0,40.0,200"])
+    b = parse_points(["1, 55.0, 39.0, 100", "", "2,56,40,200"])
+    c = parse_points(["1,55.0,39.0,100", "3,56.0,40.0,200"])
+    assert points_digest(a) == points_digest(b)
+    assert points_digest(a) != points_digest(c)
+    assert points_digest(a) != points_digest(a[:1])
@@ -0,0 +1,51 @@
+import csv
+
+import numpy as np
+from PySide6.QtCore import Qt
+
+from src.gui.widgets.result_table_model import PointTableModel
+
+HEADERS = ["ID", "X (Север)", "Y (Восток)", "H (Высота)"]
+
+
+def test_lazy_formatting(qtbot):
+    model = PointTableModel(HEADERS)
+    assert model.rowCount() == 0 and model.columnCount() == 4
+
+    n = 200_000
+    values = np.arange(n, dtype=float) + 0.123456
+    model.set_data(np.array([f"P{i}" for i in range(n)], dtype=object), values, -values, values / 10)
+
+    assert model.rowCount() == n
+    assert model.headerData(1, Qt.Horizontal) == "X (Север)"
+    assert model.index(n - 1, 0).data() == f"P{n - 1}"
+    assert model.index(1, 1).data() == "1.1235"
+    assert model.index(1, 2).data() == "-1.1235"
+
+    model.clear()
+    assert model.rowCount() == 0
+
+
+def test_write_csv_matches_view(qtbot, tmp_path):
+    model = PointTableModel(HEADERS)
+    model.set_data(np.array(["1", ""], dtype=object), np.array([6097200.12344, 1.0]),
+                   np.array([500000.0, 2.0]), np.array([100.0, 0.0]))
+    path = tmp_path / "out.csv"
+    model.write_csv(path)
+
+    with open(path, encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == HEADERS
+    assert rows[1:] == [[model.index(r, c).data() for c in range(4)] for r in range(2)]
+
+
+def test_set_headers_per_column_decimals(qtbot, tmp_path):
+    model = PointTableModel(HEADERS)
+    model.set_data(np.array(["1"], dtype=object), np.array([1.0]), np.array([2.0]), np.array([3.0]))
+    model.set_headers(["ID", "Lat", "Lon", "H (Высота)"], [9, 9, 4])
+    assert model.rowCount() == 0 and model.headerData(1, Qt.Horizontal) == "Lat"
+
+    model.set_data(np.array(["1"], dtype=object), np.array([55.123456789123]), np.array([37.5]), np.array([150.0]))
+    assert [model.index(0, c).data() for c in range(4)] == ["1", "55.123456789", "37.500000000", "150.0000"]
+    np.testing.assert_array_equal(model.column(1), [37.5])
+    assert list(model.iter_rows()) == [["1", "55.123456789", "37.500000000", "150.0000"]]
@@ -0,0 +1,62 @@
+import csv
+
+import numpy as np
+import pytest
+
+from src.core.conversion import convert_points
+from src.core.converter import CoordinateConverter
+from src.core.estimator import ParameterEstimator
+from src.core.sharding import CONVERT_HEADERS, convert_file, shard_ranges
+
+
+@pytest.fixture
+def wkt():
+    params = {"Tx": 23.57, "Ty": -140.95, "Tz": -79.8, "Rx": 0.0, "Ry": -0.35, "Rz": -0.79, "Scale_ppm": -0.22}
+    return ParameterEstimator().generate_wkt(params, 28.8, 500000.0, 0.0, 1.0, 0.0)
+
+
+@pytest.fixture
+def points_file(tmp_path):
+    rng = np.random.default_rng(5)
+    lines = [f"P{i},{lat:.7f},{lon:.7f},{h:.2f}"
+             for i, (lat, lon, h) in enumerate(zip(rng.uniform(55, 56, 3000), rng.uniform(28, 29, 3000),
+                                                   rng.uniform(100, 200, 3000)))]
+    # Неразбираемая строка и точка с ошибкой (широта вне диапазона) посреди файла
+    lines[1000] = "bad line"
+    lines[2000] = "E1,95.0,28.5,100"
+    path = tmp_path / "points.csv"
+    # CRLF и последняя строка без перевода строки
+    path.write_bytes("\r\n".join(lines).encode("utf-8"))
+    return path
+
+
+def test_shard_ranges_align_to_lines(points_file):
+    data = points_file.read_bytes()
+    ranges = shard_ranges(points_file, shard_size=1000)
+    assert len(ranges) > 50
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start and data[end - 1:end] == b"\n"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_sharded_output_matches_streaming(points_file, tmp_path, wkt, workers):
+    out = tmp_path / f"out_{workers}.csv"
+    stats = convert_file(wkt, points_file, out, max_workers=workers, shard_size=4096, max_in_flight=3,
+                         chunk_size=100)
+    assert stats["workers"] == workers and stats["shards"] > 10
+    assert (stats["points"], stats["errors"]) == (2999, 1)
+
+    with open(out, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == CONVERT_HEADERS
+    expected = convert_points(CoordinateConverter(), wkt, str(points_file))
+    assert [row[0] for row in rows[1:]] == expected["ids"].tolist()
+    np.testing.assert_allclose([[float(v) for v in row[1:]] for row in rows[1:]],
+                               np.column_stack([expected["northing"], expected["easting"], expected["h"]]),
+                               rtol=0, atol=6e-5)
+
+
+def test_invalid_wkt_fails_before_pool(points_file, tmp_path):
+    with pytest.raises(ValueError):
+        convert_file("not a wkt", points_file, tmp_path / "out.csv", max_workers=2)
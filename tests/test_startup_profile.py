@@ -0,0 +1,45 @@
+import builtins
+import subprocess
+import sys
+from pathlib import Path
+
+from src.startup_profile import StartupProfiler
+
+ROOT = Path(__file__).parent.parent
+
+
+def test_profiler_records_imports(tmp_path, monkeypatch):
+    package = tmp_path / "genwkt_profiled_pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("from . import child\n")
+    (package / "child.py").write_text("import time\ntime.sleep(0.02)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    original_import = builtins.__import__
+    profiler = StartupProfiler()
+    profiler.install()
+    try:
+        import genwkt_profiled_pkg  # noqa: F401
+        import genwkt_profiled_pkg  # noqa: F401,F811 - повторный импорт не учитывается
+    finally:
+        profiler.uninstall()
+        sys.modules.pop("genwkt_profiled_pkg", None)
+        sys.modules.pop("genwkt_profiled_pkg.child", None)
+    assert builtins.__import__ is original_import
+
+    self_time, count = profiler.packages["genwkt_profiled_pkg"]
+    assert count == 2
+    assert self_time >= 0.02
+    profiler.mark("Импорт модулей")
+    report = profiler.report()
+    assert "genwkt_profiled_pkg" in report and "Импорт модулей" in report
+
+
+def test_heavy_modules_not_imported_at_startup():
+    # Главное окно не должно загружать QtWebEngine, folium, scipy и pyproj при импорте
+    code = ("import sys, src.gui.main_window; "
+            "print(','.join(m for m in ('folium', 'scipy', 'pyproj', 'PySide6.QtWebEngineWidgets') "
+            "if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
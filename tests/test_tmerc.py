@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from pyproj import Transformer
+from src.core.tmerc import TransverseMercator, JACOBIAN_PARAMS
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(7)
+    n = 2000
+    return rng.uniform(40.0, 75.0, n), 30.0 + rng.uniform(-6.0, 6.0, n)
+
+
+@pytest.mark.parametrize("lat0", [0.0, 45.5])
+def test_forward_inverse_match_pyproj(points, lat0):
+    lat, lon = points
+    tm = TransverseMercator(30.0, 0.9996, 300000, -6000000, lat0)
+    transformer = Transformer.from_crs(
+        "+proj=longlat +ellps=krass +no_defs",
+        f"+proj=tmerc +lat_0={lat0} +lon_0=30 +k=0.9996 +x_0=300000 +y_0=-6000000 +ellps=krass +units=m +no_defs",
+        always_xy=True,
+    )
+    easting_ref, northing_ref = transformer.transform(lon, lat)
+
+    northing, easting = tm.forward(lat, lon)
+    assert np.abs(northing - northing_ref).max() < 1e-6
+    assert np.abs(easting - easting_ref).max() < 1e-6
+
+    lat_back, lon_back = tm.inverse(northing_ref, easting_ref)
+    assert np.abs(lat_back - lat).max() < 1e-10
+    assert np.abs(lon_back - lon).max() < 1e-10
+
+
+def test_jacobian_matches_finite_differences(points):
+    lat, lon = points[0][:20], points[1][:20]
+    params = {"central_meridian": 30.5, "scale_factor": 1.0, "false_easting": 67000.0, "false_northing": -6190000.0}
+    steps = {"central_meridian": 1e-4, "scale_factor": 1e-6, "false_easting": 1.0, "false_northing": 1.0}
+
+    _, _, jac = TransverseMercator(**params).forward_with_jacobian(lat, lon)
+    assert jac.shape == (20, 2, 4)
+
+    for k, name in enumerate(JACOBIAN_PARAMS):
+        plus = dict(params, **{name: params[name] + steps[name]})
+        minus = dict(params, **{name: params[name] - steps[name]})
+        n_plus, e_plus = TransverseMercator(**plus).forward(lat, lon)
+        n_minus, e_minus = TransverseMercator(**minus).forward(lat, lon)
+        dn = (n_plus - n_minus) / (2 * steps[name])
+        de = (e_plus - e_minus) / (2 * steps[name])
+        assert np.allclose(jac[:, 0, k], dn, rtol=1e-6, atol=1e-4)
+        assert np.allclose(jac[:, 1, k], de, rtol=1e-6, atol=1e-4)
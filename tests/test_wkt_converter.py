@@ -19,21 +19,22 @@ def test_wkt_conversion(widget, qtbot):
     
     # Нажатие конвертировать
     qtbot.mouseClick(widget.btn_convert, Qt.MouseButton.LeftButton)
+    qtbot.waitUntil(lambda: not widget.is_busy())
     
     # Проверка результатов в таблице
-    assert widget.result_table.rowCount() == 1
+    assert widget.result_model.rowCount() == 1
     
     # Получаем значения из таблицы (ID, N, E, H)
-    n_item = widget.result_table.item(0, 1)
-    e_item = widget.result_table.item(0, 2)
-    h_item = widget.result_table.item(0, 3)
+    n_item = widget.result_model.index(0, 1).data()
+    e_item = widget.result_model.index(0, 2).data()
+    h_item = widget.result_model.index(0, 3).data()
     
     assert n_item is not None
     assert e_item is not None
     assert h_item is not None
     
     # Приблизительная проверка
-    x = float(n_item.text())
+    x = float(n_item)
     # Northing для 55 градусов на CM 39 (это прямо на меридиане, X должен быть около 6097200)
     assert x == pytest.approx(6097200, abs=10000)
     
@@ -46,9 +47,10 @@ def test_invalid_input(widget, qtbot, monkeypatch):
     
     # Должно показать сообщение об ошибке (теперь замокано)
     qtbot.mouseClick(widget.btn_convert, Qt.MouseButton.LeftButton)
+    qtbot.waitUntil(lambda: not widget.is_busy())
     
     # Результаты должны быть пустыми (таблица пустая)
-    assert widget.result_table.rowCount() == 0
+    assert widget.result_model.rowCount() == 0
 
 def test_load_prj_cancel(widget, qtbot, monkeypatch):
     # Мок QFileDialog, чтобы ничего не возвращать
@@ -56,3 +58,66 @@ def test_load_prj_cancel(widget, qtbot, monkeypatch):
     
     widget.load_from_prj()
     assert widget.wkt_edit.toPlainText() == ""
+
+def test_inverse_direction(widget, qtbot, monkeypatch):
+    # Конвертация - синхронно в главном потоке: тест проверяет направление пересчета,
+    # фоновый запуск покрыт test_wkt_conversion
+    monkeypatch.setattr("src.gui.workers.Worker.start", lambda self, pool=None: self.run())
+    wkt = 'PROJCS["Transverse_Mercator",GEOGCS["GCS_Pulkovo_1942",DATUM["D_Pulkovo_1942",SPHEROID["Krassowsky_1942",6378245.0,298.3]],PRIMEM["Greenwich",0.0],UNIT["Degree",0.0174532925199433]],PROJECTION["Transverse_Mercator"],PARAMETER["False_Easting",500000.0],PARAMETER["False_Northing",0.0],PARAMETER["Central_Meridian",39.0],PARAMETER["Scale_Factor",1.0],PARAMETER["Latitude_Of_Origin",0.0],UNIT["Meter",1.0]]'
+    widget.wkt_edit.setText(wkt)
+    widget.coords_input.setText("1, 55.0, 39.5, 100.0")
+    qtbot.mouseClick(widget.btn_convert, Qt.MouseButton.LeftButton)
+    qtbot.waitUntil(lambda: not widget.is_busy())
+    msk_row = [widget.result_model.index(0, c).data() for c in range(4)]
+
+    # Обратное направление: таблица очищается, столбцы - Lat, Lon
+    widget.chk_inverse.setChecked(True)
+    assert widget.result_model.rowCount() == 0
+    assert widget.result_model.headerData(1, Qt.Horizontal) == "Lat"
+
+    widget.coords_input.setText(", ".join(msk_row))
+    qtbot.mouseClick(widget.btn_convert, Qt.MouseButton.LeftButton)
+    qtbot.waitUntil(lambda: not widget.is_busy())
+    assert widget.result_model.rowCount() == 1
+    assert widget.result_model.index(0, 0).data() == "1"
+    assert float(widget.result_model.index(0, 1).data()) == pytest.approx(55.0, abs=1e-8)
+    assert float(widget.result_model.index(0, 2).data()) == pytest.approx(39.5, abs=1e-8)
+    assert float(widget.result_model.index(0, 3).data()) == pytest.approx(100.0)
+
+    widget.chk_inverse.setChecked(False)
+    assert widget.result_model.headerData(1, Qt.Horizontal) == "X (Север)"
+
+def test_map_uses_preview_of_attached_file(widget, tmp_path, monkeypatch):
+    # Карта строится по предпросмотру: подключенный файл не разбирается целиком в потоке GUI
+    from src.gui.widgets import wkt_converter_widget as module
+    path = tmp_path / "points.csv"
+    path.write_text("\n".join(f"P{i}, 55.{i:05d}, 37.5, 100.0" for i in range(module.PREVIEW_LINES * 5)),
+                    encoding="utf-8")
+    sources = []
+    read_points = module.read_points
+    monkeypatch.setattr(module, "read_points",
+                        lambda source, *a, **kw: sources.append(source) or read_points(source, *a, **kw))
+    drawn = []
+    monkeypatch.setattr(widget.map_widget, "update_map", lambda points, **kw: drawn.append(points))
+
+    widget.set_coords_file(str(path))
+    assert drawn and len(drawn[-1]) == module.PREVIEW_LINES
+    assert str(path) not in sources
+
+
+def test_skipped_points_reported(widget, monkeypatch):
+    # Точки вне сетки геоида отбрасываются convert_points - пользователь получает предупреждение
+    import numpy as np
+    warnings = []
+    monkeypatch.setattr("PySide6.QtWidgets.QMessageBox.warning", lambda *args: warnings.append(args[2]))
+    monkeypatch.setattr(widget, "_is_current_conversion", lambda: True)
+    result = {"ids": np.array(["1"], dtype=object), "northing": np.array([6097200.0]),
+              "easting": np.array([500000.0]), "h": np.array([100.0]), "errors": 2}
+
+    widget.on_conversion_finished(result)
+    assert widget.result_model.rowCount() == 1
+    assert len(warnings) == 1 and "Не пересчитано точек: 2" in warnings[0]
+
+    warnings.clear()
+    widget.on_conversion_finished(dict(result, errors=0))
+    assert warnings == []
@@ -0,0 +1,36 @@
+from src.core.pipeline import OperationCancelled
+from src.gui.workers import Worker
+
+
+def _job(values, progress_callback=None, is_cancelled=None):
+    total = 0
+    for i, v in enumerate(values):
+        if is_cancelled():
+            raise OperationCancelled("отмена")
+        total += v
+        progress_callback(i + 1, len(values))
+    return total
+
+
+def test_worker_result_and_progress(qtbot):
+    worker = Worker(_job, [1, 2, 3])
+    progress = []
+    worker.signals.progress.connect(lambda done, total: progress.append((done, total)))
+    with qtbot.waitSignal(worker.signals.finished) as blocker:
+        worker.start()
+    assert blocker.args == [6]
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_worker_cancel(qtbot):
+    worker = Worker(_job, [1, 2, 3])
+    worker.cancel()
+    with qtbot.waitSignal(worker.signals.cancelled):
+        worker.start()
+
+
+def test_worker_error(qtbot):
+    worker = Worker(_job, [1, "x"])
+    with qtbot.waitSignal(worker.signals.error) as blocker:
+        worker.start()
+    assert "unsupported" in blocker.args[0]
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from src.core.cache import TransformerCache
+from src.core.converter import CoordinateConverter
+from src.core.estimator import ParameterEstimator
+from src.core.geoid import EGM2008_GRID
+from src.core.zone import ParsedZone, ZoneCache
+
+PARAMS = {"Tx": 23.57, "Ty": -140.95, "Tz": -79.8, "Rx": 0, "Ry": -0.35, "Rz": -0.79, "Scale_ppm": -0.22}
+
+
+def zone_wkt(use_geoid):
+    return ParameterEstimator().generate_wkt(PARAMS, cm_deg=37.5, fe=1300000, fn=-6200000, scale=1, lat0=0,
+                                            use_geoid=use_geoid)
+
+
+def test_parsed_zone_vertical_datum():
+    zone = ParsedZone(zone_wkt(True), TransformerCache())
+    assert zone.crs.is_compound
+    assert zone.horizontal_crs.is_projected
+    assert "EGM2008" in zone.vertical.name
+    assert zone.geoid_grid == EGM2008_GRID and zone.has_egm2008
+
+    plain = ParsedZone(zone_wkt(False), TransformerCache())
+    assert plain.horizontal_crs.is_projected
+    assert plain.vertical is None and not plain.has_egm2008
+
+
+def test_zone_cache_by_content():
+    cache = ZoneCache(TransformerCache(), size=4)
+    wkt = zone_wkt(False)
+    zone = cache.get(wkt)
+    # Тот же WKT с другими пробелами и переводами строк - та же зона
+    assert cache.get("  " + wkt + "\n") is zone
+    assert cache.get(zone_wkt(True)) is not zone
+    assert cache.stats()["misses"] == 2 and cache.stats()["hits"] == 1
+
+
+def test_converter_parses_wkt_once():
+    converter = CoordinateConverter(cache=TransformerCache())
+    wkt = zone_wkt(False)
+    lats, lons = np.array([55.75, 55.80]), np.array([37.61, 37.70])
+    first = converter.wkt_to_msk_batch(wkt, lats, lons)
+    for _ in range(5):
+        again = converter.wkt_to_msk_batch(wkt, lats, lons)
+        assert converter.check_vertical_crs(wkt) is False
+    n, e, _ = converter.wkt_to_msk(wkt, 55.75, 37.61, 0.0)
+
+    stats = converter.cache_stats()
+    assert stats["zones"]["misses"] == 1
+    assert stats["crs"]["misses"] == 2  # WKT и WGS84
+    np.testing.assert_array_equal(again[0], first[0])
+    assert (n, e) == pytest.approx((first[0][0], first[1][0]))
+    assert converter.check_vertical_crs("not a wkt") is False